@@ -1,139 +1,912 @@
 """BP Calculator Flask Application with AWS X-Ray and CloudWatch Monitoring"""
 
+from services.startup import startup_timer  # first, so it times the imports
 import os
 import logging
-from flask import Flask, render_template, request
+import time
+import uuid
+import io
+import mimetypes
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+import click
+from flask import (
+    Flask,
+    Response,
+    abort,
+    current_app,
+    g,
+    render_template,
+    request,
+    send_from_directory,
+    session,
+    stream_with_context,
+    url_for,
+)
+from flask.cli import with_appcontext
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
 from forms import BloodPressureForm
-from models.blood_pressure import BloodPressure
-from models.health_tips import HealthTips
+from models.blood_pressure import BloodPressure, BPCategory, category_table
+from models.rules import RULE_SETS_DIR, load_rule_sets
+from models.tips_catalogue import TIPS_DIR, TipsCatalogue
+from models.validation import SYSTOLIC_NOT_GREATER, validate_reading
+from services.assets import (
+    BUNDLES,
+    ENCODINGS,
+    choose_encoding,
+    load_manifest,
+    load_or_build,
+)
+from services.compression import Compressor, TrimWhitespace
+from services.bulk import BulkStats, annotate, read_csv, read_parquet
+from services.health import HealthChecks
+from services.history import DAY, HistoryStore, connect, migrate, schema_version
+from services.log_pipeline import FileSink, QueueLogHandler, pipeline_from_env
+from services.metrics import Registry, WorkerFiles
+from services.profiling import Phases, Profiler
+from services.request_log import DEFAULT_SAMPLE_RATES, EventLog, parse_sample_rates
+from services.response_cache import (
+    LRUCache,
+    PageCache,
+    TokenizedPage,
+    template_fingerprint,
+)
+from services.streaming import (
+    MalformedItem,
+    iter_json_array,
+    iter_ndjson,
+    json_array_chunks,
+    ndjson_lines,
+)
+from services.telemetry import Telemetry
 
-app = Flask(__name__)
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "secret123")
+startup_timer.mark("imports")
 
 HOST = os.environ.get("HOST", "127.0.0.1")
 PORT = int(os.environ.get("PORT", 5000))
 MODE = os.environ.get("MODE", "prod")
 
-# Setup AWS X-Ray and CloudWatch if configured
-aws_region = os.environ.get("AWS_REGION", "us-east-1")
-cloudwatch_enabled = os.environ.get("CLOUDWATCH_ENABLED", "false").lower() == "true"
+# Key of the per-application AppState in app.extensions
+EXTENSION = "bp_calculator"
+
+# Fingerprinted assets never change, so browsers may keep them for a year
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# GET routes rendered by each worker before it serves traffic (the last one
+# renders the 404 page)
+WARM_UP_PATHS = ("/", "/tips", "/privacy", "/favicon.ico", "/warm-up-not-found")
+
+# Sections of the tips page: heading and category
+TIPS_PAGE_SECTIONS = (
+    ("Low Blood Pressure", BPCategory.LOW),
+    ("Ideal Blood Pressure", BPCategory.IDEAL),
+    ("Pre-High Blood Pressure", BPCategory.PRE_HIGH),
+    ("High Blood Pressure", BPCategory.HIGH),
+)
+
+# Route label for responses produced by error handlers outside any endpoint
+ERROR_ROUTES = {404: "not_found_error", 500: "internal_error"}
+
+
+def parse_assignments(value: str) -> dict:
+    """Parse "key=value,key=value" into a dict"""
+    pairs = (entry.partition("=") for entry in value.split(",") if entry.strip())
+    return {key.strip(): item.strip() for key, _, item in pairs}
+
+
+def config_from_env(environ=os.environ) -> dict:
+    """Application settings read from the environment"""
+    return {
+        "SECRET_KEY": environ.get("SECRET_KEY", "secret123"),
+        # Fraction of each request event type written to the log
+        "LOG_SAMPLE_RATES": {
+            **DEFAULT_SAMPLE_RATES,
+            **parse_sample_rates(environ.get("LOG_SAMPLE_RATES", "")),
+        },
+        "LOG_COUNTS_INTERVAL": float(environ.get("LOG_COUNTS_INTERVAL", 60)),
+        "LOG_FILE": environ.get("LOG_FILE"),
+        # Rendered index results to keep per worker (0 disables the result cache)
+        "INDEX_CACHE_SIZE": int(environ.get("INDEX_CACHE_SIZE", 0)),
+        # Shared directory for aggregating metrics across gunicorn workers
+        "METRICS_DIR": environ.get("METRICS_DIR"),
+        # Processes per bulk upload (1 classifies inside the web worker)
+        "BULK_WORKERS": int(environ.get("BULK_WORKERS", 1)),
+        # gzip/brotli for text responses of at least COMPRESSION_MIN_SIZE bytes
+        "COMPRESSION": environ.get("COMPRESSION", "false").lower() == "true",
+        "COMPRESSION_MIN_SIZE": int(environ.get("COMPRESSION_MIN_SIZE", 500)),
+        "COMPRESSION_GZIP_LEVEL": int(environ.get("COMPRESSION_GZIP_LEVEL", 5)),
+        "COMPRESSION_BROTLI_QUALITY": int(environ.get("COMPRESSION_BROTLI_QUALITY", 4)),
+        "COMPRESSION_CACHE_SIZE": int(environ.get("COMPRESSION_CACHE_SIZE", 256)),
+        # Drop template indentation and blank lines when templates compile
+        "TEMPLATE_TRIM": environ.get("TEMPLATE_TRIM", "false").lower() == "true",
+        # Readiness: a log or history queue this full marks the worker unready
+        "READY_MAX_QUEUE": float(environ.get("READY_MAX_QUEUE", 0.8)),
+        # Seconds a readiness result is reused for, however often probed
+        "READY_CHECK_INTERVAL": float(environ.get("READY_CHECK_INTERVAL", 1.0)),
+        # Per-phase durations (form, validate, render, log...) as Server-Timing
+        "SERVER_TIMING": environ.get("SERVER_TIMING", "true").lower() == "true",
+        # Stack profiles of a fraction of requests, and of any request sending
+        # PROFILE_TOKEN in the PROFILE_HEADER header (neither: profiler off)
+        "PROFILE_SAMPLE_RATE": float(environ.get("PROFILE_SAMPLE_RATE", 0)),
+        "PROFILE_TOKEN": environ.get("PROFILE_TOKEN"),
+        "PROFILE_HEADER": environ.get("PROFILE_HEADER", "X-Profile"),
+        "PROFILE_DIR": environ.get(
+            "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "bp-profiles")
+        ),
+        "PROFILE_INTERVAL": float(environ.get("PROFILE_INTERVAL", 0.0005)),
+        "PROFILE_MAX_FILES": int(environ.get("PROFILE_MAX_FILES", 200)),
+        # Compiled templates shared by all workers (default: a per-user temp dir)
+        "TEMPLATE_CACHE_DIR": environ.get("TEMPLATE_CACHE_DIR"),
+        # Built asset bundles and manifest (default: static/dist)
+        "ASSETS_DIR": environ.get("ASSETS_DIR"),
+        # SQLite file for per-user reading history (unset disables history)
+        "HISTORY_DB": environ.get("HISTORY_DB"),
+        # Classification rule sets: extra directory of *.json files (replacing
+        # bundled sets of the same name), the default set and per-tenant sets
+        "RULE_SETS_DIR": environ.get("RULE_SETS_DIR"),
+        "RULE_SET": environ.get("RULE_SET", "default"),
+        "TENANT_RULE_SETS": parse_assignments(environ.get("TENANT_RULE_SETS", "")),
+        "TENANT_HEADER": environ.get("TENANT_HEADER", "X-Tenant"),
+        # Localized tips: extra directory of <locale>.json files (replacing
+        # bundled locales of the same name), the fallback locale and how often
+        # (seconds) the files are checked for changes; 0 never reloads
+        "TIPS_DIR": environ.get("TIPS_DIR"),
+        "TIPS_LOCALE": environ.get("TIPS_LOCALE", "en"),
+        "TIPS_RELOAD_INTERVAL": float(environ.get("TIPS_RELOAD_INTERVAL", 2)),
+        "CLOUDWATCH_ENABLED": environ.get("CLOUDWATCH_ENABLED", "false").lower()
+        == "true",
+        "AWS_REGION": environ.get("AWS_REGION", "us-east-1"),
+    }
+
+
+class AppState:
+    """Caches, metrics and telemetry belonging to one application instance"""
+
+    def __init__(self, app):
+        config = app.config
+        self.events = EventLog(
+            app.logger,
+            config["LOG_SAMPLE_RATES"],
+            flush_interval=config["LOG_COUNTS_INTERVAL"],
+        )
+        self.index_cache = LRUCache(config["INDEX_CACHE_SIZE"])
+        # Validated here like the rule sets; reloads keep the last good files
+        self.tips = TipsCatalogue(
+            TIPS_DIR,
+            *filter(None, [config["TIPS_DIR"]]),
+            default_locale=config["TIPS_LOCALE"],
+            reload_interval=config["TIPS_RELOAD_INTERVAL"],
+        )
+        # The tips page, one variant per locale
+        self.tips_cache = PageCache(
+            _render_health_tips, lambda locale: _health_tips_fingerprint(app, locale)
+        )
+        self.warmed_up = False
+        # Process that ran init_worker(), so a second hook in it is a no-op
+        self.worker_pid = None
+        self.assets_dir = config["ASSETS_DIR"] or os.path.join(
+            app.static_folder, "dist"
+        )
+        self.compressor = (
+            Compressor(
+                min_size=config["COMPRESSION_MIN_SIZE"],
+                gzip_level=config["COMPRESSION_GZIP_LEVEL"],
+                brotli_quality=config["COMPRESSION_BROTLI_QUALITY"],
+                cache_size=config["COMPRESSION_CACHE_SIZE"],
+            )
+            if config["COMPRESSION"]
+            else None
+        )
+        # Bundle name -> manifest entry, and entries by file; loaded on first use
+        self.assets = None
+        self.asset_files = {}
+        # Validated and compiled here, so a bad rule set stops start-up
+        self.rule_sets = load_rule_sets(
+            RULE_SETS_DIR, *filter(None, [config["RULE_SETS_DIR"]])
+        )
+        unknown = {config["RULE_SET"], *config["TENANT_RULE_SETS"].values()}
+        unknown -= self.rule_sets.keys()
+        if unknown:
+            raise ValueError(f"Unknown rule set(s): {', '.join(sorted(unknown))}")
+        self.history = (
+            HistoryStore(config["HISTORY_DB"]) if config["HISTORY_DB"] else None
+        )
+        # Background queues whose backlog readiness checks, by name
+        self.pipelines = {}
+        if self.history is not None:
+            self.pipelines["history"] = self.history.pipeline
+
+        # In-process metrics, scraped from /metrics
+        self.metrics = Registry()
+        self.request_duration = self.metrics.histogram(
+            "bp_request_duration_seconds",
+            "Request latency by route and status",
+            ("route", "method", "status"),
+        )
+        self.classifications = self.metrics.counter(
+            "bp_classifications_total",
+            "Readings classified per category",
+            ("category", "source"),
+        )
+        self.validation_failures = self.metrics.counter(
+            "bp_validation_failures_total",
+            "Validation failures per field",
+            ("field", "source"),
+        )
+        # Counters rather than gauges, so METRICS_DIR adds up every worker's
+        self.metrics.counter_callback(
+            "bp_index_cache_hits_total",
+            "Index result cache hits",
+            lambda: self.index_cache.hits,
+        )
+        self.metrics.counter_callback(
+            "bp_index_cache_misses_total",
+            "Index result cache misses",
+            lambda: self.index_cache.misses,
+        )
+        self.metrics.counter_callback(
+            "bp_index_cache_evictions_total",
+            "Index result cache evictions",
+            lambda: self.index_cache.evictions,
+        )
+        if self.compressor is not None:
+            self.metrics.counter_callback(
+                "bp_compression_cache_hits_total",
+                "Responses served from the compressed body cache",
+                lambda: self.compressor.cache.hits,
+            )
+            self.metrics.counter_callback(
+                "bp_compression_cache_misses_total",
+                "Responses compressed on demand",
+                lambda: self.compressor.cache.misses,
+            )
+        self.metrics_files = (
+            WorkerFiles(self.metrics, config["METRICS_DIR"])
+            if config["METRICS_DIR"]
+            else None
+        )
+
+        # Setup AWS X-Ray and CloudWatch if configured
+        if config["CLOUDWATCH_ENABLED"]:
+            # AWS SDKs are imported on a background thread, once per worker
+            self.telemetry = Telemetry(
+                app, config["AWS_REGION"], loggers=[logging.getLogger(__name__)]
+            )
+            self.telemetry.attach()
+            self.pipelines["telemetry"] = self.telemetry.pipeline
+        else:
+            self.telemetry = None
+            app.logger.warning(
+                "CLOUDWATCH_ENABLED not set to 'true' - AWS monitoring disabled"
+            )
 
-if cloudwatch_enabled:
-    try:
-        import boto3
-        import watchtower
-        from aws_xray_sdk.core import xray_recorder
-        from aws_xray_sdk.ext.flask.middleware import XRayMiddleware
 
-        # Configure X-Ray for distributed tracing
-        xray_recorder.configure(service="bp-calculator")
-        XRayMiddleware(app, xray_recorder)
+def create_app(config: dict = None) -> Flask:
+    """
+    Build the application.
 
-        # Configure CloudWatch Logs handler
-        logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
+    Nothing here opens a connection or starts a thread, so the result can
+    be created in a gunicorn master and forked: call warm_up() once before
+    forking and init_worker() in each worker after it.
 
-        cloudwatch_handler = watchtower.CloudWatchLogHandler(
-            log_group="/aws/elasticbeanstalk/bp-calculator-app",
-            stream_name="application",
-            boto3_client=boto3.client("logs", region_name=aws_region),
+    Args:
+        config: Settings overriding those read from the environment
+    """
+    app = Flask(__name__)
+    app.config.update(config_from_env())
+    app.config.update(config or {})
+    app.extensions[EXTENSION] = AppState(app)
+    if app.config["TEMPLATE_TRIM"]:
+        app.jinja_env.add_extension(TrimWhitespace)
+        app.jinja_env.trim_blocks = True
+        app.jinja_env.lstrip_blocks = True
+    app.jinja_env.bytecode_cache = template_bytecode_cache(app.config)
+
+    # Optional local log file, shipped through the same non-blocking pipeline
+    if app.config["LOG_FILE"]:
+        pipeline = pipeline_from_env(FileSink(app.config["LOG_FILE"]))
+        app.extensions[EXTENSION].pipelines["log_file"] = pipeline
+        app.logger.addHandler(QueueLogHandler(pipeline))
+
+    app.before_request(start_request_timer)
+    app.after_request(record_request_metrics)
+    app.after_request(compress_response)
+    app.after_request(add_server_timing)
+    app.add_url_rule("/", view_func=index, methods=["GET", "POST"])
+    app.add_url_rule("/api/classify", view_func=classify_api, methods=["POST"])
+    app.add_url_rule("/api/bulk", view_func=bulk_api, methods=["POST"])
+    app.add_url_rule("/metrics", view_func=metrics_endpoint)
+    app.add_url_rule("/history", view_func=history)
+    app.add_url_rule("/privacy", view_func=privacy)
+    app.add_url_rule("/tips", view_func=health_tips)
+    app.add_url_rule("/favicon.ico", view_func=favicon)
+    app.add_url_rule("/assets/<path:filename>", view_func=asset)
+    app.add_template_global(asset_urls)
+    app.register_error_handler(404, not_found_error)
+    app.register_error_handler(500, internal_error)
+    if app.config["PROFILE_SAMPLE_RATE"] > 0 or app.config["PROFILE_TOKEN"]:
+        app.wsgi_app = Profiler(
+            app.wsgi_app,
+            app.config["PROFILE_DIR"],
+            rate=app.config["PROFILE_SAMPLE_RATE"],
+            token=app.config["PROFILE_TOKEN"],
+            header=app.config["PROFILE_HEADER"],
+            interval=app.config["PROFILE_INTERVAL"],
+            max_files=app.config["PROFILE_MAX_FILES"],
         )
-        logger.addHandler(cloudwatch_handler)
-        app.logger.addHandler(cloudwatch_handler)
+    # Probes are answered before Flask: no session, CSRF token or template
+    app.wsgi_app = HealthChecks(
+        app.wsgi_app,
+        lambda: readiness_problems(app),
+        interval=app.config["READY_CHECK_INTERVAL"],
+    )
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(assets_command)
+    app.cli.add_command(compile_templates_command)
+    return app
+
+
+def template_bytecode_cache(config) -> FileSystemBytecodeCache:
+    """
+    On-disk cache of compiled templates, shared by every worker and kept
+    across restarts; entries are checked against the template source.
+    """
+    # Trimming changes the compiled code of an unchanged source
+    trim = ".trim" if config["TEMPLATE_TRIM"] else ""
+    directory = config["TEMPLATE_CACHE_DIR"]
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory, f"__bp_jinja_%s{trim}.cache")
+
+
+def readiness_problems(app) -> list:
+    """Reasons this worker should not receive traffic (empty when ready)"""
+    state = app.extensions[EXTENSION]
+    problems = []
+    if not state.warmed_up:
+        problems.append("warming up")
+    for name, pipeline in state.pipelines.items():
+        if pipeline.depth >= pipeline.max_queue * app.config["READY_MAX_QUEUE"]:
+            problems.append(f"{name} queue at {pipeline.depth}/{pipeline.max_queue}")
+    if state.history is not None and not state.history.ping():
+        problems.append("history store unreachable")
+    return problems
+
+
+def warm_up(app):
+    """
+    Build the read-only structures every worker uses.
+
+    Run in the gunicorn master before forking (preload_app) so workers share
+    the pages copy-on-write instead of each building its own; without
+    preloading, each worker runs it from init_worker(). Idempotent.
+    """
+    state = app.extensions[EXTENSION]
+    if state.warmed_up:
+        return
+    start = time.perf_counter()
+    category_table()
+    try:
+        _set_assets(state, load_or_build(app.static_folder, state.assets_dir))
+    except OSError as e:
+        app.logger.warning(f"Asset bundles unavailable, serving sources: {e}")
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
+    state.warmed_up = True
+    startup_timer.record("warm_up", time.perf_counter() - start)
+
+
+def init_worker(app):
+    """
+    Per-process start-up, run in each worker after the fork.
+
+    Forgets metrics recorded by the master and starts the worker's own
+    telemetry clients, which must never be shared between processes.
+    Runs once per process: a uvicorn worker under gunicorn gets both
+    post_fork and the ASGI startup event.
+    """
+    state = app.extensions[EXTENSION]
+    if state.worker_pid == os.getpid():
+        return
+    state.worker_pid = os.getpid()
+    start = time.perf_counter()
+    warm_up(app)
+    warm_routes(app)
+    state.metrics.reset()
+    if state.telemetry is not None:
+        state.telemetry.start()
+    startup_timer.record("worker_init", time.perf_counter() - start)
+
+
+def warm_routes(app):
+    """
+    Render each GET route once, so a worker's first real request finds
+    routing, forms, page caches and templates already set up.
+
+    Runs per worker, after the fork: requests start the worker's telemetry.
+    """
+    start = time.perf_counter()
+    client = app.test_client()
+    for path in WARM_UP_PATHS:
+        client.get(path)
+    startup_timer.record("warm_routes", time.perf_counter() - start)
+
+
+def _state() -> AppState:
+    return current_app.extensions[EXTENSION]
+
+
+def _set_assets(state, manifest):
+    state.assets = (manifest or {}).get("assets", {})
+    state.asset_files = {entry["file"]: entry for entry in state.assets.values()}
+
+
+def asset_urls(name: str) -> list:
+    """URLs to load a bundle: its fingerprinted file, or its sources if unbuilt"""
+    state = _state()
+    if state.assets is None:
+        _set_assets(state, load_manifest(state.assets_dir))
+    entry = state.assets.get(name)
+    if entry is not None:
+        return [url_for("asset", filename=entry["file"])]
+    return [url_for("static", filename=source) for source in BUNDLES[name]]
+
+
+def asset(filename):
+    """A fingerprinted bundle, precompressed to suit Accept-Encoding"""
+    state = _state()
+    entry = state.asset_files.get(filename)
+    if entry is None:
+        abort(404)
+    encoding = choose_encoding(
+        request.headers.get("Accept-Encoding"), entry["encodings"]
+    )
+    response = send_from_directory(
+        state.assets_dir,
+        filename + (ENCODINGS[encoding] if encoding else ""),
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=ASSET_MAX_AGE,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.cache_control.immutable = True
+    return response
+
+
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.phases = Phases()
+
+
+def record_request_metrics(response):
+    start = g.pop("request_start", None)
+    if start is None:
+        return response
+    state = _state()
+    route = request.endpoint or ERROR_ROUTES.get(response.status_code, "unknown")
+    labels = (route, request.method, str(response.status_code))
+
+    def observe():
+        state.request_duration.observe(time.perf_counter() - start, *labels)
+        if state.metrics_files is not None:
+            state.metrics_files.maybe_write()
+
+    if response.is_streamed:
+        # Streamed bodies (classify_api, bulk_api) are produced after this
+        # returns; count the request once the server has sent all of it
+        response.call_on_close(observe)
+    else:
+        observe()
+    return response
+
+
+def add_server_timing(response):
+    """Per-phase durations of the request, for browser dev tools"""
+    phases = g.get("phases")
+    if phases is not None and current_app.config["SERVER_TIMING"]:
+        total = time.perf_counter() - g.request_start
+        response.headers["Server-Timing"] = phases.header(total)
+    return response
+
 
-        logger.info("AWS X-Ray and CloudWatch monitoring initialized successfully")
-        app.logger.info("AWS monitoring configured")
-    except Exception as e:
-        app.logger.warning(f"Failed to initialize AWS monitoring: {e}")
-else:
-    app.logger.warning("CLOUDWATCH_ENABLED not set to 'true' - AWS monitoring disabled")
+def _phase(name: str):
+    """Time a block as part of the request's Server-Timing phase name"""
+    return g.phases(name)
+
+
+def _event(event_type, message, level=logging.INFO, **fields):
+    """Record a request event (see EventLog.event), timed as the log phase"""
+    with _phase("log"):
+        _state().events.event(event_type, message, level, **fields)
+
+
+def compress_response(response):
+    compressor = _state().compressor
+    if compressor is None:
+        return response
+    return compressor.process(response, request.headers.get("Accept-Encoding"))
+
+
+def count_validation_failures(errors, source):
+    """Count each field with errors once"""
+    for field in errors:
+        _state().validation_failures.inc(field, source)
+
+
+def _rule_set():
+    """The request's rule set: ?rule_set=, else the tenant's, else RULE_SET"""
+    config = current_app.config
+    name = request.args.get("rule_set")
+    if name is None:
+        tenant = request.headers.get(config["TENANT_HEADER"])
+        name = config["TENANT_RULE_SETS"].get(tenant, config["RULE_SET"])
+    rule_set = _state().rule_sets.get(name)
+    if rule_set is None:
+        abort(400, f"Unknown rule set {name!r}")
+    return rule_set
 
 
-@app.route("/", methods=["GET", "POST"])
 def index():
-    form = BloodPressureForm()
+    state = _state()
+    rule_set = _rule_set()
+    with _phase("form"):
+        form = BloodPressureForm()
 
     if request.method == "GET":
         # Set initial values
         form.systolic.data = 100
         form.diastolic.data = 60
 
-    if form.validate_on_submit():
+    with _phase("validate"):
+        submitted = form.validate_on_submit()
+    if submitted:
         # Create BloodPressure object
         bp = BloodPressure(systolic=form.systolic.data, diastolic=form.diastolic.data)
 
         # Extra validation: Systolic must be greater than Diastolic
         if bp.systolic <= bp.diastolic:
-            form.systolic.errors.append("Systolic must be greater than Diastolic")
-            app.logger.warning(
-                f"Validation failed: systolic={bp.systolic} <= diastolic={bp.diastolic}"
+            form.systolic.errors.append(SYSTOLIC_NOT_GREATER)
+            count_validation_failures(["systolic"], "form")
+            _event(
+                "bp.validation_failed",
+                "Validation failed: systolic=%(systolic)s <= diastolic=%(diastolic)s",
+                logging.WARNING,
+                systolic=bp.systolic,
+                diastolic=bp.diastolic,
             )
         else:
             # Get the category
-            category = bp.category
-            app.logger.info(
-                f"BP calculated: systolic={bp.systolic}, diastolic={bp.diastolic}, category={category.value}"
-            )
-            return render_template(
-                "index.html",
-                form=form,
-                bp=bp,
-                category=category,
-                validated=True,
+            with _phase("classify"):
+                category = rule_set.classify(bp.systolic, bp.diastolic)
+            state.classifications.inc(category.name, "form")
+            _event(
+                "bp.classified",
+                "BP calculated: systolic=%(systolic)s, diastolic=%(diastolic)s, "
+                "category=%(category)s",
+                systolic=bp.systolic,
+                diastolic=bp.diastolic,
+                category=category.value,
             )
+            if state.history is not None:
+                with _phase("history"):
+                    state.history.add(
+                        _history_user(), bp.systolic, bp.diastolic, category.base
+                    )
+            with _phase("render"):
+                return _render_result(form, bp, category, rule_set.name)
+    elif form.errors:
+        count_validation_failures(form.errors, "form")
+        _event(
+            "bp.validation_failed",
+            "Validation failed: %(errors)s",
+            logging.WARNING,
+            errors=form.errors,
+        )
+
+    with _phase("render"):
+        return render_template(
+            "index.html", form=form, bp=None, category=None, validated=False
+        )
+
+
+def _render_result(form, bp, category, rule_set):
+    """Render a successful result, through the result cache when enabled"""
+    size = current_app.config["INDEX_CACHE_SIZE"]
+    # Only cache canonical input; the form echoes the raw submitted text
+    canonical = form.systolic.raw_data == [str(bp.systolic)] and (
+        form.diastolic.raw_data == [str(bp.diastolic)]
+    )
+    if size <= 0 or not canonical:
+        return render_template(
+            "index.html", form=form, bp=bp, category=category, validated=True
+        )
+
+    index_cache = _state().index_cache
+    if index_cache.maxsize != size:
+        index_cache.resize(size)
+    token = form.csrf_token.current_token if form.meta.csrf else None
+    key = (bp.systolic, bp.diastolic, rule_set, token is not None)
+    page = index_cache.get(key)
+    if page is None:
+        html = render_template(
+            "index.html", form=form, bp=bp, category=category, validated=True
+        )
+        index_cache.put(key, TokenizedPage(html, token))
+        return html
+    return page.render(token)
+
+
+NDJSON_MIMETYPES = {"application/x-ndjson", "application/jsonl"}
+
+
+def classify_api():
+    """
+    Classify many readings in one request.
+
+    Accepts newline-delimited JSON (one reading per line) or a JSON array of
+    readings; each reading is {"systolic": 120, "diastolic": 80} or
+    [120, 80]. Results are streamed back in the same framing, one per
+    reading, so memory stays flat regardless of batch size. Categories come
+    from the request's rule set (?rule_set=name or the tenant's).
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        items, encode = iter_ndjson(request.stream), ndjson_lines
+        mimetype = "application/x-ndjson"
+    elif request.mimetype == "application/json":
+        try:
+            items = iter_json_array(request.stream)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        encode, mimetype = json_array_chunks, "application/json"
+    else:
+        return {"error": "Send application/x-ndjson or application/json"}, 415
+
+    results = stream_with_context(encode(_classify_items(items, _rule_set())))
+    return Response(results, mimetype=mimetype)
+
+
+def _classify_items(items, rule_set):
+    """Validate and classify decoded readings, yielding one result each"""
+    count = 0
+    try:
+        for item in items:
+            yield _classify_item(count, item, rule_set)
+            count += 1
+    except ValueError as e:
+        yield {"index": count, "category": None, "errors": {"request": [str(e)]}}
+    current_app.logger.info(f"Batch classification streamed {count} readings")
+
+
+def _classify_item(index, item, rule_set):
+    """Result record for a single decoded reading"""
+    systolic = diastolic = None
+    if isinstance(item, MalformedItem):
+        errors = {"reading": [item.error]}
+    elif isinstance(item, dict):
+        systolic, diastolic = item.get("systolic"), item.get("diastolic")
+        values, errors = validate_reading(systolic, diastolic)
+    elif isinstance(item, list) and len(item) == 2:
+        systolic, diastolic = item
+        values, errors = validate_reading(systolic, diastolic)
+    else:
+        errors = {"reading": ["Expected systolic and diastolic values"]}
+
+    category = None
+    if errors:
+        count_validation_failures(errors, "api")
+    else:
+        category = rule_set.classify(values["systolic"], values["diastolic"])
+        _state().classifications.inc(category.name, "api")
+        category = category.value
+    return {
+        "index": index,
+        "systolic": systolic,
+        "diastolic": diastolic,
+        "category": category,
+        "errors": errors,
+    }
+
+
+def _text_stream(stream):
+    """An uploaded CSV as text; undecodable bytes fail their row, not the file"""
+    return io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+
+
+def bulk_api():
+    """
+    Classify an uploaded CSV or Parquet file of readings.
 
+    Takes a multipart "file" upload (Parquet when named *.parquet) or a
+    text/csv request body with systolic and diastolic columns, and streams
+    back the same rows as CSV with category and errors columns appended.
+    """
+    upload = request.files.get("file")
+    try:
+        if upload is not None and upload.filename.lower().endswith(".parquet"):
+            header, columns, chunks = read_parquet(upload.stream)
+        elif upload is not None:
+            text = _text_stream(upload.stream)
+            header, columns, chunks = read_csv(text)
+        elif request.mimetype == "text/csv":
+            text = _text_stream(request.stream)
+            header, columns, chunks = read_csv(text)
+        else:
+            return {"error": "Upload a file or send text/csv"}, 415
+    except (RuntimeError, ValueError) as e:
+        return {"error": str(e)}, 400
+
+    def generate():
+        stats = BulkStats()
+        yield from annotate(
+            header, columns, chunks, current_app.config["BULK_WORKERS"], stats
+        )
+        state = _state()
+        for category, count in stats.categories.items():
+            state.classifications.inc(BPCategory(category).name, "bulk", amount=count)
+        if stats.invalid:
+            state.validation_failures.inc("reading", "bulk", amount=stats.invalid)
+        current_app.logger.info(
+            f"Bulk classification streamed {stats.rows} rows ({stats.invalid} invalid)"
+        )
+        if stats.error:
+            current_app.logger.warning(f"Bulk classification stopped: {stats.error}")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="classified.csv"'},
+    )
+
+
+def metrics_endpoint():
+    """Prometheus scrape endpoint, merged across workers when METRICS_DIR is set"""
+    state = _state()
+    files = state.metrics_files
+    snapshot = files.merged() if files is not None else None
+    return Response(
+        state.metrics.render(snapshot), mimetype="text/plain; version=0.0.4"
+    )
+
+
+def _history_user(create: bool = True):
+    """Anonymous id kept in the (signed) session cookie"""
+    if "history_user" not in session and create:
+        session["history_user"] = uuid.uuid4().hex
+        session.permanent = True
+    return session.get("history_user")
+
+
+def history():
+    """Readings, category counts and trends over the last ?days (default 30)"""
+    store = _state().history
+    if store is None:
+        abort(404)
+    days = min(max(request.args.get("days", 30, type=int), 1), 365)
+    user = _history_user(create=False)
+    since = time.time() - days * DAY
+    readings = store.recent(user, since) if user else []
+    counts = store.category_counts(user, since) if user else {}
+    trend = store.daily_trend(user, since) if user else []
+    for row in readings + trend:
+        ts = row.get("ts", row.get("day"))
+        row["date"] = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
     return render_template(
-        "index.html", form=form, bp=None, category=None, validated=False
+        "history.html", days=days, readings=readings, counts=counts, trend=trend
     )
 
 
-@app.route("/privacy")
+@click.command("migrate")
+@with_appcontext
+def migrate_command():
+    """Create or upgrade the reading history database (HISTORY_DB)"""
+    path = current_app.config["HISTORY_DB"]
+    if not path:
+        click.echo("HISTORY_DB is not set; nothing to migrate")
+        return
+    conn = connect(path)
+    try:
+        applied = migrate(conn)
+        click.echo(
+            f"Applied {applied} migration(s); schema version {schema_version(conn)}"
+        )
+    finally:
+        conn.close()
+
+
+@click.command("assets")
+@with_appcontext
+def assets_command():
+    """Build the fingerprinted, precompressed asset bundles"""
+    state = _state()
+    _set_assets(state, load_or_build(current_app.static_folder, state.assets_dir))
+    for name, entry in state.assets.items():
+        click.echo(f"{name} -> {entry['file']} ({', '.join(entry['encodings'])})")
+
+
+@click.command("compile-templates")
+@with_appcontext
+def compile_templates_command():
+    """Compile every template into the shared bytecode cache"""
+    env = current_app.jinja_env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    click.echo(f"Compiled {len(names)} templates")
+
+
 def privacy():
     return render_template("privacy.html")
 
 
-@app.route("/tips")
-def health_tips():
-    """Health Tips - New Feature"""
-    # Get tips for all categories using string keys for template
-    bp_low = BloodPressure(80, 50)
-    bp_ideal = BloodPressure(110, 70)
-    bp_pre_high = BloodPressure(130, 85)
-    bp_high = BloodPressure(150, 95)
+@lru_cache(maxsize=256)
+def tips_html(tips: tuple) -> Markup:
+    """A tuple of tips as escaped <li> items, built once per distinct tuple"""
+    return Markup("").join(
+        Markup('<li class="list-group-item">%s</li>\n') % escape(tip) for tip in tips
+    )
+
 
+def _render_health_tips(locale):
+    """Render the tips page for every category in a locale"""
+    table = _state().tips.current().resolve(locale)[1]
     tips_by_category = {
-        "Low Blood Pressure": HealthTips.get_tips(bp_low.category),
-        "Ideal Blood Pressure": HealthTips.get_tips(bp_ideal.category),
-        "Pre-High Blood Pressure": HealthTips.get_tips(bp_pre_high.category),
-        "High Blood Pressure": HealthTips.get_tips(bp_high.category),
+        title: tips_html(table[category]) for title, category in TIPS_PAGE_SECTIONS
     }
-    app.logger.info("Health tips page accessed")
     return render_template("health_tips.html", tips_by_category=tips_by_category)
 
 
-@app.route("/favicon.ico")
+def _health_tips_fingerprint(app, locale):
+    """Inputs of the tips page: the catalogue files and (in debug) the templates"""
+    return (
+        app.extensions[EXTENSION].tips.current().version,
+        template_fingerprint(app, ("health_tips.html", "layout.html")),
+    )
+
+
+def health_tips():
+    """Health tips in the locale best matching Accept-Language"""
+    _event("tips.viewed", "Health tips page accessed")
+    state = _state()
+    locale = state.tips.current().resolve(request.headers.get("Accept-Language"))[0]
+    with _phase("render"):
+        response = state.tips_cache.response(locale)
+    response.headers["Content-Language"] = locale.replace("_", "-")
+    response.vary.add("Accept-Language")
+    return response
+
+
 def favicon():
     """Return 204 No Content for favicon requests"""
     return "", 204
 
 
-@app.errorhandler(404)
 def not_found_error(error):
     """Handle 404 errors"""
-    import uuid
-
     request_id = str(uuid.uuid4())[:8]
     return render_template("error.html", request_id=request_id), 404
 
 
-@app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    import uuid
-
     request_id = str(uuid.uuid4())[:8]
     return render_template("error.html", request_id=request_id), 500
 
 
+app = create_app()
+# Objects of the default application, for scripts and tests
+_default = app.extensions[EXTENSION]
+events = _default.events
+index_cache = _default.index_cache
+tips_cache = _default.tips_cache
+metrics = _default.metrics
+telemetry = _default.telemetry
+
+startup_timer.mark("app_creation")
+app.logger.info(f"Startup timings: {startup_timer.summary()}")
+
 if __name__ == "__main__":
+    warm_up(app)
     app.run(debug=(MODE != "prod"), host=HOST, port=PORT)
@@ -0,0 +1,21 @@
+"""ASGI entry point for BP Calculator
+
+Serves the same application as app.py under an async server, e.g.
+    gunicorn -k uvicorn.workers.UvicornWorker --config gunicorn.conf.py asgi:application
+or
+    uvicorn asgi:application
+"""
+
+import os
+
+from app import app, init_worker
+from services.asgi import WsgiToAsgi
+from services.log_pipeline import close_all
+
+application = WsgiToAsgi(
+    app,
+    # Requests handled at once per worker; idle connections cost no thread
+    max_threads=int(os.environ.get("ASGI_THREADS", 40)),
+    on_startup=lambda: init_worker(app),
+    on_shutdown=close_all,
+)
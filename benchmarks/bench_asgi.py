@@ -0,0 +1,139 @@
+"""Compare sync (WSGI) and async (ASGI) serving under slow clients
+
+Starts gunicorn on localhost with sync workers (app:app), then with uvicorn
+workers (asgi:application), and in each case runs fast clients alongside
+slow clients. Fast clients request pages in a loop. Slow clients send a
+POST body one byte at a time. A sync worker is stuck for as long as it
+reads a slow body; an async worker is not.
+
+Run from the project root (the async mode needs uvicorn installed):
+    python benchmarks/bench_asgi.py [seconds] [workers] [fast] [slow]
+"""
+
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOST, PORT = "127.0.0.1", 8766
+PATHS = ("/", "/tips", "/privacy")
+
+MODES = {
+    "sync": ["--worker-class=sync", "app:app"],
+    "async": ["--worker-class=uvicorn.workers.UvicornWorker", "asgi:application"],
+}
+
+
+def start_server(mode, workers):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            f"--bind={HOST}:{PORT}",
+            f"--workers={workers}",
+            *MODES[mode],
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            url = f"http://{HOST}:{PORT}/privacy"
+            urllib.request.urlopen(url, timeout=1).read()  # nosec B310
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def fast_client(stop, latencies, errors):
+    i = 0
+    while not stop.is_set():
+        url = f"http://{HOST}:{PORT}{PATHS[i % len(PATHS)]}"
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(url, timeout=10).read()  # nosec B310
+            latencies.append((time.perf_counter() - start) * 1000)
+        except OSError:
+            errors.append(url)
+        i += 1
+
+
+def slow_client(stop, interval=0.2):
+    """Keep a POST open by sending its 1 kB body a byte at a time"""
+    headers = (
+        "POST / HTTP/1.1\r\n"
+        f"Host: {HOST}\r\n"
+        "Content-Type: application/x-www-form-urlencoded\r\n"
+        "Content-Length: 1024\r\n\r\n"
+    ).encode("ascii")
+    while not stop.is_set():
+        try:
+            with socket.create_connection((HOST, PORT), timeout=5) as sock:
+                sock.sendall(headers)
+                for _ in range(1024):
+                    if stop.wait(interval):
+                        break
+                    sock.sendall(b"a")
+        except OSError:
+            stop.wait(interval)
+
+
+def run(mode, seconds, workers, fast, slow):
+    server = start_server(mode, workers)
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=slow_client, args=(stop,)) for _ in range(slow)
+    ] + [
+        threading.Thread(target=fast_client, args=(stop, latencies, errors))
+        for _ in range(fast)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+    return latencies, errors
+
+
+def percentile(values, pct):
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+def main():
+    defaults = [10, 2, 16, 8]
+    args = [int(arg) for arg in sys.argv[1:]]
+    seconds, workers, fast, slow = args + defaults[len(args) :]
+    print(f"{seconds}s, {workers} workers, {fast} fast clients, {slow} slow clients")
+    print(f"{'mode':<6} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+    for mode in MODES:
+        latencies, errors = run(mode, seconds, workers, fast, slow)
+        print(
+            f"{mode:<6} {len(latencies) / seconds:8.1f} "
+            f"{percentile(latencies, 50):7.1f}ms {percentile(latencies, 95):7.1f}ms "
+            f"{percentile(latencies, 99):7.1f}ms {len(errors):7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measure requests and bytes per page view, with and without asset bundles
+
+Renders each page through the test client, then fetches every stylesheet
+and script it links the way a browser would (Accept-Encoding: gzip, br),
+once from the source files and once from the built bundles.
+
+Run from the project root:
+    python benchmarks/bench_assets.py
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, warm_up  # noqa: E402
+
+PAGES = ("/", "/tips", "/privacy")
+LINKS = re.compile(r'(?:href|src)="(/(?:static|assets)/[^"]+\.(?:css|js))"')
+HEADERS = {"Accept-Encoding": "gzip, br"}
+
+
+def page_view(client, path):
+    """(requests, bytes on the wire) for the page's stylesheets and scripts"""
+    urls = LINKS.findall(client.get(path).get_data(as_text=True))
+    size = sum(len(client.get(url, headers=HEADERS).data) for url in urls)
+    return len(urls), size
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        unbuilt = create_app({"ASSETS_DIR": os.path.join(directory, "none")})
+        built = create_app({"ASSETS_DIR": os.path.join(directory, "dist")})
+        warm_up(built)
+        print(f"{'page':<10} {'sources':>18} {'bundles':>18}")
+        for path in PAGES:
+            before = page_view(unbuilt.test_client(), path)
+            after = page_view(built.test_client(), path)
+            print(
+                f"{path:<10} {before[0]:3d} req {before[1] / 1024:7.1f} KiB "
+                f"{after[0]:3d} req {after[1] / 1024:7.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
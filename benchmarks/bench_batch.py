@@ -0,0 +1,56 @@
+"""Benchmark batch classification against the per-object BloodPressure path
+
+Run from the project root:
+    python benchmarks/bench_batch.py [readings]
+"""
+
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.batch import classify_batch  # noqa: E402
+from models.blood_pressure import BloodPressure  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def timed(label, func, count):
+    """Run func once and print throughput"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms {count / elapsed:14,.0f} readings/s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(42)
+    systolic = array("h", (rng.randint(60, 200) for _ in range(count)))
+    diastolic = array("h", (rng.randint(30, 110) for _ in range(count)))
+
+    def per_object():
+        for s, d in zip(systolic, diastolic):
+            bp = BloodPressure(s, d)
+            bp.category
+            bp.is_valid()
+
+    print(f"Classifying {count:,} readings")
+    timed("BloodPressure per object", per_object, count)
+    timed("classify_batch (array)", lambda: classify_batch(systolic, diastolic), count)
+    if np is not None:
+        s_np = np.frombuffer(systolic, dtype=np.int16)
+        d_np = np.frombuffer(diastolic, dtype=np.int16)
+        timed("classify_batch (numpy)", lambda: classify_batch(s_np, d_np), count)
+    else:
+        print("numpy not installed - skipping vectorized path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark the slotted BloodPressure against the previous __dict__ class
+
+LegacyBloodPressure below reproduces the class as it was before it gained
+__slots__: a per-instance __dict__ and a category recomputed on every
+access. Reports memory per million readings (tracemalloc) and construction
+and attribute access times.
+
+Run from the project root:
+    python benchmarks/bench_bp_model.py
+"""
+
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.blood_pressure import BloodPressure, classify  # noqa: E402
+
+MILLION = 1_000_000
+NUMBER = 500_000
+
+
+class LegacyBloodPressure:
+    def __init__(self, systolic, diastolic):
+        self.systolic = systolic
+        self.diastolic = diastolic
+
+    @property
+    def category(self):
+        return classify(self.systolic, self.diastolic)
+
+
+def mib_per_million(cls):
+    """Memory held by a million instances, excluding the list holding them"""
+    readings = [(90 + i % 100, 50 + i % 40) for i in range(MILLION)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(s, d) for s, d in readings]
+    held = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(instances)
+    tracemalloc.stop()
+    del instances
+    return held / 1024 / 1024
+
+
+def ns_per_op(stmt, **names):
+    """Best-of-5 nanoseconds per operation"""
+    best = min(timeit.repeat(stmt, globals=names, number=NUMBER, repeat=5))
+    return best / NUMBER * 1e9
+
+
+def main():
+    print(f"{'':<26} {'legacy':>10} {'slotted':>10}")
+    legacy, slotted = (
+        mib_per_million(cls) for cls in (LegacyBloodPressure, BloodPressure)
+    )
+    print(f"{'MiB per 1M readings':<26} {legacy:10.1f} {slotted:10.1f}")
+    for label, stmt in (
+        ("construct (ns)", "cls(130, 85)"),
+        ("systolic (ns)", "bp.systolic"),
+        ("category (ns)", "bp.category"),
+        ("construct + category (ns)", "cls(130, 85).category"),
+    ):
+        row = [
+            ns_per_op(stmt, cls=cls, bp=cls(130, 85))
+            for cls in (LegacyBloodPressure, BloodPressure)
+        ]
+        print(f"{label:<26} {row[0]:10.1f} {row[1]:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark bulk CSV classification throughput and memory
+
+Writes synthetic CSV files (about 5% invalid rows), then runs
+"python -m services.bulk" on them with one worker and with one per CPU,
+reporting rows/s and the peak resident memory of the run. The peak stays
+flat as the file grows because only a few chunks are held at a time.
+
+Run from the project root:
+    python benchmarks/bench_bulk.py [rows]
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_csv(path, rows):
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("patient_id,taken_at,systolic,diastolic\n")
+        for i in range(rows):
+            systolic, diastolic = rng.randint(65, 195), rng.randint(38, 102)
+            f.write(f"{i},2024-01-01T08:00:00,{systolic},{diastolic}\n")
+
+
+def run(path, workers):
+    """(rows/s, peak RSS in MiB) of one CLI run"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "services.bulk", path, "-o", os.devnull]
+        + ["--workers", str(workers)],
+        cwd=ROOT,
+        stderr=subprocess.DEVNULL,
+    )
+    _, _, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = 0  # reaped by wait4
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    cpus = os.cpu_count() or 1
+    print(f"{'rows':>10} {'workers':>8} {'rows/s':>10} {'peak RSS':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (rows // 10, rows):
+            path = os.path.join(directory, f"readings-{count}.csv")
+            write_csv(path, count)
+            for workers in sorted({1, cpus}):
+                elapsed, peak = run(path, workers)
+                print(
+                    f"{count:10d} {workers:8d} {count / elapsed:10.0f} "
+                    f"{peak:7.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
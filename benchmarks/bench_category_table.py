@@ -0,0 +1,45 @@
+"""Microbenchmark the category lookup table against the rule-based path
+
+Run from the project root:
+    python benchmarks/bench_category_table.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.blood_pressure import (  # noqa: E402
+    BloodPressure,
+    category_table,
+    classify,
+    classify_rules,
+)
+
+# One reading per category, plus an out-of-range and a float reading
+READINGS = [(85, 55), (110, 70), (130, 85), (150, 95), (200, 50), (119.5, 79.5)]
+NUMBER = 200_000
+
+
+def ns_per_op(stmt, number=NUMBER, **names):
+    """Best-of-5 nanoseconds per call"""
+    best = min(timeit.repeat(stmt, globals=names, number=number, repeat=5))
+    return best / number * 1e9
+
+
+def main():
+    build = ns_per_op("CategoryTable()", 20, CategoryTable=type(category_table()))
+    print(f"table build: {build / 1000:.1f} us ({len(category_table().cells)} cells)")
+    print(f"{'reading':<14} {'rules ns':>10} {'table ns':>10} {'property ns':>12}")
+    for systolic, diastolic in READINGS:
+        names = dict(s=systolic, d=diastolic, bp=BloodPressure(systolic, diastolic))
+        rules = ns_per_op("rules(s, d)", rules=classify_rules, **names)
+        table = ns_per_op("table(s, d)", table=classify, **names)
+        prop = ns_per_op("bp.category", **names)
+        label = f"{systolic}/{diastolic}"
+        print(f"{label:<14} {rules:10.1f} {table:10.1f} {prop:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""CPU cost against bytes saved for each response compression setting
+
+Renders the main pages (with and without template trimming), then times
+gzip and brotli at several levels on each body: microseconds per response
+and compressed size. The Compressor defaults are gzip 5 and brotli 4.
+
+Run from the project root:
+    python benchmarks/bench_compression.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from services.compression import Compressor  # noqa: E402
+
+PAGES = ("/", "/tips", "/privacy")
+SETTINGS = [("gzip", level) for level in (1, 5, 6, 9)] + [
+    ("br", quality) for quality in (1, 4, 6, 11)
+]
+
+
+def us_per_call(func, number=50):
+    """Best-of-5 microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    bodies = {}
+    for trim in (False, True):
+        client = create_app({"TEMPLATE_TRIM": trim}).test_client()
+        for path in PAGES:
+            bodies[path, trim] = client.get(path).data
+
+    print(
+        f"{'page':<9} {'trim':<5} {'raw':>6} "
+        + " ".join(f"{f'{name}-{level}':>13}" for name, level in SETTINGS)
+    )
+    for (path, trim), body in bodies.items():
+        cells = []
+        for name, level in SETTINGS:
+            compressor = Compressor(gzip_level=level, brotli_quality=level)
+            size = len(compressor.compress(body, name))
+            cost = us_per_call(lambda: compressor.compress(body, name))
+            cells.append(f"{size:6d}B {cost:4.0f}us")
+        print(f"{path:<9} {str(trim):<5} {len(body):6d} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
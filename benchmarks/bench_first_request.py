@@ -0,0 +1,59 @@
+"""Benchmark a worker's first request with and without init_worker()
+
+A cold app compiles its templates and builds its caches on the first
+request; a warmed one (init_worker(), as gunicorn's post_fork runs it)
+has done that before serving. Each trial builds fresh applications with
+their own template cache directory, and the median of the trials is
+reported.
+
+Run from the project root:
+    python benchmarks/bench_first_request.py [trials]
+"""
+
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, init_worker  # noqa: E402
+
+
+def make_app(directory):
+    app = create_app(
+        {
+            "TESTING": True,
+            "TEMPLATE_CACHE_DIR": os.path.join(directory, "templates"),
+            "ASSETS_DIR": os.path.join(directory, "assets"),
+        }
+    )
+    app.logger.setLevel(logging.WARNING)
+    return app
+
+
+def first_request_ms(app) -> float:
+    start = time.perf_counter()
+    assert app.test_client().get("/").status_code == 200
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cold, warm = [], []
+    for _ in range(trials):
+        with tempfile.TemporaryDirectory() as directory:
+            cold.append(first_request_ms(make_app(os.path.join(directory, "cold"))))
+            app = make_app(os.path.join(directory, "warm"))
+            init_worker(app)
+            warm.append(first_request_ms(app))
+
+    cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+    print(f"{'cold first request':<24} {cold_ms:8.2f} ms")
+    print(f"{'after init_worker':<24} {warm_ms:8.2f} ms ({cold_ms / warm_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
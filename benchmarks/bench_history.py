@@ -0,0 +1,77 @@
+"""Benchmark reading-history writes and per-user trend queries
+
+Fills a fresh SQLite file through HistoryStore (batched background writes),
+spreading readings over a year for many users, then times the queries the
+history page runs for random users over a 30-day window.
+
+Run from the project root:
+    python benchmarks/bench_history.py [rows] [users]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.blood_pressure import classify  # noqa: E402
+from services.history import DAY, HistoryStore  # noqa: E402
+
+NOW = int(time.time())
+
+
+def fill(store, rows, users):
+    rng = random.Random(7)
+    start = time.perf_counter()
+    for _ in range(rows):
+        systolic, diastolic = rng.randint(90, 170), rng.randint(50, 89)
+        store.add(
+            f"user-{rng.randrange(users)}",
+            systolic,
+            diastolic,
+            classify(systolic, diastolic),
+            ts=NOW - rng.randrange(365 * DAY),
+        )
+    queued = time.perf_counter() - start
+    store.flush(timeout=600)
+    return queued, time.perf_counter() - start
+
+
+def time_queries(store, users, samples=500):
+    rng = random.Random(11)
+    since = NOW - 30 * DAY
+    timings = {"recent": [], "category_counts": [], "daily_trend": []}
+    for _ in range(samples):
+        user = f"user-{rng.randrange(users)}"
+        for name, latencies in timings.items():
+            start = time.perf_counter()
+            getattr(store, name)(user, since)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "history.db")
+        store = HistoryStore(path, batch_size=5000, max_queue=50000)
+        queued, written = fill(store, rows, users)
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"{rows} readings, {users} users, {size:.0f} MiB")
+        print(f"enqueue {rows / queued:10.0f} readings/s  (writer-bound)")
+        print(f"written {rows / written:10.0f} readings/s  (end to end)")
+        print(f"dropped {store.pipeline.dropped}")
+
+        print(f"{'query (30 days)':<16} {'p50':>8} {'p99':>8}")
+        for name, latencies in time_queries(store, users).items():
+            p99 = statistics.quantiles(latencies, n=100)[98]
+            print(f"{name:<16} {statistics.median(latencies):6.3f}ms {p99:6.3f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
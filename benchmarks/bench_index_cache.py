@@ -0,0 +1,60 @@
+"""Benchmark index POST latency with and without the result cache
+
+Replays a kiosk-like mix of common readings through the Flask test client
+with CSRF enabled and reports p50/p99 latency for each configuration.
+
+Run from the project root:
+    python benchmarks/bench_index_cache.py [requests]
+"""
+
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, index_cache  # noqa: E402
+
+COMMON_READINGS = [
+    (s, d) for s in range(110, 150, 5) for d in range(65, 95, 5) if s > d
+]
+
+
+def run(count, cache_size):
+    """POST count readings and return per-request latencies in ms"""
+    app.config["INDEX_CACHE_SIZE"] = cache_size
+    index_cache.clear()
+    client = app.test_client()
+    html = client.get("/").get_data(as_text=True)
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', html)[1]
+    rng = random.Random(7)
+
+    latencies = []
+    for _ in range(count):
+        systolic, diastolic = rng.choice(COMMON_READINGS)
+        data = {"systolic": systolic, "diastolic": diastolic, "csrf_token": token}
+        start = time.perf_counter()
+        client.post("/", data=data)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    app.logger.setLevel(logging.WARNING)
+    app.config["WTF_CSRF_ENABLED"] = True
+    for label, size in (("cache off", 0), ("cache on", 8000)):
+        latencies = run(count, size)
+        p50 = statistics.median(latencies)
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        print(
+            f"{label:<10} p50 {p50:6.3f} ms  p99 {p99:6.3f} ms  {index_cache.stats()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
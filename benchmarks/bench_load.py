@@ -0,0 +1,413 @@
+"""Open-loop load test of every route under gunicorn
+
+Starts gunicorn on localhost (or targets --url) and sends requests at a
+fixed average arrival rate, whatever the server's response times: arrivals
+are scheduled up front (Poisson by default) and each latency is measured
+from the request's scheduled time, so queueing in front of a slow server
+counts against it instead of being hidden by waiting clients.
+
+The request mix covers GET and POST / (valid readings, and invalid ones:
+systolic <= diastolic, out of range, not a number, missing), /tips,
+/privacy and the 404 handler. POSTs carry a real session and CSRF token.
+
+Results (RPS, p50/p95/p99 per route and overall) are written as JSON to
+benchmarks/results/ named after the time and commit. --compare checks a
+run against an earlier one and exits 1 if latency or throughput regressed
+by more than --threshold.
+
+Run from the project root:
+    python benchmarks/bench_load.py --workers 2 --rate 100 --duration 30
+    python benchmarks/bench_load.py --compare latest --threshold 0.15
+"""
+
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import queue
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Request kind -> (method, path, expected status)
+KINDS = {
+    "index_get": ("GET", "/", 200),
+    "index_post_valid": ("POST", "/", 200),
+    "index_post_invalid": ("POST", "/", 200),
+    "tips": ("GET", "/tips", 200),
+    "privacy": ("GET", "/privacy", 200),
+    "not_found": ("GET", "/no-such-page", 404),
+}
+DEFAULT_MIX = (
+    "index_get=25,index_post_valid=30,index_post_invalid=10,"
+    "tips=15,privacy=10,not_found=10"
+)
+CSRF_TOKEN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+# A regression must also exceed this many milliseconds, so noise on
+# sub-millisecond routes does not fail a run
+MIN_REGRESSION_MS = 1.0
+# Samples a route needs before each percentile is compared at all
+MIN_SAMPLES = {"p50": 20, "p95": 100, "p99": 500}
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for entry in filter(None, value.split(",")):
+        kind, _, weight = entry.partition("=")
+        if kind.strip() not in KINDS:
+            raise ValueError(f"Unknown request kind {kind!r}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def reading(kind: str, rng: random.Random) -> dict:
+    """Form fields for a POST of the given kind"""
+    if kind == "index_post_valid":
+        systolic = rng.randint(91, 190)
+        return {
+            "systolic": systolic,
+            "diastolic": rng.randint(40, min(100, systolic - 1)),
+        }
+    return rng.choice(
+        [
+            {"systolic": 80, "diastolic": rng.randint(80, 100)},
+            {"systolic": rng.randint(191, 260), "diastolic": 80},
+            {"systolic": "abc", "diastolic": 80},
+            {"systolic": 120},
+        ]
+    )
+
+
+def schedule(rate, duration, mix, seed, arrivals="poisson"):
+    """Yield (offset seconds, kind, form) for every request of the run"""
+    rng = random.Random(seed)
+    kinds, weights = list(mix), list(mix.values())
+    offset = 0.0
+    while True:
+        offset += rng.expovariate(rate) if arrivals == "poisson" else 1 / rate
+        if offset >= duration:
+            return
+        kind = rng.choices(kinds, weights)[0]
+        form = reading(kind, rng) if KINDS[kind][0] == "POST" else None
+        yield offset, kind, form
+
+
+class Client:
+    """One simulated browser: its own cookies and CSRF token"""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self.token = None
+
+    def request(self, method, path, form=None) -> int:
+        data = None
+        if method == "POST":
+            if self.token is None:
+                self.token = self._fetch_token()
+            fields = dict(form or {}, csrf_token=self.token or "")
+            data = urllib.parse.urlencode(fields).encode()
+        try:
+            with self.opener.open(
+                self.base_url + path, data=data, timeout=self.timeout
+            ) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    def _fetch_token(self):
+        with self.opener.open(self.base_url + "/", timeout=self.timeout) as response:
+            match = CSRF_TOKEN.search(response.read().decode("utf-8", "replace"))
+        return match.group(1) if match else None
+
+
+def run_load(
+    base_url, rate, duration, warmup, mix, seed, concurrency, timeout, arrivals
+):
+    """
+    Drive the load and collect one (kind, latency seconds, ok) per request.
+
+    Requests scheduled during the warm-up period are sent but not recorded.
+    """
+    pending = queue.Queue()
+    samples = []
+    lock = threading.Lock()
+    start = time.perf_counter() + 0.5
+
+    def worker():
+        client = Client(base_url, timeout)
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            due, kind, form = item
+            method, path, expected = KINDS[kind]
+            try:
+                ok = client.request(method, path, form) == expected
+            except OSError:
+                ok = False
+            latency = time.perf_counter() - due
+            if due - start >= warmup:
+                with lock:
+                    samples.append((kind, latency, ok))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for offset, kind, form in schedule(rate, warmup + duration, mix, seed, arrivals):
+        due = start + offset
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((due, kind, form))
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)]
+
+
+def summarize(samples, duration) -> dict:
+    """Per-kind and overall count, errors, rps and latency percentiles (ms)"""
+    by_kind = defaultdict(list)
+    for kind, latency, ok in samples:
+        by_kind[kind].append((latency, ok))
+        by_kind["all"].append((latency, ok))
+    summary = {}
+    for kind, values in sorted(by_kind.items()):
+        latencies = sorted(latency * 1000 for latency, _ in values)
+        summary[kind] = {
+            "count": len(values),
+            "errors": sum(1 for _, ok in values if not ok),
+            "rps": len(values) / duration,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1],
+        }
+    return summary
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Regressions of current against baseline summaries, as messages"""
+    regressions = []
+    for kind, now in current.items():
+        before = baseline.get(kind)
+        if before is None:
+            continue
+        for key, samples in MIN_SAMPLES.items():
+            if min(now["count"], before["count"]) < samples:
+                continue
+            if (
+                now[key] > before[key] * (1 + threshold)
+                and now[key] - before[key] > MIN_REGRESSION_MS
+            ):
+                regressions.append(
+                    f"{kind} {key} {before[key]:.1f}ms -> {now[key]:.1f}ms"
+                )
+        if now["rps"] < before["rps"] * (1 - threshold):
+            regressions.append(f"{kind} rps {before['rps']:.1f} -> {now['rps']:.1f}")
+        error_rate = now["errors"] / now["count"]
+        if error_rate > before["errors"] / before["count"] + 0.01:
+            regressions.append(f"{kind} error rate {error_rate:.1%}")
+    return regressions
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, worker_class, port):
+    """gunicorn with the project config; returns once /readyz answers 200"""
+    app = "asgi:application" if "uvicorn" in worker_class else "app:app"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            f"--bind=127.0.0.1:{port}",
+            f"--workers={workers}",
+            f"--worker-class={worker_class}",
+            app,
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            url = f"http://127.0.0.1:{port}/readyz"
+            urllib.request.urlopen(url, timeout=1)  # nosec B310
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+
+def load_baseline(value: str, directory: str = RESULTS_DIR) -> dict:
+    """A stored result: a path, or "latest" for the newest in the directory"""
+    if value == "latest":
+        names = os.listdir(directory) if os.path.isdir(directory) else []
+        names = sorted(name for name in names if name.endswith(".json"))
+        if not names:
+            raise FileNotFoundError(f"No stored results in {directory}")
+        value = os.path.join(directory, names[-1])
+    with open(value, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_summary(summary):
+    print(
+        f"{'route':<20} {'count':>7} {'errors':>6} {'rps':>8} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+    for kind, row in summary.items():
+        print(
+            f"{kind:<20} {row['count']:7d} {row['errors']:6d} {row['rps']:8.1f} "
+            f"{row['p50']:6.1f}ms {row['p95']:6.1f}ms {row['p99']:6.1f}ms "
+            f"{row['max']:6.1f}ms"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--url", help="Target a running server instead")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-class", default="sync")
+    parser.add_argument("--rate", type=float, default=100, help="Requests/second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds measured")
+    parser.add_argument("--warmup", type=float, default=3, help="Seconds not measured")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=64, help="Client threads")
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--output-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", help='Stored result to compare with, or "latest"')
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.compare, args.output_dir) if args.compare else None
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        server = start_server(args.workers, args.worker_class, port)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        samples = run_load(
+            base_url.rstrip("/"),
+            args.rate,
+            args.duration,
+            args.warmup,
+            args.mix,
+            args.seed,
+            args.concurrency,
+            args.timeout,
+            args.arrivals,
+        )
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait(30)
+
+    summary = summarize(samples, args.duration)
+    print(
+        f"{args.rate:g} req/s offered for {args.duration:g}s, "
+        f"{args.workers} {args.worker_class} workers"
+    )
+    print_summary(summary)
+
+    now = datetime.now(timezone.utc)
+    commit = git_commit()
+    result = {
+        "time": now.isoformat(timespec="seconds"),
+        "commit": commit,
+        "settings": {
+            "workers": args.workers,
+            "worker_class": args.worker_class,
+            "rate": args.rate,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+            "arrivals": args.arrivals,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "cpus": os.cpu_count(),
+        },
+        "summary": summary,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{now:%Y%m%dT%H%M%SZ}-{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"saved {os.path.relpath(path, ROOT)}")
+
+    if baseline is not None:
+        if baseline["settings"] != result["settings"]:
+            print("warning: baseline was run with different settings")
+        regressions = compare(summary, baseline["summary"], args.threshold)
+        print(f"compared with {baseline['commit']} ({baseline['time']})")
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
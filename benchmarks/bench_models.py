@@ -0,0 +1,202 @@
+"""Microbenchmarks for the models package and the reading form
+
+Times each operation with timeit (best of --repeat runs, in ns/op) and
+measures its allocations with tracemalloc: objects and bytes still held
+per op when the results are kept, and the peak memory one op touches
+while it runs (temporaries included).
+
+--save writes the results as a baseline; --compare prints a report against
+one and exits 1 if an operation got slower than --threshold or now keeps
+more objects. Baselines record the Python version and CPU count, since
+timings only compare on the same machine.
+
+Run from the project root:
+    python benchmarks/bench_models.py --save
+    python benchmarks/bench_models.py --compare
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from forms import BloodPressureForm  # noqa: E402
+from models.blood_pressure import BloodPressure, BPCategory, classify  # noqa: E402
+from models.health_tips import HealthTips  # noqa: E402
+from models.tips_catalogue import TipsCatalogue  # noqa: E402
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baselines", "models.json"
+)
+
+
+def form_validate(data):
+    """A validate() of a posted BloodPressureForm (CSRF off)"""
+
+    def run():
+        return BloodPressureForm(meta={"csrf": False}).validate()
+
+    return run, data
+
+
+def cases() -> dict:
+    """Operation name -> zero-argument callable; form cases carry POST data"""
+    cached = BloodPressure(120, 80)
+    cached.category
+    invalid = BloodPressure(200, 30)
+    catalogue = TipsCatalogue()
+    return {
+        "BloodPressure.__init__": lambda: BloodPressure(120, 80),
+        "category (first access)": lambda: BloodPressure(120, 80).category,
+        "category (cached)": lambda: cached.category,
+        "is_valid (valid)": cached.is_valid,
+        "is_valid (invalid)": invalid.is_valid,
+        "classify": lambda: classify(120, 80),
+        "HealthTips.get_tips": lambda: HealthTips.get_tips(BPCategory.HIGH),
+        "HealthTips.tips": lambda: HealthTips.tips(BPCategory.HIGH),
+        "HealthTips.json_fragment": lambda: HealthTips.json_fragment(BPCategory.HIGH),
+        "TipsCatalogue.get": lambda: catalogue.get(BPCategory.HIGH, "en-GB,en;q=0.9"),
+        "BloodPressureForm valid": form_validate(
+            {"systolic": "120", "diastolic": "80"}
+        ),
+        "BloodPressureForm invalid": form_validate(
+            {"systolic": "abc", "diastolic": ""}
+        ),
+    }
+
+
+def ns_per_op(func, number, repeat) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def allocations(func, number=1000) -> dict:
+    """Objects and bytes kept per op, and the peak bytes of a single op"""
+    func()  # first-call caches are not per-op costs
+    gc.collect()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    kept = [None] * number  # allocated up front, so not counted
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        for i in range(number):
+            kept[i] = func()
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        diff = after.compare_to(before, "filename")
+        blocks = sum(stat.count_diff for stat in diff)
+        size = sum(stat.size_diff for stat in diff)
+        peaks = []
+        for _ in range(5):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return {
+        "allocs": max(blocks, 0) / number,
+        "bytes": max(size, 0) / number,
+        "peak": sorted(peaks)[len(peaks) // 2],
+    }
+
+
+def measure(number, repeat, only=None) -> dict:
+    app = create_app({"TESTING": True})
+    results = {}
+    for name, case in cases().items():
+        if only and only not in name:
+            continue
+        data = None
+        if isinstance(case, tuple):
+            case, data = case
+        with app.test_request_context("/", method="POST", data=data or {}):
+            results[name] = {
+                "ns": ns_per_op(case, number, repeat),
+                **allocations(case),
+            }
+    return results
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print the comparison; returns regression messages"""
+    regressions = []
+    print(
+        f"{'operation':<28} {'base ns':>9} {'ns/op':>9} {'change':>8} "
+        f"{'base allocs':>11} {'allocs':>7}"
+    )
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<28} {'-':>9} {now['ns']:9.1f} {'new':>8}")
+            continue
+        change = now["ns"] / before["ns"] - 1
+        print(
+            f"{name:<28} {before['ns']:9.1f} {now['ns']:9.1f} {change:+8.1%} "
+            f"{before['allocs']:11.2f} {now['allocs']:7.2f}"
+        )
+        if change > threshold:
+            regressions.append(f"{name}: {change:+.1%} ns/op")
+        if now["allocs"] > before["allocs"] + 0.5:
+            regressions.append(
+                f"{name}: {before['allocs']:.2f} -> {now['allocs']:.2f} allocs/op"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark the models")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Only operations whose name contains this")
+    parser.add_argument("--save", nargs="?", const=BASELINE, help="Write a baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, help="Baseline file")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    results = measure(args.number, args.repeat, args.only)
+    print(
+        f"{'operation':<28} {'ns/op':>9} {'allocs/op':>10} {'bytes/op':>9} "
+        f"{'peak B/op':>10}"
+    )
+    for name, row in results.items():
+        print(
+            f"{name:<28} {row['ns']:9.1f} {row['allocs']:10.2f} "
+            f"{row['bytes']:9.1f} {row['peak']:10d}"
+        )
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        if baseline["machine"] != machine():
+            print(f"warning: baseline is from {baseline['machine']}, not {machine()}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        status = 1 if regressions else 0
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"saved {args.save}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
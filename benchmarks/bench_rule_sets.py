@@ -0,0 +1,67 @@
+"""Benchmark each classification rule set
+
+For every bundled rule set (and those in RULE_SETS_DIR, if set) reports the
+load/validate/compile time, then the per-reading cost of the lookup table
+and of the generated evaluator, against classify() as the baseline.
+
+Run from the project root:
+    python benchmarks/bench_rule_sets.py
+"""
+
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.blood_pressure import classify  # noqa: E402
+from models.rules import RULE_SETS_DIR, load_rule_set, load_rule_sets  # noqa: E402
+
+NUMBER = 20
+READINGS = 10_000
+
+
+def ns_per_reading(func, readings):
+    """Best-of-5 nanoseconds per classified reading"""
+    systolic, diastolic = zip(*readings)
+    best = min(
+        timeit.repeat(
+            lambda: list(map(func, systolic, diastolic)), number=NUMBER, repeat=5
+        )
+    )
+    return best / NUMBER / len(readings) * 1e9
+
+
+def main():
+    directories = [RULE_SETS_DIR, *filter(None, [os.environ.get("RULE_SETS_DIR")])]
+    rng = random.Random(5)
+    integers = [(rng.randint(70, 190), rng.randint(40, 100)) for _ in range(READINGS)]
+    floats = [(s + 0.5, d + 0.5) for s, d in integers]
+
+    baseline = ns_per_reading(classify, integers)
+    print(f"classify() baseline: {baseline:.1f} ns/reading")
+    print(
+        f"{'rule set':<16} {'rules':>5} {'compile':>9} {'table ns':>9} "
+        f"{'evaluator ns':>13}"
+    )
+    for name, rule_set in sorted(load_rule_sets(*directories).items()):
+        path = next(
+            os.path.join(d, f"{name}.json")
+            for d in reversed(directories)
+            if os.path.exists(os.path.join(d, f"{name}.json"))
+        )
+        start = time.perf_counter()
+        load_rule_set(path)
+        compiled = (time.perf_counter() - start) * 1000
+        table = ns_per_reading(rule_set.classify, integers)
+        evaluator = ns_per_reading(rule_set.classify, floats)
+        print(
+            f"{name:<16} {len(rule_set.rules):5d} {compiled:7.1f}ms "
+            f"{table:9.1f} {evaluator:13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark /tips with and without the render cache
+
+Drives the WSGI app in-process through the Flask test client, so the
+numbers measure application work only (no network or gunicorn overhead).
+
+Run from the project root:
+    python benchmarks/bench_tips_cache.py [seconds]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, tips_cache  # noqa: E402
+
+
+def requests_per_second(client, seconds, before_request=None, headers=None):
+    """Issue GET /tips for the given time and return the request rate"""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if before_request:
+            before_request()
+        client.get("/tips", headers=headers)
+        count += 1
+    return count / seconds
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    app.logger.setLevel(logging.WARNING)
+    client = app.test_client()
+    etag = client.get("/tips").headers["ETag"]
+
+    uncached = requests_per_second(
+        client, seconds, before_request=tips_cache.invalidate
+    )
+    cached = requests_per_second(client, seconds)
+    conditional = requests_per_second(client, seconds, headers={"If-None-Match": etag})
+
+    print(f"{'render every request':<24} {uncached:10,.0f} req/s")
+    print(f"{'cached body':<24} {cached:10,.0f} req/s ({cached / uncached:.1f}x)")
+    print(
+        f"{'304 Not Modified':<24} {conditional:10,.0f} req/s ({conditional / uncached:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark gunicorn start-up time and memory per worker, with and without preload
+
+Starts gunicorn with each preload setting, waits until every worker has
+answered a request, then reads the workers' memory from
+/proc/<pid>/smaps_rollup (Linux only). PSS splits shared pages between the
+processes that map them, so it falls as more of the app is shared
+copy-on-write; USS is the memory each worker holds privately.
+
+Run from the project root:
+    python benchmarks/bench_workers.py [workers]
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+
+
+def children(pid):
+    path = f"/proc/{pid}/task/{pid}/children"
+    with open(path, encoding="ascii") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def memory_kb(pid):
+    """(PSS, USS) of a process in kB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def wait_ready(master, workers, timeout=60.0):
+    """Seconds until every worker has started and one request has succeeded"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if len(children(master.pid)) == workers:
+            try:
+                url = f"http://127.0.0.1:{PORT}/privacy"
+                urllib.request.urlopen(url).read()  # nosec B310
+                return time.perf_counter() - start
+            except OSError:
+                pass
+        time.sleep(0.02)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def run(preload, workers):
+    env = dict(os.environ, GUNICORN_PRELOAD=str(preload).lower())
+    master = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            f"--bind=127.0.0.1:{PORT}",
+            f"--workers={workers}",
+            "app:app",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        ready = wait_ready(master, workers)
+        # Let every worker serve a few pages so templates are in use everywhere
+        for _ in range(workers * 10):
+            for path in ("/", "/tips", "/privacy"):
+                url = f"http://127.0.0.1:{PORT}{path}"
+                urllib.request.urlopen(url).read()  # nosec B310
+        usage = [memory_kb(pid) for pid in children(master.pid)]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(30)
+    pss = sum(p for p, _ in usage) / len(usage)
+    uss = sum(u for _, u in usage) / len(usage)
+    return ready, pss, uss
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print(f"{workers} workers")
+    print(f"{'preload':<8} {'ready':>9} {'PSS/worker':>12} {'USS/worker':>12}")
+    for preload in (False, True):
+        ready, pss, uss = run(preload, workers)
+        print(
+            f"{str(preload):<8} {ready * 1000:7.0f}ms "
+            f"{pss / 1024:9.1f} MiB {uss / 1024:9.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ from flask_wtf import FlaskForm
 from wtforms import IntegerField, SubmitField
 from wtforms.validators import DataRequired, NumberRange
 
+from models.validation import FIELD_RANGES
+
 
 class BloodPressureForm(FlaskForm):
     """Form for Blood Pressure input"""
@@ -10,14 +12,14 @@ class BloodPressureForm(FlaskForm):
         "Systolic Value",
         validators=[
             DataRequired(),
-            NumberRange(min=70, max=190, message="Invalid Systolic Value"),
+            NumberRange(*FIELD_RANGES["systolic"]),
         ],
     )
     diastolic = IntegerField(
         "Diastolic Value",
         validators=[
             DataRequired(),
-            NumberRange(min=40, max=100, message="Invalid Diastolic Value"),
+            NumberRange(*FIELD_RANGES["diastolic"]),
         ],
     )
     submit = SubmitField("Calculate")
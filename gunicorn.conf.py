@@ -0,0 +1,40 @@
+"""Gunicorn configuration for BP Calculator"""
+
+import gc
+import os
+
+# Load the app once in the master so workers share its memory copy-on-write;
+# GUNICORN_PRELOAD=false loads it separately in every worker instead
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def on_starting(server):
+    """Start every deployment with empty per-worker metrics files"""
+    if os.environ.get("METRICS_DIR"):
+        from services.metrics import Registry, WorkerFiles
+
+        WorkerFiles(Registry(), os.environ["METRICS_DIR"]).clear()
+
+
+def when_ready(server):
+    """Pre-fork: build shared read-only state once in the master"""
+    if server.cfg.preload_app:
+        from app import app, warm_up
+
+        warm_up(app)
+        # Keep the collector from touching (and so copying) the shared objects
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Post-fork: per-worker metrics and telemetry clients"""
+    from app import app, init_worker
+
+    init_worker(app)
+
+
+def worker_exit(server, worker):
+    """Flush queued log records before the worker process goes away"""
+    from services.log_pipeline import close_all
+
+    close_all()
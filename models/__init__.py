@@ -1,5 +1,30 @@
 """Models package for BP Calculator"""
 
-from .blood_pressure import BloodPressure, BPCategory
+from .blood_pressure import (
+    BloodPressure,
+    BPCategory,
+    category_table,
+    classify,
+    classify_rules,
+)
+from .batch import CATEGORY_CODES, BatchResult, classify_batch
+from .rules import RuleSet, RuleSetError, load_rule_sets
+from .tips_catalogue import TipsCatalogue, TipsCatalogueError
+from .validation import validate_reading
 
-__all__ = ["BloodPressure", "BPCategory"]
+__all__ = [
+    "BloodPressure",
+    "BPCategory",
+    "category_table",
+    "classify",
+    "classify_rules",
+    "CATEGORY_CODES",
+    "BatchResult",
+    "classify_batch",
+    "RuleSet",
+    "RuleSetError",
+    "load_rule_sets",
+    "TipsCatalogue",
+    "TipsCatalogueError",
+    "validate_reading",
+]
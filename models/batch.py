@@ -0,0 +1,164 @@
+"""Batch classification for columns of blood pressure readings"""
+
+import sys
+from array import array
+
+from models.blood_pressure import (
+    BloodPressure,
+    BPCategory,
+    category_table,
+    classify_rules,
+)
+
+# Category codes used in batch results: CATEGORY_CODES[code] -> BPCategory
+CATEGORY_CODES = tuple(BPCategory)
+CODE_BY_CATEGORY = {category: code for code, category in enumerate(CATEGORY_CODES)}
+
+LOW_CODE = CODE_BY_CATEGORY[BPCategory.LOW]
+IDEAL_CODE = CODE_BY_CATEGORY[BPCategory.IDEAL]
+PRE_HIGH_CODE = CODE_BY_CATEGORY[BPCategory.PRE_HIGH]
+HIGH_CODE = CODE_BY_CATEGORY[BPCategory.HIGH]
+
+
+class BatchResult:
+    """Category codes and validity mask for a batch of readings"""
+
+    __slots__ = ("codes", "valid")
+
+    def __init__(self, codes, valid):
+        """
+        Args:
+            codes: One category code per reading (see CATEGORY_CODES)
+            valid: One flag per reading, true when both values are in range
+        """
+        self.codes = codes
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def categories(self):
+        """Iterate over the BPCategory of every reading"""
+        for code in self.codes:
+            yield CATEGORY_CODES[code]
+
+
+def classify_batch(systolic, diastolic) -> BatchResult:
+    """
+    Classify whole columns of readings at once.
+
+    Accepts NumPy arrays, array.array, any object exposing the buffer
+    protocol, or plain sequences. In-range integer readings are answered
+    from the category lookup table (gathered in one step for NumPy input);
+    the rest fall back to the guideline rules. No BloodPressure objects are
+    allocated.
+
+    Returns:
+        BatchResult: uint8 category codes and a validity mask matching
+        BloodPressure.validate_systolic/validate_diastolic
+    """
+    # NumPy is an optional accelerator and slow to import; an ndarray argument
+    # means the caller has already imported it
+    np = sys.modules.get("numpy")
+    if np is not None and (
+        isinstance(systolic, np.ndarray) or isinstance(diastolic, np.ndarray)
+    ):
+        return _classify_numpy(np.asarray(systolic), np.asarray(diastolic))
+
+    systolic = _as_column(systolic)
+    diastolic = _as_column(diastolic)
+    if len(systolic) != len(diastolic):
+        raise ValueError("systolic and diastolic columns must have the same length")
+
+    bp = BloodPressure
+    s_min, s_max = bp.SYSTOLIC_MIN, bp.SYSTOLIC_MAX
+    d_min, d_max = bp.DIASTOLIC_MIN, bp.DIASTOLIC_MAX
+    table = category_table()
+    table_codes = _table_codes(table)
+    index = table.index
+
+    codes = array("B", bytes(len(systolic)))
+    valid = array("B", bytes(len(systolic)))
+    for i, (s, d) in enumerate(zip(systolic, diastolic)):
+        cell = index(s, d) if type(s) is int and type(d) is int else None
+        if cell is not None:
+            codes[i] = table_codes[cell]
+            valid[i] = 1
+        else:
+            codes[i] = CODE_BY_CATEGORY[classify_rules(s, d)]
+            valid[i] = s_min <= s <= s_max and d_min <= d <= d_max
+    return BatchResult(codes, valid)
+
+
+_codes_cache = (None, None)
+
+
+def _table_codes(table) -> bytes:
+    """Category codes for every lookup table cell, rebuilt with the table"""
+    global _codes_cache
+    cached_table, codes = _codes_cache
+    if cached_table is not table:
+        codes = bytes(CODE_BY_CATEGORY[category] for category in table.cells)
+        _codes_cache = (table, codes)
+    return codes
+
+
+def _as_column(values):
+    """Return a sized, indexable view of a column without copying buffers"""
+    try:
+        return memoryview(values)
+    except TypeError:
+        pass
+    if not hasattr(values, "__len__"):
+        values = list(values)
+    return values
+
+
+def _classify_numpy(systolic, diastolic) -> BatchResult:
+    """Vectorized classification of NumPy columns"""
+    np = sys.modules["numpy"]
+    if systolic.shape != diastolic.shape:
+        raise ValueError("systolic and diastolic columns must have the same length")
+
+    bp = BloodPressure
+    valid = (
+        (systolic >= bp.SYSTOLIC_MIN)
+        & (systolic <= bp.SYSTOLIC_MAX)
+        & (diastolic >= bp.DIASTOLIC_MIN)
+        & (diastolic <= bp.DIASTOLIC_MAX)
+    )
+    if not (
+        np.issubdtype(systolic.dtype, np.integer)
+        and np.issubdtype(diastolic.dtype, np.integer)
+    ):
+        return BatchResult(_rule_codes_numpy(systolic, diastolic), valid)
+
+    # Integer columns: gather from the lookup table, whose domain is exactly
+    # the valid range, and only run the rules for the invalid readings.
+    table = category_table()
+    lookup = np.frombuffer(_table_codes(table), dtype=np.uint8).reshape(
+        table.systolic_span, table.diastolic_span
+    )
+    rows = np.clip(systolic - table.systolic_min, 0, table.systolic_span - 1)
+    cols = np.clip(diastolic - table.diastolic_min, 0, table.diastolic_span - 1)
+    codes = lookup[rows, cols]
+    if not valid.all():
+        invalid = ~valid
+        codes[invalid] = _rule_codes_numpy(systolic[invalid], diastolic[invalid])
+    return BatchResult(codes, valid)
+
+
+def _rule_codes_numpy(systolic, diastolic):
+    """Vectorized twin of classify_rules(); keep the rule order in sync"""
+    np = sys.modules["numpy"]
+    bp = BloodPressure
+    high = (systolic >= bp.HIGH_SYSTOLIC) | (diastolic >= bp.HIGH_DIASTOLIC)
+    low = (systolic < bp.LOW_SYSTOLIC) & (diastolic < bp.LOW_DIASTOLIC)
+    ideal = (systolic < bp.IDEAL_SYSTOLIC) & (diastolic < bp.IDEAL_DIASTOLIC)
+
+    # Assign in reverse priority so higher-priority rules overwrite lower ones
+    codes = np.full(systolic.shape, PRE_HIGH_CODE, dtype=np.uint8)
+    codes[ideal] = IDEAL_CODE
+    codes[low] = LOW_CODE
+    codes[high] = HIGH_CODE
+    return codes
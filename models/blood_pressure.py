@@ -9,15 +9,49 @@ class BPCategory(Enum):
     PRE_HIGH = "Pre-High Blood Pressure"
     HIGH = "High Blood Pressure"
 
+    @property
+    def base(self) -> "BPCategory":
+        """The category itself; rule-set categories (models.rules) map onto one"""
+        return self
+
+
+class _ThresholdMeta(type):
+    """Drops the category lookup table whenever a range or threshold changes"""
+
+    def __setattr__(cls, name, value):
+        super().__setattr__(name, value)
+        if name in TABLE_CONSTANTS:
+            invalidate_category_table()
+
+    def __delattr__(cls, name):
+        super().__delattr__(name)
+        if name in TABLE_CONSTANTS:
+            invalidate_category_table()
 
-class BloodPressure:
-    """Blood Pressure model with validation and category calculation"""
+
+class BloodPressure(metaclass=_ThresholdMeta):
+    """
+    Blood Pressure model with validation and category calculation.
+
+    Readings are immutable, hashable values; the category is computed on
+    first access and cached until a range or threshold constant changes.
+    """
+
+    __slots__ = ("systolic", "diastolic", "_category", "_generation")
 
     SYSTOLIC_MIN = 70
     SYSTOLIC_MAX = 190
     DIASTOLIC_MIN = 40
     DIASTOLIC_MAX = 100
 
+    # Category thresholds (mmHG)
+    HIGH_SYSTOLIC = 140
+    HIGH_DIASTOLIC = 90
+    LOW_SYSTOLIC = 90
+    LOW_DIASTOLIC = 60
+    IDEAL_SYSTOLIC = 120
+    IDEAL_DIASTOLIC = 80
+
     def __init__(self, systolic: int, diastolic: int):
         """
         Initialize BloodPressure with systolic and diastolic values
@@ -26,8 +60,32 @@ class BloodPressure:
             systolic: Systolic pressure in mmHG
             diastolic: Diastolic pressure in mmHG
         """
-        self.systolic = systolic
-        self.diastolic = diastolic
+        _set_systolic(self, systolic)
+        _set_diastolic(self, diastolic)
+        # No category yet: matches no table generation
+        _set_generation(self, -1)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"BloodPressure is immutable; cannot set {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"BloodPressure is immutable; cannot delete {name}")
+
+    def __eq__(self, other):
+        if type(other) is not BloodPressure:
+            return NotImplemented
+        return self.systolic == other.systolic and self.diastolic == other.diastolic
+
+    def __hash__(self):
+        return hash((self.systolic, self.diastolic))
+
+    def __repr__(self):
+        return (
+            f"BloodPressure(systolic={self.systolic!r}, diastolic={self.diastolic!r})"
+        )
+
+    def __reduce__(self):
+        return BloodPressure, (self.systolic, self.diastolic)
 
     @property
     def category(self) -> BPCategory:
@@ -43,21 +101,12 @@ class BloodPressure:
         Returns:
             BPCategory: The blood pressure category based on systolic and diastolic values
         """
-        # High Blood Pressure (check first - highest priority)
-        if self.systolic >= 140 or self.diastolic >= 90:
-            return BPCategory.HIGH
-
-        # Low Blood Pressure
-        elif self.systolic < 90 and self.diastolic < 60:
-            return BPCategory.LOW
-
-        # Ideal Blood Pressure
-        elif self.systolic < 120 and self.diastolic < 80:
-            return BPCategory.IDEAL
-
-        # Pre-High Blood Pressure
-        else:
-            return BPCategory.PRE_HIGH
+        if self._generation == _generation:
+            return self._category
+        category = classify(self.systolic, self.diastolic)
+        _set_category(self, category)
+        _set_generation(self, _generation)
+        return category
 
     def validate_systolic(self) -> bool:
         """Check if systolic value is in valid range"""
@@ -70,3 +119,122 @@ class BloodPressure:
     def is_valid(self) -> bool:
         """Check if both values are valid"""
         return self.validate_systolic() and self.validate_diastolic()
+
+
+# Slot setters, which bypass BloodPressure.__setattr__ (and are quicker than
+# object.__setattr__) for initialising instances
+_set_systolic, _set_diastolic, _set_category, _set_generation = (
+    BloodPressure.__dict__[name].__set__ for name in BloodPressure.__slots__
+)
+
+# Class constants the lookup table is derived from
+TABLE_CONSTANTS = frozenset(
+    {
+        "SYSTOLIC_MIN",
+        "SYSTOLIC_MAX",
+        "DIASTOLIC_MIN",
+        "DIASTOLIC_MAX",
+        "HIGH_SYSTOLIC",
+        "HIGH_DIASTOLIC",
+        "LOW_SYSTOLIC",
+        "LOW_DIASTOLIC",
+        "IDEAL_SYSTOLIC",
+        "IDEAL_DIASTOLIC",
+    }
+)
+
+
+class CategoryTable:
+    """Precomputed categories for every integer reading in the valid range"""
+
+    __slots__ = (
+        "systolic_min",
+        "diastolic_min",
+        "systolic_span",
+        "diastolic_span",
+        "cells",
+    )
+
+    def __init__(self):
+        bp = BloodPressure
+        self.systolic_min = bp.SYSTOLIC_MIN
+        self.diastolic_min = bp.DIASTOLIC_MIN
+        self.systolic_span = bp.SYSTOLIC_MAX - bp.SYSTOLIC_MIN + 1
+        self.diastolic_span = bp.DIASTOLIC_MAX - bp.DIASTOLIC_MIN + 1
+        # Row-major: cells[(systolic - min) * diastolic_span + (diastolic - min)]
+        self.cells = tuple(
+            classify_rules(systolic, diastolic)
+            for systolic in range(bp.SYSTOLIC_MIN, bp.SYSTOLIC_MAX + 1)
+            for diastolic in range(bp.DIASTOLIC_MIN, bp.DIASTOLIC_MAX + 1)
+        )
+
+    def index(self, systolic, diastolic):
+        """Return the cell index of an integer reading, or None if out of range"""
+        s = systolic - self.systolic_min
+        d = diastolic - self.diastolic_min
+        if 0 <= s < self.systolic_span and 0 <= d < self.diastolic_span:
+            return s * self.diastolic_span + d
+        return None
+
+
+_table = None
+# Bumped whenever the thresholds change; cached categories of other
+# generations are stale
+_generation = 0
+
+
+def category_table() -> CategoryTable:
+    """Return the lookup table, building it on first use"""
+    global _table
+    if _table is None:
+        _table = CategoryTable()
+    return _table
+
+
+def invalidate_category_table():
+    """Forget the lookup table so the next lookup rebuilds it"""
+    global _table, _generation
+    _table = None
+    _generation += 1
+
+
+def classify(systolic, diastolic) -> BPCategory:
+    """
+    Classify a single reading without creating a BloodPressure object.
+
+    In-range integer readings are answered from the precomputed lookup
+    table; anything else (floats, out-of-range values) uses classify_rules.
+    """
+    table = _table or category_table()
+    if type(systolic) is int and type(diastolic) is int:
+        s = systolic - table.systolic_min
+        d = diastolic - table.diastolic_min
+        if 0 <= s < table.systolic_span and 0 <= d < table.diastolic_span:
+            return table.cells[s * table.diastolic_span + d]
+    return classify_rules(systolic, diastolic)
+
+
+def classify_rules(systolic, diastolic) -> BPCategory:
+    """
+    Classify a reading by evaluating the guideline rules directly.
+
+    This is the rule set behind BloodPressure.category; the lookup table and
+    the batch engine in models.batch are both derived from it.
+    """
+    bp = BloodPressure
+
+    # High Blood Pressure (check first - highest priority)
+    if systolic >= bp.HIGH_SYSTOLIC or diastolic >= bp.HIGH_DIASTOLIC:
+        return BPCategory.HIGH
+
+    # Low Blood Pressure
+    elif systolic < bp.LOW_SYSTOLIC and diastolic < bp.LOW_DIASTOLIC:
+        return BPCategory.LOW
+
+    # Ideal Blood Pressure
+    elif systolic < bp.IDEAL_SYSTOLIC and diastolic < bp.IDEAL_DIASTOLIC:
+        return BPCategory.IDEAL
+
+    # Pre-High Blood Pressure
+    else:
+        return BPCategory.PRE_HIGH
@@ -1,43 +1,39 @@
 """Health Tips Model - New Feature"""
 
+import json
+import os
+from types import MappingProxyType
+
 from models.blood_pressure import BPCategory
+from models.tips_catalogue import TIPS_DIR, read_locale
 
 
 class HealthTips:
     """Provides personalized health tips based on BP category"""
 
-    TIPS = {
-        BPCategory.LOW: [
-            "Consider increasing salt intake slightly (consult your doctor)",
-            "Stay well hydrated - drink plenty of water",
-            "Eat small, frequent meals throughout the day",
-            "Avoid sudden position changes - stand up slowly",
-            "Consider compression stockings if recommended",
-        ],
-        BPCategory.IDEAL: [
-            "Maintain a balanced diet rich in fruits and vegetables",
-            "Exercise regularly - aim for 30 minutes daily",
-            "Keep your weight in a healthy range",
-            "Limit alcohol consumption",
-            "Continue regular BP monitoring",
-        ],
-        BPCategory.PRE_HIGH: [
-            "Reduce sodium intake - aim for less than 2,300mg/day",
-            "Increase physical activity - at least 150 minutes weekly",
-            "Maintain a healthy weight through diet and exercise",
-            "Limit alcohol and quit smoking if applicable",
-            "Monitor your blood pressure regularly at home",
-        ],
-        BPCategory.HIGH: [
-            "Consult your healthcare provider immediately",
-            "Follow prescribed medication regimen strictly",
-            "Adopt the DASH diet - low sodium, rich in nutrients",
-            "Exercise as recommended by your doctor",
-            "Monitor blood pressure daily and keep a log",
-        ],
-    }
+    # Read-only: category -> tuple of tips in the default locale, shared by
+    # every caller (TipsCatalogue serves the other locales)
+    TIPS = MappingProxyType(read_locale(os.path.join(TIPS_DIR, "en.json")))
+
+    # JSON arrays of each category's tips, with the TIPS they were built from
+    _fragments = (None, {})
+
+    @classmethod
+    def tips(cls, category: BPCategory) -> tuple:
+        """Health tips for a BP category, shared rather than copied"""
+        return cls.TIPS.get(category, ())
 
     @classmethod
     def get_tips(cls, category: BPCategory) -> list:
-        """Get health tips for a specific BP category"""
-        return cls.TIPS.get(category, []).copy()
+        """Get health tips for a specific BP category (a list of your own)"""
+        return list(cls.TIPS.get(category, ()))
+
+    @classmethod
+    def json_fragment(cls, category: BPCategory) -> str:
+        """The category's tips as a JSON array, serialized once"""
+        built_from, fragments = cls._fragments
+        if built_from is not cls.TIPS:
+            # First use, or TIPS was replaced
+            fragments = {key: json.dumps(list(tips)) for key, tips in cls.TIPS.items()}
+            cls._fragments = (cls.TIPS, fragments)
+        return fragments.get(category, "[]")
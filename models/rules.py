@@ -0,0 +1,362 @@
+"""Data-driven classification rule sets
+
+A rule set is a JSON document of ordered rules. The first rule a reading
+matches gives its category; a reading no rule matches gets the default:
+
+    {
+      "name": "default",
+      "systolic": {"min": 70, "max": 190},
+      "diastolic": {"min": 40, "max": 100},
+      "rules": [
+        {"category": "HIGH", "match": "any",
+         "systolic": {"at_least": 140}, "diastolic": {"at_least": 90}},
+        {"category": "LOW",
+         "systolic": {"below": 90}, "diastolic": {"below": 60}}
+      ],
+      "default": "PRE_HIGH"
+    }
+
+A condition has "at_least" and/or "below" bounds; "match" is "all" (every
+condition holds, the default) or "any". Categories are BPCategory names or
+ones the document declares under "categories" with a label and the
+BPCategory they map onto for tips and history.
+
+Rule sets are validated over every integer reading in their range: a rule
+that never applies, a reading neither a rule nor the default covers and,
+with "ordered": false, a reading two rules match are all errors. Valid sets
+are compiled into a lookup table for in-range integers and a generated
+function for anything else, so no rule is interpreted per call.
+"""
+
+import json
+import math
+import os
+
+from models.blood_pressure import BPCategory
+
+RULE_SETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_sets")
+DEFAULT_RULE_SET = "default"
+
+FIELDS = ("systolic", "diastolic")
+BOUNDS = ("at_least", "below")
+MATCHES = ("all", "any")
+DOCUMENT_KEYS = {
+    "name",
+    "description",
+    "ordered",
+    "categories",
+    "rules",
+    "default",
+    *FIELDS,
+}
+RULE_KEYS = {"category", "match", *FIELDS}
+
+
+class RuleSetError(ValueError):
+    """A rule set document is malformed or its rules conflict"""
+
+    def __init__(self, name, problems):
+        self.name = name
+        self.problems = list(problems)
+        super().__init__(f"Rule set {name!r}: " + "; ".join(self.problems))
+
+
+class Category:
+    """A category declared by a rule set, reported like a BPCategory"""
+
+    __slots__ = ("name", "value", "base")
+
+    def __init__(self, name: str, value: str, base: BPCategory):
+        """
+        Args:
+            name: Identifier, e.g. "STAGE_1" (used as the metrics label)
+            value: Label shown to users
+            base: Built-in category whose tips and history code it shares
+        """
+        self.name = name
+        self.value = value
+        self.base = base
+
+    def __repr__(self):
+        return f"<Category.{self.name}: {self.value!r}>"
+
+
+class Rule:
+    """One parsed rule: a category and its (field, at_least, below) conditions"""
+
+    __slots__ = ("category", "match", "conditions")
+
+    def __init__(self, category, match, conditions):
+        self.category = category
+        self.match = match
+        self.conditions = conditions
+
+    def source(self) -> str:
+        """The rule's test as a Python expression"""
+        tests = []
+        for field, at_least, below in self.conditions:
+            if at_least is not None and below is not None:
+                tests.append(f"{at_least!r} <= {field} < {below!r}")
+            elif at_least is not None:
+                tests.append(f"{field} >= {at_least!r}")
+            else:
+                tests.append(f"{field} < {below!r}")
+        return f" {'and' if self.match == 'all' else 'or'} ".join(tests)
+
+
+def _is_number(value) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+class RuleSet:
+    """
+    A validated rule set compiled for classification.
+
+    Raises RuleSetError from the constructor listing every problem found.
+    """
+
+    __slots__ = (
+        "name",
+        "description",
+        "categories",
+        "rules",
+        "default",
+        "evaluate",
+        "systolic_min",
+        "diastolic_min",
+        "systolic_span",
+        "diastolic_span",
+        "cells",
+    )
+
+    def __init__(self, document: dict, name: str = None):
+        """
+        Args:
+            document: Parsed JSON rule set
+            name: Used when the document has no "name"
+        """
+        if not isinstance(document, dict):
+            raise RuleSetError(name, ["Expected a JSON object"])
+        self.name = document.get("name", name)
+        self.description = document.get("description", "")
+        problems = [f"Unknown key {key!r}" for key in document.keys() - DOCUMENT_KEYS]
+        if not isinstance(self.name, str) or not self.name:
+            problems.append("Missing name")
+
+        self.categories = self._parse_categories(document.get("categories"), problems)
+        default = document.get("default")
+        self.default = None if default is None else self._category(default, problems)
+        ranges = [
+            self._parse_range(document.get(field), field, problems) for field in FIELDS
+        ]
+        rules = document.get("rules")
+        if not isinstance(rules, list) or not rules:
+            problems.append("Expected a non-empty list of rules")
+            rules = []
+        self.rules = tuple(
+            self._parse_rule(number, rule, problems)
+            for number, rule in enumerate(rules, 1)
+        )
+        if problems:
+            raise RuleSetError(self.name, problems)
+
+        (s_min, s_max), (d_min, d_max) = ranges
+        self.systolic_min = s_min
+        self.diastolic_min = d_min
+        self.systolic_span = s_max - s_min + 1
+        self.diastolic_span = d_max - d_min + 1
+        ordered = document.get("ordered", True)
+        if not isinstance(ordered, bool):
+            raise RuleSetError(self.name, ["ordered must be true or false"])
+        self.evaluate, tests = self._compile()
+        self._check(ordered, tests)
+        # Row-major: cells[(systolic - min) * diastolic_span + (diastolic - min)]
+        self.cells = tuple(
+            self.evaluate(systolic, diastolic)
+            for systolic in range(s_min, s_max + 1)
+            for diastolic in range(d_min, d_max + 1)
+        )
+
+    def classify(self, systolic, diastolic):
+        """
+        Category of a reading, or None if no rule matches and there is no
+        default. In-range integers are answered from the lookup table.
+        """
+        if type(systolic) is int and type(diastolic) is int:
+            s = systolic - self.systolic_min
+            d = diastolic - self.diastolic_min
+            if 0 <= s < self.systolic_span and 0 <= d < self.diastolic_span:
+                return self.cells[s * self.diastolic_span + d]
+        return self.evaluate(systolic, diastolic)
+
+    def __repr__(self):
+        return f"<RuleSet {self.name!r}: {len(self.rules)} rules>"
+
+    def _parse_categories(self, categories, problems) -> dict:
+        parsed = {}
+        if categories is None:
+            return parsed
+        if not isinstance(categories, dict):
+            problems.append("categories must be an object")
+            return parsed
+        for key, spec in categories.items():
+            if key in BPCategory.__members__:
+                problems.append(f"Category {key} is built in; use another name")
+            elif not isinstance(spec, dict) or not isinstance(spec.get("label"), str):
+                problems.append(f"Category {key} needs a label")
+            elif not isinstance(spec.get("base"), str) or (
+                spec["base"] not in BPCategory.__members__
+            ):
+                problems.append(
+                    f"Category {key} needs a base of {', '.join(BPCategory.__members__)}"
+                )
+            else:
+                parsed[key] = Category(key, spec["label"], BPCategory[spec["base"]])
+        return parsed
+
+    def _category(self, key, problems):
+        if isinstance(key, str):
+            if key in self.categories:
+                return self.categories[key]
+            if key in BPCategory.__members__:
+                return BPCategory[key]
+        problems.append(f"Unknown category {key!r}")
+        return None
+
+    @staticmethod
+    def _parse_range(spec, field, problems) -> tuple:
+        if (
+            not isinstance(spec, dict)
+            or set(spec) != {"min", "max"}
+            or not all(type(value) is int for value in spec.values())
+            or spec["min"] > spec["max"]
+        ):
+            problems.append(f"{field} needs an integer range {{min, max}}")
+            return 0, 0
+        return spec["min"], spec["max"]
+
+    def _parse_rule(self, number, spec, problems) -> Rule:
+        if not isinstance(spec, dict):
+            problems.append(f"Rule {number}: expected an object")
+            return None
+        for key in spec.keys() - RULE_KEYS:
+            problems.append(f"Rule {number}: unknown key {key!r}")
+        match = spec.get("match", "all")
+        if match not in MATCHES:
+            problems.append(f"Rule {number}: match must be 'all' or 'any'")
+        conditions = []
+        for field in FIELDS:
+            bounds = spec.get(field)
+            if bounds is None:
+                continue
+            if (
+                not isinstance(bounds, dict)
+                or not bounds
+                or not set(bounds) <= set(BOUNDS)
+                or not all(map(_is_number, bounds.values()))
+            ):
+                problems.append(f"Rule {number}: {field} needs numeric at_least/below")
+                continue
+            at_least, below = bounds.get("at_least"), bounds.get("below")
+            if at_least is not None and below is not None and at_least >= below:
+                problems.append(f"Rule {number}: {field} range is empty")
+            conditions.append((field, at_least, below))
+        if not conditions:
+            problems.append(f"Rule {number}: needs a systolic or diastolic condition")
+        return Rule(self._category(spec.get("category"), problems), match, conditions)
+
+    def _check(self, ordered: bool, tests):
+        """Check for unreachable rules, uncovered readings and overlaps"""
+        problems = []
+        wins = [0] * len(self.rules)
+        uncovered = []
+        overlaps = {}
+        for systolic in range(
+            self.systolic_min, self.systolic_min + self.systolic_span
+        ):
+            for diastolic in range(
+                self.diastolic_min, self.diastolic_min + self.diastolic_span
+            ):
+                matched = [
+                    i for i, test in enumerate(tests) if test(systolic, diastolic)
+                ]
+                if matched:
+                    wins[matched[0]] += 1
+                    if not ordered and len(matched) > 1:
+                        overlaps.setdefault(tuple(matched[:2]), (systolic, diastolic))
+                else:
+                    uncovered.append((systolic, diastolic))
+
+        for i, count in enumerate(wins):
+            if not count:
+                rule = self.rules[i]
+                problems.append(
+                    f"Rule {i + 1} ({rule.category.name}) never applies:"
+                    " earlier rules cover every reading in range it matches"
+                )
+        if uncovered and self.default is None:
+            problems.append(
+                f"{len(uncovered)} readings match no rule and there is no default,"
+                " e.g. systolic=%d, diastolic=%d" % uncovered[0]
+            )
+        for (first, second), reading in overlaps.items():
+            problems.append(
+                f"Rules {first + 1} and {second + 1} overlap (ordered is false),"
+                " e.g. at systolic=%d, diastolic=%d" % reading
+            )
+        if problems:
+            raise RuleSetError(self.name, problems)
+
+    def _compile(self):
+        """
+        Generate the evaluator, and a test function per rule for _check().
+
+        Returns:
+            tuple: (evaluate(systolic, diastolic), tuple of rule tests)
+        """
+        namespace = {"_default": self.default}
+        lines = ["def evaluate(systolic, diastolic):"]
+        tests = []
+        for i, rule in enumerate(self.rules):
+            namespace[f"_category_{i}"] = rule.category
+            lines.append(f"    if {rule.source()}:")
+            lines.append(f"        return _category_{i}")
+            tests.append(f"lambda systolic, diastolic: {rule.source()}")
+        lines.append("    return _default")
+        lines.append(f"tests = ({', '.join(tests)},)")
+        # Only validated finite numbers and fixed names reach the source, so
+        # the exec is not fed anything a rule set author wrote verbatim
+        code = compile("\n".join(lines), f"<rule set {self.name}>", "exec")
+        exec(code, namespace)  # nosec B102
+        return namespace["evaluate"], namespace["tests"]
+
+
+def load_rule_set(path: str) -> RuleSet:
+    """Read and compile one JSON rule set; its name defaults to the file's"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+    except ValueError as e:
+        raise RuleSetError(name, [f"Invalid JSON: {e}"]) from None
+    return RuleSet(document, name)
+
+
+def load_rule_sets(*directories) -> dict:
+    """
+    Rule sets by name from every *.json file in the directories.
+
+    Later directories replace same-named sets from earlier ones, so a
+    deployment's directory can override the bundled sets.
+    """
+    rule_sets = {}
+    for directory in directories or (RULE_SETS_DIR,):
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                rule_set = load_rule_set(os.path.join(directory, filename))
+                rule_sets[rule_set.name] = rule_set
+    return rule_sets
@@ -0,0 +1,250 @@
+"""Localized health tips loaded from data files
+
+Each locale is a JSON file named after it (en.json, es.json, pt_BR.json)
+that maps BPCategory names to lists of tips:
+
+    {"LOW": ["Stay well hydrated", ...], "HIGH": [...]}
+
+A locale may leave categories out; those fall back along its chain, e.g.
+pt_BR -> pt -> the default locale. The files are compiled into one table
+per locale with every category already resolved, so a lookup is two dict
+lookups. A requested locale (an Accept-Language header, "pt-br",
+"pt_BR.UTF-8") is resolved to a table once and the result kept in a
+bounded cache, so memory grows with the locales on disk, not with the
+headers clients send. Identical tips are stored once, whatever the number
+of locales that fall back to them.
+
+TipsCatalogue reloads when a file in its directories changes. The new
+catalogue is compiled off to the side and swapped in with one assignment,
+so readers never lock or see half of a reload; a file that fails to load
+keeps the previous catalogue in service.
+"""
+
+import json
+import os
+import threading
+import time
+
+from models.blood_pressure import BPCategory
+
+TIPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tips")
+DEFAULT_LOCALE = "en"
+
+
+class TipsCatalogueError(ValueError):
+    """A tips file is malformed"""
+
+    def __init__(self, locale, problems):
+        self.locale = locale
+        self.problems = list(problems)
+        super().__init__(f"Tips locale {locale!r}: " + "; ".join(self.problems))
+
+
+def normalize_locale(tag: str) -> str:
+    """Canonical locale name: "pt-br" and "pt_BR.UTF-8" -> "pt_BR" """
+    tag = tag.strip().split(".")[0].split("@")[0].replace("-", "_")
+    parts = [part for part in tag.split("_") if part]
+    if not parts:
+        return ""
+    return "_".join(
+        [parts[0].lower()]
+        + [part.title() if len(part) == 4 else part.upper() for part in parts[1:]]
+    )
+
+
+def fallback_chain(locale: str, default: str = DEFAULT_LOCALE) -> tuple:
+    """Locales to try for a locale, most specific first: pt_BR, pt, default"""
+    parts = locale.split("_") if locale else []
+    chain = ["_".join(parts[:n]) for n in range(len(parts), 0, -1)]
+    return tuple(dict.fromkeys(chain + [default]))
+
+
+def accepted_locales(header: str) -> list:
+    """Locales in an Accept-Language header, best first (q=0 dropped)"""
+    weighted = []
+    for position, entry in enumerate(header.split(",")):
+        tag, _, params = entry.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        tag = normalize_locale(tag)
+        if tag and tag != "*" and quality > 0:
+            weighted.append((-quality, position, tag))
+    return [tag for _, _, tag in sorted(weighted)]
+
+
+def read_locale(path: str) -> dict:
+    """Category -> tuple of tips from one locale file"""
+    locale = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, encoding="utf-8") as f:
+            document = json.load(f)
+    except ValueError as e:
+        raise TipsCatalogueError(locale, [f"Invalid JSON: {e}"]) from None
+    if not isinstance(document, dict):
+        raise TipsCatalogueError(locale, ["Expected an object of category names"])
+    problems = []
+    tips = {}
+    for name, items in document.items():
+        if name not in BPCategory.__members__:
+            problems.append(f"Unknown category {name!r}")
+        elif not isinstance(items, list) or not all(
+            isinstance(item, str) and item.strip() for item in items
+        ):
+            problems.append(f"{name}: expected a list of non-empty strings")
+        else:
+            tips[BPCategory[name]] = tuple(items)
+    if problems:
+        raise TipsCatalogueError(locale, problems)
+    return tips
+
+
+class CompiledCatalogue:
+    """Every locale's tips resolved per category; never changed once built"""
+
+    def __init__(
+        self,
+        locales: dict,
+        default: str = DEFAULT_LOCALE,
+        version=None,
+        max_resolved=1024,
+    ):
+        """
+        Args:
+            locales: Locale name -> {BPCategory: tuple of tips}
+            default: Locale every chain ends with; must be present
+            version: Fingerprint of the files the catalogue was read from
+            max_resolved: Requested locales remembered before the cache restarts
+        """
+        if default not in locales:
+            raise TipsCatalogueError(default, ["Default locale has no tips file"])
+        self.default = default
+        self.version = version
+        self.max_resolved = max_resolved
+        shared = {}  # tuple of tips -> the one equal tuple every table uses
+        self.tables = {}
+        for locale in locales:
+            chain = [locales[name] for name in fallback_chain(locale, default)]
+            table = {}
+            for category in BPCategory:
+                tips = next((tips[category] for tips in chain if category in tips), ())
+                table[category] = shared.setdefault(tips, tips)
+            self.tables[locale] = table
+        self._resolved = {}
+
+    def resolve(self, accept_language: str = None) -> tuple:
+        """The locale and table best matching an Accept-Language header"""
+        resolved = self._resolved.get(accept_language)
+        if resolved is None:
+            resolved = self._negotiate(accept_language or "")
+            if len(self._resolved) >= self.max_resolved:
+                self._resolved = {}
+            self._resolved[accept_language] = resolved
+        return resolved
+
+    def _negotiate(self, header: str) -> tuple:
+        for tag in accepted_locales(header):
+            # The default is only the last resort, after every accepted tag
+            for locale in fallback_chain(tag, default=tag):
+                if locale in self.tables:
+                    return locale, self.tables[locale]
+        return self.default, self.tables[self.default]
+
+    def get(self, category: BPCategory, accept_language: str = None) -> tuple:
+        """A category's tips in the best matching locale"""
+        return self.resolve(accept_language)[1].get(category, ())
+
+
+class TipsCatalogue:
+    """Tips files from one or more directories, reloaded when they change"""
+
+    def __init__(
+        self,
+        *directories,
+        default_locale: str = DEFAULT_LOCALE,
+        reload_interval: float = 2.0,
+        max_resolved: int = 1024,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            directories: Directories of <locale>.json files; a later directory's
+                file replaces a same-named one from an earlier directory
+            default_locale: Locale used when nothing requested matches
+            reload_interval: Seconds between checks for changed files (0: never)
+            max_resolved: Requested locales remembered per catalogue
+            clock: Monotonic time source
+        """
+        self.directories = directories or (TIPS_DIR,)
+        self.default_locale = default_locale
+        self.reload_interval = reload_interval
+        self.max_resolved = max_resolved
+        self.clock = clock
+        self.last_error = None
+        self._lock = threading.Lock()
+        # Raises here, so a broken file stops start-up rather than a reload
+        self.compiled = self._compile(self._files())
+        self._checked_at = clock()
+
+    def _files(self) -> dict:
+        """Locale -> (path, mtime, size) of the files that provide it"""
+        files = {}
+        for directory in self.directories:
+            for filename in sorted(os.listdir(directory)):
+                locale, ext = os.path.splitext(filename)
+                if ext == ".json":
+                    path = os.path.join(directory, filename)
+                    stat = os.stat(path)
+                    files[locale] = (path, stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _compile(self, files: dict) -> CompiledCatalogue:
+        locales = {
+            normalize_locale(locale): read_locale(path)
+            for locale, (path, _, _) in files.items()
+        }
+        return CompiledCatalogue(
+            locales,
+            self.default_locale,
+            version=tuple(sorted(files.items())),
+            max_resolved=self.max_resolved,
+        )
+
+    def current(self) -> CompiledCatalogue:
+        """The catalogue in service, first reloading it if a file changed"""
+        compiled = self.compiled
+        if not self.reload_interval or self.clock() - self._checked_at < (
+            self.reload_interval
+        ):
+            return compiled
+        # One reader checks the files; the others carry on with the current one
+        if not self._lock.acquire(blocking=False):
+            return compiled
+        try:
+            self._checked_at = self.clock()
+            return self.reload()
+        finally:
+            self._lock.release()
+
+    def reload(self) -> CompiledCatalogue:
+        """Recompile if the files changed; a failure keeps the current catalogue"""
+        compiled = self.compiled
+        try:
+            files = self._files()
+            if tuple(sorted(files.items())) != compiled.version:
+                compiled = self._compile(files)
+        except (OSError, ValueError) as e:
+            self.last_error = e
+            return self.compiled
+        self.last_error = None
+        self.compiled = compiled
+        return compiled
+
+    def get(self, category: BPCategory, accept_language: str = None) -> tuple:
+        """A category's tips in the locale best matching accept_language"""
+        return self.current().get(category, accept_language)
@@ -0,0 +1,67 @@
+"""Validation of raw readings, shared by the form, the JSON API and bulk files
+
+Does not import Flask or WTForms. BloodPressureForm builds its range
+validators from FIELD_RANGES, so a reading is accepted and rejected with
+the same messages whichever way it arrives.
+"""
+
+from models.blood_pressure import BloodPressure
+
+REQUIRED_MESSAGE = "This field is required."
+NOT_INTEGER_MESSAGE = "Not a valid integer value."
+SYSTOLIC_NOT_GREATER = "Systolic must be greater than Diastolic"
+
+# Field -> (min, max, message when out of range), bounds inclusive
+FIELD_RANGES = {
+    "systolic": (
+        BloodPressure.SYSTOLIC_MIN,
+        BloodPressure.SYSTOLIC_MAX,
+        "Invalid Systolic Value",
+    ),
+    "diastolic": (
+        BloodPressure.DIASTOLIC_MIN,
+        BloodPressure.DIASTOLIC_MAX,
+        "Invalid Diastolic Value",
+    ),
+}
+
+
+def validate_reading(systolic, diastolic) -> tuple:
+    """
+    Validate a reading outside of a form submission (e.g. from JSON or CSV).
+
+    Applies the same rules and messages as BloodPressureForm plus the
+    systolic > diastolic check done by the index view.
+
+    Returns:
+        tuple: (values, errors) - field name -> int for fields that parsed
+        and are in range, and field name -> list of error messages (empty
+        when the reading is valid)
+    """
+    errors = {}
+    values = {}
+    for name, raw in (("systolic", systolic), ("diastolic", diastolic)):
+        if isinstance(raw, str):
+            raw = raw.strip() or None
+        if not raw:
+            errors[name] = [REQUIRED_MESSAGE]
+            continue
+        try:
+            if isinstance(raw, (bool, float)):
+                raise ValueError(raw)
+            value = int(raw)
+        except (TypeError, ValueError):
+            errors[name] = [NOT_INTEGER_MESSAGE]
+            continue
+        if not value:
+            errors[name] = [REQUIRED_MESSAGE]
+            continue
+        low, high, message = FIELD_RANGES[name]
+        if not low <= value <= high:
+            errors[name] = [message]
+            continue
+        values[name] = value
+
+    if not errors and values["systolic"] <= values["diastolic"]:
+        errors["systolic"] = [SYSTOLIC_NOT_GREATER]
+    return values, errors
@@ -0,0 +1 @@
+"""Supporting services for BP Calculator (caching, streaming, telemetry)"""
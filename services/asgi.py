@@ -0,0 +1,157 @@
+"""Serve a WSGI application from an ASGI server
+
+The event loop only moves bytes: each request's WSGI call runs on a thread
+pool, so Flask views, template rendering and logging never block the loop,
+and a slow client only holds a coroutine rather than a whole worker.
+Request bodies are spooled to disk past a threshold, and response chunks
+are handed back to the loop one at a time, so memory stays bounded both
+ways.
+"""
+
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Request bodies larger than this are spooled to a temporary file
+SPOOL_SIZE = 1024 * 1024
+
+
+class WsgiToAsgi:
+    """ASGI application wrapping a WSGI callable"""
+
+    def __init__(
+        self, wsgi_app, max_threads: int = 40, on_startup=None, on_shutdown=None
+    ):
+        """
+        Args:
+            wsgi_app: WSGI callable (e.g. a Flask app)
+            max_threads: Requests run concurrently by the WSGI app
+            on_startup: Called once, off the loop, on ASGI lifespan startup
+            on_shutdown: Called once, off the loop, on ASGI lifespan shutdown
+        """
+        self.wsgi_app = wsgi_app
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+        self.executor = ThreadPoolExecutor(max_threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            body = await self._read_body(receive)
+            environ = build_environ(scope, body)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(
+                    self.executor, self._run_wsgi, environ, send, loop
+                )
+            finally:
+                body.close()
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            phase = message["type"].rsplit(".", 1)[-1]
+            hook = self.on_startup if phase == "startup" else self.on_shutdown
+            try:
+                if hook is not None:
+                    await loop.run_in_executor(self.executor, hook)
+            except Exception as e:
+                await send({"type": f"lifespan.{phase}.failed", "message": str(e)})
+                return
+            await send({"type": f"lifespan.{phase}.complete"})
+            if phase == "shutdown":
+                return
+
+    async def _read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            body.write(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body.seek(0)
+        return body
+
+    def _run_wsgi(self, environ, send, loop):
+        """Run one WSGI call on a worker thread, forwarding output to the loop"""
+
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get("started"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+
+        def start():
+            if not response.get("started"):
+                response["started"] = True
+                send_message(
+                    {
+                        "type": "http.response.start",
+                        "status": response["status"],
+                        "headers": response["headers"],
+                    }
+                )
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    start()
+                    send_message(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            start()
+            send_message({"type": "http.response.body", "body": b""})
+        finally:
+            close = getattr(result, "close", None)
+            if close:
+                close()
+
+
+def build_environ(scope, body) -> dict:
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        if name in environ:
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
@@ -0,0 +1,172 @@
+"""Fingerprinted, precompressed static asset bundles
+
+build() concatenates the stylesheets and scripts every page loads into a
+few bundles, names each after a hash of its content and writes gzip (and,
+with the brotli package, brotli) variants next to it, plus a manifest.
+Templates link bundles through asset_urls(); the app serves them with
+far-future immutable caching and the best encoding the client accepts.
+Without a built manifest asset_urls() falls back to the source files.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only without brotli
+    brotli = None
+
+MANIFEST = "manifest.json"
+
+# Bundle name -> source files under the static folder, in load order
+BUNDLES = {
+    "site.css": (
+        "lib/bootstrap/dist/css/bootstrap.min.css",
+        "css/site.css",
+    ),
+    "site.js": (
+        "lib/jquery/dist/jquery.min.js",
+        "lib/bootstrap/dist/js/bootstrap.bundle.min.js",
+        "js/site.js",
+    ),
+    "validation.js": (
+        "lib/jquery-validation/dist/jquery.validate.min.js",
+        "lib/jquery-validation-unobtrusive/jquery.validate.unobtrusive.min.js",
+    ),
+}
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# Source maps are not shipped, and their relative paths break once bundled
+_SOURCE_MAP = re.compile(rb"^[ \t]*(?://|/\*)# sourceMappingURL=.*$", re.MULTILINE)
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> tuple:
+    return tuple(e for e in ENCODINGS if e != "br" or brotli is not None)
+
+
+def sources_fingerprint(static_folder: str, bundles: dict = BUNDLES) -> str:
+    """Hash of the sources' names, sizes and mtimes: cheap staleness check"""
+    digest = hashlib.sha256()
+    for name, sources in sorted(bundles.items()):
+        for source in sources:
+            stat = os.stat(os.path.join(static_folder, source))
+            digest.update(
+                f"{name}:{source}:{stat.st_size}:{stat.st_mtime_ns};".encode()
+            )
+    digest.update(",".join(available_encodings()).encode())
+    return digest.hexdigest()[:16]
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write via a temporary file, so concurrent builds never expose a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build(static_folder: str, output: str, bundles: dict = BUNDLES) -> dict:
+    """
+    Write every bundle and its compressed variants, then the manifest.
+
+    Files of earlier builds are removed once the new manifest is in place.
+
+    Returns:
+        dict: The manifest
+    """
+    os.makedirs(output, exist_ok=True)
+    encodings = available_encodings()
+    assets = {}
+    for name, sources in bundles.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), "rb") as f:
+                parts.append(_SOURCE_MAP.sub(b"", f.read()).strip())
+        separator = b"\n" if name.endswith(".css") else b";\n"
+        data = separator.join(parts) + b"\n"
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+        path = os.path.join(output, filename)
+        _write_atomic(path, data)
+        for encoding in encodings:
+            _write_atomic(path + ENCODINGS[encoding], _compress(encoding, data))
+        assets[name] = {
+            "file": filename,
+            "size": len(data),
+            "encodings": list(encodings),
+        }
+
+    manifest = {
+        "sources": sources_fingerprint(static_folder, bundles),
+        "assets": assets,
+    }
+    _write_atomic(
+        os.path.join(output, MANIFEST), json.dumps(manifest, indent=2).encode()
+    )
+    keep = {MANIFEST} | {
+        asset["file"] + suffix
+        for asset in assets.values()
+        for suffix in ("", *ENCODINGS.values())
+    }
+    for filename in os.listdir(output):
+        if filename not in keep and not filename.startswith(".tmp-"):
+            os.remove(os.path.join(output, filename))
+    return manifest
+
+
+def load_manifest(output: str):
+    """The manifest in an output directory, or None if there is none"""
+    try:
+        with open(os.path.join(output, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_or_build(static_folder: str, output: str, bundles: dict = BUNDLES) -> dict:
+    """The current manifest, rebuilding the bundles if their sources changed"""
+    manifest = load_manifest(output)
+    if manifest is None or manifest.get("sources") != sources_fingerprint(
+        static_folder, bundles
+    ):
+        manifest = build(static_folder, output, bundles)
+    return manifest
+
+
+def accepted_encodings(header: str) -> dict:
+    """Coding -> quality from an Accept-Encoding header"""
+    accepted = {}
+    for entry in header.split(","):
+        coding, _, params = entry.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: str, available) -> str:
+    """Best precompressed variant for an Accept-Encoding header, or None"""
+    accepted = accepted_encodings(header or "")
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
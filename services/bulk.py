@@ -0,0 +1,307 @@
+"""Bulk classification of CSV and Parquet files of readings
+
+Files are read in fixed-size chunks of rows. Each chunk is validated
+against the BloodPressure ranges and the systolic > diastolic rule,
+classified with classify_batch, and encoded as annotated CSV. Output is
+produced chunk by chunk in input order. With workers > 1 the chunks are
+processed on a process pool that never holds more than a few chunks at
+once, so memory stays constant however large the file is.
+
+Does not import Flask; the web route and the command line share it:
+    python -m services.bulk readings.csv -o classified.csv --workers 4
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from collections import Counter, deque
+
+from models.batch import CATEGORY_CODES, classify_batch
+from models.validation import validate_reading
+
+CHUNK_SIZE = 10000
+RESULT_COLUMNS = ("category", "errors")
+
+# Raised while reading rows once output has started (pyarrow's errors are
+# ValueErrors); annotate() reports them in a final row instead of raising
+READ_ERRORS = (csv.Error, OSError, ValueError)
+
+
+class BulkStats:
+    """Rows processed so far, and how they were classified"""
+
+    def __init__(self):
+        self.rows = 0
+        self.invalid = 0
+        self.categories = Counter()
+        # Why reading stopped before the end of the file, if it did
+        self.error = None
+
+    def add(self, rows: int, invalid: int, categories: dict):
+        self.rows += rows
+        self.invalid += invalid
+        self.categories.update(categories)
+
+
+def read_csv(stream, chunk_size: int = CHUNK_SIZE) -> tuple:
+    """
+    Header and chunked rows of a CSV text stream.
+
+    The header is read immediately so a file without systolic and
+    diastolic columns is rejected before any output is produced.
+
+    Raises:
+        ValueError: If the header lacks a systolic or diastolic column
+    """
+    reader = csv.reader(stream)
+    header = next(reader, None) or []
+    columns = reading_columns(header)
+    return header, columns, _chunks(reader, chunk_size)
+
+
+def read_parquet(source, chunk_size: int = CHUNK_SIZE) -> tuple:
+    """Header and chunked rows of a Parquet file (path or binary file object)"""
+    try:
+        # Imported here: pyarrow takes longer to import than a small file to read
+        import pyarrow.parquet as pq
+    except ImportError:  # pragma: no cover - pyarrow is only needed for Parquet
+        raise RuntimeError("Reading Parquet files requires pyarrow") from None
+    parquet = pq.ParquetFile(source)
+    header = parquet.schema_arrow.names
+    columns = reading_columns(header)
+
+    def chunks():
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield [list(row) for row in zip(*batch.to_pydict().values())]
+
+    return header, columns, chunks()
+
+
+def reading_columns(header) -> tuple:
+    """Indices of the systolic and diastolic columns (case-insensitive)"""
+    names = [str(name).strip().lower() for name in header]
+    try:
+        return names.index("systolic"), names.index("diastolic")
+    except ValueError:
+        raise ValueError("File needs systolic and diastolic columns") from None
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    try:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    except READ_ERRORS:
+        # Rows read before the failure are still annotated
+        if chunk:
+            yield chunk
+        raise
+    if chunk:
+        yield chunk
+
+
+def check_reading(systolic, diastolic) -> tuple:
+    """
+    Validate one raw reading with models.validation.validate_reading.
+
+    Whole floats (120.0, as Parquet float columns hold readings) count as
+    integers; any other float is rejected like in the form.
+
+    Returns:
+        tuple: (systolic, diastolic, errors) - the parsed values, or None
+        with errors as "field: message; ..." text
+    """
+    if isinstance(systolic, float) and systolic.is_integer():
+        systolic = int(systolic)
+    if isinstance(diastolic, float) and diastolic.is_integer():
+        diastolic = int(diastolic)
+    values, errors = validate_reading(systolic, diastolic)
+    if errors:
+        text = "; ".join(
+            f"{name}: {message}"
+            for name, messages in errors.items()
+            for message in messages
+        )
+        return None, None, text
+    return values["systolic"], values["diastolic"], ""
+
+
+def annotate_chunk(rows, columns, width) -> tuple:
+    """
+    Classify one chunk of rows.
+
+    Each row is padded or trimmed to width (the header's) so category and
+    errors always land in their own columns.
+
+    Returns:
+        tuple: (CSV text of the rows with category and errors appended,
+        row count, invalid count, category value -> count)
+    """
+    systolic_index, diastolic_index = columns
+    checked = []
+    valid_systolic, valid_diastolic = [], []
+    for row in rows:
+        if len(row) > max(columns):
+            result = check_reading(row[systolic_index], row[diastolic_index])
+        else:
+            result = None, None, "reading: Expected systolic and diastolic values"
+        checked.append(result)
+        if not result[2]:
+            valid_systolic.append(result[0])
+            valid_diastolic.append(result[1])
+
+    codes = iter(classify_batch(valid_systolic, valid_diastolic).codes)
+    categories = Counter()
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for row, (_, _, errors) in zip(rows, checked):
+        category = "" if errors else CATEGORY_CODES[next(codes)].value
+        categories[category] += 1
+        cells = row[:width] + [""] * (width - len(row))
+        writer.writerow([*cells, category, errors])
+    invalid = categories.pop("", 0)
+    return out.getvalue(), len(rows), invalid, dict(categories)
+
+
+def annotate(header, columns, chunks, workers: int = 1, stats: BulkStats = None):
+    """
+    Yield annotated CSV text: the header, then each chunk in input order.
+
+    Output has started by the time a bad row is read, so an input that cannot
+    be read to the end gets a last row whose errors column says why (also
+    kept in stats.error) instead of an exception cutting the output short.
+
+    Args:
+        header: Input column names
+        columns: (systolic index, diastolic index) from reading_columns()
+        chunks: Iterable of row lists
+        workers: Processes to classify chunks on (1 classifies in-process)
+        stats: Updated as each chunk is yielded
+    """
+    out = io.StringIO()
+    csv.writer(out).writerow([*header, *RESULT_COLUMNS])
+    yield out.getvalue()
+
+    failures = []
+
+    def arguments():
+        try:
+            for chunk in chunks:
+                yield chunk, columns, len(header)
+        except READ_ERRORS as e:
+            failures.append(e)
+
+    rows_read = 0
+    for text, rows, invalid, categories in map_ordered(
+        annotate_chunk, arguments(), workers
+    ):
+        rows_read += rows
+        if stats is not None:
+            stats.add(rows, invalid, categories)
+        yield text
+
+    if failures:
+        error = f"file: Could not read past row {rows_read}: {failures[0]}"
+        if stats is not None:
+            stats.error = error
+        out = io.StringIO()
+        csv.writer(out).writerow([""] * len(header) + ["", error])
+        yield out.getvalue()
+
+
+def map_ordered(func, arguments, workers: int = 1):
+    """
+    Yield func(*args) for each args tuple, in order.
+
+    With workers > 1 the calls run on a process pool holding at most two
+    pending calls per worker, so arguments are consumed only as fast as
+    results are.
+    """
+    if workers <= 1:
+        for args in arguments:
+            yield func(*args)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # only needed with workers
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for args in arguments:
+            pending.append(pool.submit(func, *args))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def open_input(path: str, file_format: str = None, chunk_size: int = CHUNK_SIZE):
+    """read_csv or read_parquet for a file path, chosen by extension"""
+    file_format = file_format or (
+        "parquet" if path.lower().endswith(".parquet") else "csv"
+    )
+    if file_format == "parquet":
+        return read_parquet(path, chunk_size)
+    # Undecodable bytes become U+FFFD: the row fails validation, not the file
+    stream = open(path, newline="", encoding="utf-8", errors="replace")
+    try:
+        header, columns, chunks = read_csv(stream, chunk_size)
+    except ValueError:
+        stream.close()
+        raise
+
+    def chunks_then_close():
+        with stream:
+            yield from chunks
+
+    return header, columns, chunks_then_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Classify every reading in a CSV or Parquet file"
+    )
+    parser.add_argument("input", help="CSV or Parquet file with systolic/diastolic")
+    parser.add_argument("-o", "--output", help="Annotated CSV (default: stdout)")
+    parser.add_argument("--format", choices=("csv", "parquet"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        header, columns, chunks = open_input(args.input, args.format, args.chunk_size)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    stats = BulkStats()
+    start = time.perf_counter()
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else None
+    try:
+        for text in annotate(header, columns, chunks, args.workers, stats):
+            (out or sys.stdout).write(text)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not None:
+            out.close()
+    if stats.error:
+        print(f"error: {stats.error}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"{stats.rows} rows ({stats.invalid} invalid) in {elapsed:.2f}s: "
+        f"{stats.rows / elapsed:.0f} rows/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""Command-line classification of readings for offline jobs (bp-classify)
+
+Reads lines of "systolic,diastolic" (separated by a comma, tab or spaces)
+from files or stdin and writes one result per input line, in order. Files
+are memory-mapped and cut into newline-aligned byte ranges; each worker
+process maps the ranges itself, so no input is copied between processes.
+Only the models package is imported (no Flask), so start-up stays fast:
+
+    bp-classify readings.txt --workers 4 > categories.txt
+    cat readings.txt | bp-classify --format jsonl --tips
+
+An optional first line containing letters (a header) is skipped. Lines
+that do not hold two integers in range with systolic > diastolic are
+reported as invalid.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+
+from models.batch import CATEGORY_CODES, classify_batch
+from models.health_tips import HealthTips
+from services.bulk import map_ordered
+
+FORMATS = ("text", "csv", "jsonl", "codes")
+CHUNK_BYTES = 4 * 1024 * 1024
+# Code written for invalid lines in the one-byte-per-reading "codes" format
+INVALID_CODE = 255
+INVALID_LABEL = "Invalid reading"
+
+# A chunk where every line is exactly two integers takes the fast path
+_CLEAN_LINES = re.compile(rb"(?:[ \t]*\d+[ \t]*[, \t][ \t]*\d+[ \t]*\r?\n)*")
+_HEADER = re.compile(rb"[A-Za-z]")
+
+
+def parse_lines(data: bytes) -> tuple:
+    """
+    Parse one reading per line.
+
+    Returns:
+        tuple: (systolic, diastolic) lists with one entry per line; lines
+        without two integers become (0, 0), which is out of range
+    """
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
+    if _CLEAN_LINES.fullmatch(data):
+        values = list(map(int, data.replace(b",", b" ").split()))
+        return values[0::2], values[1::2]
+
+    systolic, diastolic = [], []
+    for line in data.splitlines():
+        try:
+            s, d = map(int, line.replace(b",", b" ").split())
+        except ValueError:
+            s = d = 0
+        systolic.append(s)
+        diastolic.append(d)
+    return systolic, diastolic
+
+
+@lru_cache(maxsize=None)
+def _labels(output_format: str, tips: bool) -> list:
+    """Encoded per-code output fragments, indexed by category code"""
+    labels = [None] * 256
+    for code, category in enumerate(CATEGORY_CODES):
+        advice = " | ".join(HealthTips.tips(category)) if tips else None
+        if output_format == "text":
+            label = category.value + (f"\t{advice}" if tips else "")
+        elif output_format == "csv":
+            quoted = advice.replace('"', '""') if tips else ""
+            label = category.value + (f',"{quoted}"' if tips else "")
+        else:
+            label = json.dumps(category.value)
+            if tips:
+                label += ', "tips": ' + HealthTips.json_fragment(category)
+        labels[code] = label.encode("utf-8")
+    if output_format == "jsonl":
+        labels[INVALID_CODE] = b"null" + (b', "tips": []' if tips else b"")
+    else:
+        labels[INVALID_CODE] = INVALID_LABEL.encode("ascii") + (
+            b"\t" if output_format == "text" and tips else b""
+        )
+        if output_format == "csv" and tips:
+            labels[INVALID_CODE] += b","
+    return labels
+
+
+def classify_chunk(data: bytes, output_format: str = "text", tips=False) -> tuple:
+    """
+    Classify a chunk of complete lines.
+
+    Returns:
+        tuple: (encoded output, readings, invalid readings)
+    """
+    systolic, diastolic = parse_lines(data)
+    result = classify_batch(systolic, diastolic)
+    codes = result.codes
+    for i, (valid, s, d) in enumerate(zip(result.valid, systolic, diastolic)):
+        if not valid or s <= d:
+            codes[i] = INVALID_CODE
+    invalid = codes.count(INVALID_CODE)
+
+    if output_format == "codes":
+        return bytes(codes), len(codes), invalid
+    labels = _labels(output_format, bool(tips))
+    if output_format == "text":
+        body = b"\n".join(map(labels.__getitem__, codes))
+    elif output_format == "csv":
+        body = b"\n".join(
+            b"%d,%d,%s" % (s, d, labels[code]) if s else b",," + labels[code]
+            for s, d, code in zip(systolic, diastolic, codes)
+        )
+    else:
+        body = b"\n".join(
+            b'{"systolic": %s, "diastolic": %s, "category": %s}'
+            % (
+                str(s).encode() if s else b"null",
+                str(d).encode() if s else b"null",
+                labels[code],
+            )
+            for s, d, code in zip(systolic, diastolic, codes)
+        )
+    return (body + b"\n" if codes else b""), len(codes), invalid
+
+
+def classify_range(path, start, end, output_format="text", tips=False) -> tuple:
+    """classify_chunk() over bytes [start, end) of a memory-mapped file"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return classify_chunk(m[start:end], output_format, tips)
+
+
+def file_ranges(path: str, chunk_bytes: int = CHUNK_BYTES):
+    """Newline-aligned (start, end) byte ranges of a file, skipping a header"""
+    size = os.path.getsize(path)
+    if not size:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        first_line_end = m.find(b"\n")
+        start = 0
+        if _HEADER.search(m[: first_line_end if first_line_end >= 0 else size]):
+            start = first_line_end + 1 if first_line_end >= 0 else size
+        while start < size:
+            end = m.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if end < 0 else end + 1
+            yield start, end
+            start = end
+
+
+def stream_chunks(stream, chunk_bytes: int = CHUNK_BYTES):
+    """Newline-aligned chunks of a binary stream, skipping a header"""
+    first = stream.readline()
+    if first and not _HEADER.search(first):
+        yield first
+    while True:
+        chunk = stream.read(chunk_bytes)
+        if not chunk:
+            return
+        yield chunk + stream.readline()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="bp-classify",
+        description="Classify blood pressure readings, one per line",
+    )
+    parser.add_argument("inputs", nargs="*", help="Files to read (default: stdin)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=FORMATS, default="text")
+    parser.add_argument("--tips", action="store_true", help="Include health tips")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    args = parser.parse_args(argv)
+
+    options = (args.format, args.tips)
+    if args.inputs:
+        func = classify_range
+        jobs = (
+            (path, start, end, *options)
+            for path in args.inputs
+            for start, end in file_ranges(path, args.chunk_bytes)
+        )
+    else:
+        func = classify_chunk
+        jobs = (
+            (chunk, *options)
+            for chunk in stream_chunks(sys.stdin.buffer, args.chunk_bytes)
+        )
+
+    readings = invalid = 0
+    start = time.perf_counter()
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for body, count, bad in map_ordered(func, jobs, args.workers):
+            out.write(body)
+            readings += count
+            invalid += bad
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{readings} readings ({invalid} invalid) in {elapsed:.2f}s: "
+        f"{readings / elapsed if elapsed else 0:.0f} readings/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Response compression and template whitespace trimming
+
+Compressor is used as an after_request hook: text responses above a size
+threshold are gzip or brotli encoded to suit Accept-Encoding, at levels
+chosen for latency rather than ratio. Compressed bodies are kept in an LRU
+cache keyed by the response's ETag (or a digest of the body), so a page
+served from a response cache is compressed once, not on every request.
+
+TrimWhitespace is a Jinja extension that drops indentation and blank lines
+from template source when it is compiled, so it costs nothing per render.
+"""
+
+import gzip
+import hashlib
+import re
+
+from jinja2.ext import Extension
+
+from services.assets import choose_encoding
+from services.response_cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only without brotli
+    brotli = None
+
+COMPRESSIBLE = frozenset(
+    {
+        "text/html",
+        "text/css",
+        "text/plain",
+        "text/csv",
+        "application/json",
+        "application/javascript",
+    }
+)
+
+# Templates containing these keep their whitespace
+_PRESERVE = re.compile(r"<(?:pre|textarea)\b", re.IGNORECASE)
+
+
+class Compressor:
+    """Negotiates and applies Content-Encoding for buffered responses"""
+
+    def __init__(
+        self,
+        min_size: int = 500,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        cache_size: int = 256,
+        mimetypes=COMPRESSIBLE,
+    ):
+        """
+        Args:
+            min_size: Bodies smaller than this (bytes) are sent as they are
+            gzip_level: 1-9; 5 is within 1% of 9's size at two thirds the CPU
+            brotli_quality: 0-11; 4 is smaller than gzip -9 at ~0.1 ms per page,
+                where 11 takes milliseconds
+            cache_size: Compressed bodies kept (0 compresses every response)
+            mimetypes: Content types worth compressing
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = mimetypes
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self.cache = LRUCache(cache_size)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def process(self, response, accept_encoding: str):
+        """Compress a response in place if worthwhile; returns the response"""
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in self.mimetypes
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            key = (encoding, etag)
+        else:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        data = self.cache.get(key) if self.cache.maxsize else None
+        if data is None:
+            data = self.compress(body, encoding)
+            if self.cache.maxsize:
+                self.cache.put(key, data)
+
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # Same entity, different bytes: If-None-Match compares weakly
+            response.set_etag(etag, weak=True)
+        return response
+
+
+class TrimWhitespace(Extension):
+    """Strip indentation and blank lines from template source at compile time"""
+
+    def preprocess(self, source, name, filename=None):
+        if _PRESERVE.search(source):
+            return source
+        lines = (line.strip() for line in source.splitlines())
+        return "\n".join(line for line in lines if line) + "\n"
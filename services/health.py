@@ -0,0 +1,89 @@
+"""Liveness and readiness probes answered below Flask
+
+HealthChecks wraps the WSGI application and answers the probe paths itself,
+so a probe creates no request context, session or CSRF token, renders no
+template and is not counted in the request metrics. Readiness checks run at
+most once per interval however often the load balancer probes.
+"""
+
+import json
+import threading
+import time
+
+LIVE_BODY = b'{"status": "ok"}\n'
+READY_BODY = b'{"status": "ready"}\n'
+
+
+class HealthChecks:
+    """WSGI middleware for /healthz (liveness) and /readyz (readiness)"""
+
+    def __init__(
+        self,
+        wsgi_app,
+        check,
+        interval: float = 1.0,
+        live_path: str = "/healthz",
+        ready_path: str = "/readyz",
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            wsgi_app: Application serving every other path
+            check: Callable returning a list of reasons the worker is not ready
+            interval: Seconds a readiness result is reused for
+            live_path: Path answered 200 while the process can serve at all
+            ready_path: Path answered 200 when check() finds nothing, else 503
+            clock: Monotonic time source
+        """
+        self.wsgi_app = wsgi_app
+        self.check = check
+        self.interval = interval
+        self.live_path = live_path
+        self.ready_path = ready_path
+        self.clock = clock
+        self._problems = ()
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path == self.live_path:
+            return self._respond(environ, start_response, "200 OK", LIVE_BODY)
+        if path == self.ready_path:
+            problems = self.problems()
+            if not problems:
+                return self._respond(environ, start_response, "200 OK", READY_BODY)
+            body = json.dumps({"status": "unavailable", "problems": problems})
+            return self._respond(
+                environ, start_response, "503 Service Unavailable", body.encode()
+            )
+        return self.wsgi_app(environ, start_response)
+
+    def problems(self) -> list:
+        """The latest readiness problems, re-checked once per interval"""
+        now = self.clock()
+        checked_at = self._checked_at
+        if checked_at is None or now - checked_at >= self.interval:
+            # One probe re-checks; concurrent probes use the previous result
+            if self._lock.acquire(blocking=checked_at is None):
+                try:
+                    try:
+                        self._problems = tuple(self.check())
+                    except Exception as e:
+                        self._problems = (f"check failed: {e}",)
+                    self._checked_at = now
+                finally:
+                    self._lock.release()
+        return list(self._problems)
+
+    @staticmethod
+    def _respond(environ, start_response, status, body):
+        start_response(
+            status,
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(body))),
+                ("Cache-Control", "no-store"),
+            ],
+        )
+        return [b"" if environ.get("REQUEST_METHOD") == "HEAD" else body]
@@ -0,0 +1,221 @@
+"""Per-user reading history in SQLite
+
+Readings are appended through a LogPipeline, so a request only enqueues a
+tuple; the pipeline's worker thread inserts them in batches, one
+transaction per batch. Queries read through a per-thread connection and
+are served from the covering (user_id, ts) index, so their cost depends on
+the user's rows in the requested window, not on the size of the table.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from models.batch import CATEGORY_CODES, CODE_BY_CATEGORY
+from services.log_pipeline import BLOCK, LogPipeline
+
+DAY = 86400
+
+# Schema versions, applied in order; PRAGMA user_version records the last one.
+# Categories are stored as models.batch.CATEGORY_CODES indices.
+MIGRATIONS = (
+    """
+    CREATE TABLE readings (
+        id INTEGER PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        systolic INTEGER NOT NULL,
+        diastolic INTEGER NOT NULL,
+        category INTEGER NOT NULL
+    );
+    CREATE INDEX readings_user_ts
+        ON readings (user_id, ts, systolic, diastolic, category);
+    """,
+)
+
+
+def connect(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a connection tuned for one writer and many concurrent readers"""
+    conn = sqlite3.connect(
+        path, timeout=30, isolation_level=None, check_same_thread=check_same_thread
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending migrations; returns the number applied.
+
+    Safe to run from several processes at once: the version is re-read
+    under the write lock, so each migration runs exactly once.
+    """
+    if schema_version(conn) >= len(MIGRATIONS):
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = schema_version(conn)
+        for version in range(current, len(MIGRATIONS)):
+            for statement in filter(str.strip, MIGRATIONS[version].split(";")):
+                conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(MIGRATIONS) - current
+
+
+class SQLiteSink:
+    """LogPipeline sink inserting (user_id, ts, systolic, diastolic, category)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._pid = None
+
+    def send(self, rows):
+        # Runs on the pipeline worker; a connection never crosses a fork
+        if self._pid != os.getpid():
+            # Used by the worker thread only, but closed by whoever closes the pipeline
+            self._conn = connect(self.path, check_same_thread=False)
+            self._pid = os.getpid()
+            migrate(self._conn)
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO readings (user_id, ts, systolic, diastolic, category)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+
+class HistoryStore:
+    """Batched writes and per-user trend queries over one SQLite file"""
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        max_age: float = 1.0,
+        max_queue: int = 10000,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            batch_size: Readings inserted per transaction at most
+            max_age: Seconds a reading may wait before a partial batch is written
+            max_queue: Readings buffered in memory before writes block briefly
+        """
+        self.path = path
+        self.pipeline = LogPipeline(
+            SQLiteSink(path),
+            max_queue=max_queue,
+            batch_size=batch_size,
+            max_age=max_age,
+            policy=BLOCK,
+        )
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = connect(self.path)
+            self._local.pid = os.getpid()
+            migrate(conn)
+        return conn
+
+    def add(self, user_id: str, systolic: int, diastolic: int, category, ts=None):
+        """Queue a reading; False if the write queue stayed full"""
+        ts = int(time.time() if ts is None else ts)
+        row = (user_id, ts, systolic, diastolic, CODE_BY_CATEGORY[category])
+        return self.pipeline.submit(row)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until queued readings are written"""
+        return self.pipeline.flush(timeout)
+
+    def close(self):
+        self.pipeline.close()
+
+    def ping(self) -> bool:
+        """True if the database can be read"""
+        try:
+            self._connection().execute("SELECT 1 FROM readings LIMIT 1").fetchall()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def recent(self, user_id: str, since: float, limit: int = 50) -> list:
+        """Newest readings since a timestamp, as dicts"""
+        rows = self._connection().execute(
+            "SELECT ts, systolic, diastolic, category FROM readings"
+            " WHERE user_id = ? AND ts >= ? ORDER BY ts DESC LIMIT ?",
+            (user_id, int(since), limit),
+        )
+        return [
+            {
+                "ts": ts,
+                "systolic": systolic,
+                "diastolic": diastolic,
+                "category": CATEGORY_CODES[code],
+            }
+            for ts, systolic, diastolic, code in rows
+        ]
+
+    def category_counts(self, user_id: str, since: float) -> dict:
+        """BPCategory -> readings since a timestamp"""
+        rows = self._connection().execute(
+            "SELECT category, count(*) FROM readings"
+            " WHERE user_id = ? AND ts >= ? GROUP BY category",
+            (user_id, int(since)),
+        )
+        return {CATEGORY_CODES[code]: count for code, count in rows}
+
+    def daily_trend(self, user_id: str, since: float, window: int = 7) -> list:
+        """
+        Daily means since a timestamp with a trailing moving average.
+
+        Each entry has the day's start (UTC), its reading count and mean
+        systolic/diastolic, and the means over every reading in the window
+        days ending with it.
+        """
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT ts / ? AS day, count(*), sum(systolic), sum(diastolic)"
+                " FROM readings WHERE user_id = ? AND ts >= ?"
+                " GROUP BY day ORDER BY day",
+                (DAY, user_id, int(since)),
+            )
+            .fetchall()
+        )
+        trend = []
+        start = 0
+        for i, (day, count, systolic, diastolic) in enumerate(rows):
+            while rows[start][0] <= day - window:
+                start += 1
+            recent = rows[start : i + 1]
+            total = sum(row[1] for row in recent)
+            trend.append(
+                {
+                    "day": day * DAY,
+                    "count": count,
+                    "systolic": systolic / count,
+                    "diastolic": diastolic / count,
+                    "systolic_avg": sum(row[2] for row in recent) / total,
+                    "diastolic_avg": sum(row[3] for row in recent) / total,
+                }
+            )
+        return trend
@@ -0,0 +1,285 @@
+"""Non-blocking, batched log shipping
+
+Request threads hand log records to a bounded in-memory queue through
+QueueLogHandler; a background worker drains the queue and sends records to
+a pluggable sink in batches, by size or by age. When the queue is full the
+drop policy decides what is lost, and every drop is counted.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+DROP_POLICIES = (DROP_NEWEST, DROP_OLDEST, BLOCK)
+
+_pipelines = weakref.WeakSet()
+
+
+class MemorySink:
+    """Keeps sent records in memory (tests and local debugging)"""
+
+    def __init__(self, delay: float = 0.0):
+        """
+        Args:
+            delay: Seconds to sleep per batch, to simulate a slow backend
+        """
+        self.delay = delay
+        self.batches = []
+
+    @property
+    def records(self) -> list:
+        return [record for batch in self.batches for record in batch]
+
+    def send(self, records):
+        if self.delay:
+            time.sleep(self.delay)
+        self.batches.append(records)
+
+
+class FileSink:
+    """Appends formatted records to a local file"""
+
+    def __init__(self, path: str, formatter: logging.Formatter = None):
+        self.path = path
+        self.formatter = formatter or logging.Formatter(
+            "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+        )
+
+    def send(self, records):
+        lines = "".join(self.formatter.format(record) + "\n" for record in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class HandlerSink:
+    """Forwards batches to an ordinary logging.Handler (e.g. watchtower)"""
+
+    def __init__(self, handler: logging.Handler):
+        self.handler = handler
+
+    def send(self, records):
+        for record in records:
+            self.handler.handle(record)
+        self.handler.flush()
+
+    def close(self):
+        self.handler.close()
+
+
+class LogPipeline:
+    """Bounded queue plus a background worker that ships batches to a sink"""
+
+    def __init__(
+        self,
+        sink,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        max_age: float = 5.0,
+        policy: str = DROP_NEWEST,
+        block_timeout: float = 0.05,
+    ):
+        """
+        Args:
+            sink: Object with send(records); optional close()
+            max_queue: Records held before the drop policy applies
+            batch_size: Send as soon as this many records are queued
+            max_age: Send a partial batch once its oldest record is this old
+            policy: drop_newest, drop_oldest or block (up to block_timeout)
+            block_timeout: Seconds a full queue may block the caller
+        """
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._sending = False
+        self._flushing = 0
+        self._closed = False
+        _pipelines.add(self)
+
+    @property
+    def depth(self) -> int:
+        """Records waiting to be sent"""
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "depth": self.depth,
+        }
+
+    def submit(self, record) -> bool:
+        """Queue a record without waiting on the sink; False if it was dropped"""
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            self._ensure_worker()
+            if len(self._queue) >= self.max_queue:
+                if self.policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.policy == BLOCK:
+                    self._cond.wait_for(
+                        lambda: len(self._queue) < self.max_queue, self.block_timeout
+                    )
+                if len(self._queue) >= self.max_queue:
+                    self.dropped += 1
+                    return False
+            self._queue.append((time.monotonic(), record))
+            self.enqueued += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+            return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued record has been handed to the sink"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._queue or self._sending:
+                    if self._worker is None or not self._worker.is_alive():
+                        self._drain_locked()
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._flushing -= 1
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Flush, stop the worker and close the sink"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None and self._worker.is_alive():
+            self._worker.join(timeout)
+        close = getattr(self.sink, "close", None)
+        if close:
+            close()
+
+    def _ensure_worker(self):
+        # Started lazily so a pipeline created before a fork runs in each child
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="log-pipeline", daemon=True
+            )
+            self._worker.start()
+
+    def _after_fork(self):
+        # Threads and lock state do not survive fork(); queued records are
+        # the parent's to send
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._sending = False
+        self._flushing = 0
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                age = time.monotonic() - self._queue[0][0]
+                full = len(self._queue) >= self.batch_size
+                if not (full or self._flushing) and age < self.max_age:
+                    self._cond.wait(self.max_age - age)
+                    continue
+                self._send_batch_locked()
+            self._drain_locked()
+
+    def _drain_locked(self):
+        while self._queue:
+            self._send_batch_locked()
+
+    def _send_batch_locked(self):
+        count = min(len(self._queue), self.batch_size)
+        batch = [self._queue.popleft()[1] for _ in range(count)]
+        self._sending = True
+        self._cond.notify_all()  # wake producers blocked on a full queue
+        self._cond.release()
+        try:
+            self.sink.send(batch)
+            sent, failed = len(batch), 0
+        except Exception:
+            sent, failed = 0, 1
+        finally:
+            self._cond.acquire()
+        self.sent += sent
+        self.failed_batches += failed
+        self._sending = False
+        self._cond.notify_all()
+
+
+class QueueLogHandler(logging.Handler):
+    """Logging handler that only enqueues records onto a LogPipeline"""
+
+    def __init__(self, pipeline: LogPipeline, level=logging.NOTSET):
+        super().__init__(level)
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        # Tracebacks hold frames; render them now rather than keeping them alive
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.pipeline.submit(record)
+
+
+def pipeline_from_env(sink, environ=os.environ) -> LogPipeline:
+    """
+    Build a pipeline configured from the environment.
+
+    Reads LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_BATCH_AGE (seconds) and
+    LOG_DROP_POLICY, falling back to the LogPipeline defaults.
+    """
+    return LogPipeline(
+        sink,
+        max_queue=int(environ.get("LOG_QUEUE_SIZE", 10000)),
+        batch_size=int(environ.get("LOG_BATCH_SIZE", 500)),
+        max_age=float(environ.get("LOG_BATCH_AGE", 5.0)),
+        policy=environ.get("LOG_DROP_POLICY", DROP_NEWEST),
+    )
+
+
+def close_all(timeout: float = 5.0):
+    """Flush and close every pipeline in this process (worker shutdown hook)"""
+    for pipeline in list(_pipelines):
+        pipeline.close(timeout)
+
+
+def _after_fork_in_child():
+    for pipeline in list(_pipelines):
+        pipeline._after_fork()
+
+
+atexit.register(close_all)
+os.register_at_fork(after_in_child=_after_fork_in_child)
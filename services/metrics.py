@@ -0,0 +1,248 @@
+"""In-process metrics with a Prometheus text exposition
+
+Counters and histograms keep one shard per thread, so recording a value
+never takes a lock; shards are only summed when the metrics are scraped.
+Under gunicorn each worker can write its totals to a shared directory
+(METRICS_DIR) and the scrape endpoint, served by any worker, adds the
+totals of every worker together.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """Shared per-thread shard bookkeeping"""
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def reset(self):
+        """Forget all recorded values (tests and worker start-up)"""
+        with self._shards_lock:
+            self._shards = []
+            self._local = threading.local()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> dict:
+        """Label tuple -> total across threads"""
+        totals = {}
+        for shard in list(self._shards):
+            for labels, value in dict(shard).items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class CallbackCounter(_Metric):
+    """
+    Counter read from func() at scrape time, for counts kept elsewhere
+    (e.g. cache hits). Unlike a gauge callback it is part of the snapshot,
+    so worker totals are added together.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, func):
+        super().__init__(name, documentation)
+        self.func = func
+        self._offset = 0
+
+    def reset(self):
+        """Count from the current value on (e.g. not the master's counts)"""
+        self._offset = self.func()
+
+    def collect(self) -> dict:
+        return {(): self.func() - self._offset}
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # One count per bucket plus +Inf, then the sum
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> dict:
+        """Label tuple -> [per-bucket counts..., +Inf count, sum]"""
+        totals = {}
+        for shard in list(self._shards):
+            for labels, state in dict(shard).items():
+                total = totals.setdefault(labels, [0] * len(state))
+                for i, value in enumerate(list(state)):
+                    total[i] += value
+        return totals
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), **kwargs) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def counter_callback(self, name, documentation, func) -> CallbackCounter:
+        """Register a counter whose total is read from func() at scrape time"""
+        return self._register(CallbackCounter(name, documentation, func))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def snapshot(self) -> dict:
+        """JSON-serialisable totals of every counter and histogram"""
+        return {
+            name: [[list(labels), value] for labels, value in metric.collect().items()]
+            for name, metric in self.metrics.items()
+        }
+
+    def render(self, snapshot: dict = None) -> str:
+        """Prometheus text format, optionally from a merged snapshot"""
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(snapshot.get(name, []), key=str):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind == "counter":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                bounds = [_number(b) for b in metric.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, value):
+                    cumulative += count
+                    le = _labels(pairs + [("le", bound)])
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+class WorkerFiles:
+    """
+    Per-worker snapshot files for aggregating metrics across processes.
+
+    Each worker periodically replaces its own file; a scrape merges every
+    file in the directory. Files of exited workers are kept so counters
+    never appear to go backwards.
+    """
+
+    def __init__(self, registry: Registry, directory: str, interval: float = 1.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._last_write = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def maybe_write(self):
+        """Write this worker's snapshot if the last one is older than interval"""
+        now = time.monotonic()
+        if now - self._last_write >= self.interval:
+            self._last_write = now
+            self.write()
+
+    def write(self):
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(tmp, self.path)
+
+    def merged(self) -> dict:
+        """Sum the snapshots of every worker, including this one"""
+        self.write()
+        merged = {}
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, samples in snapshot.items():
+                totals = merged.setdefault(name, {})
+                for labels, value in samples:
+                    key = tuple(labels)
+                    if isinstance(value, list):
+                        total = totals.setdefault(key, [0] * len(value))
+                        for i, v in enumerate(value):
+                            total[i] += v
+                    else:
+                        totals[key] = totals.get(key, 0) + value
+        return {
+            name: [[list(labels), value] for labels, value in totals.items()]
+            for name, totals in merged.items()
+        }
+
+    def clear(self):
+        """Remove every worker file (call once before workers start)"""
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json*")):
+            os.remove(path)
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,255 @@
+"""Per-request phase timers and on-demand stack profiling
+
+Phases accumulates the wall-clock time of named parts of a request (form
+validation, rendering, logging...) for the Server-Timing response header,
+which browser dev tools show next to the request.
+
+Profiler is WSGI middleware that profiles a fraction of requests, or those
+carrying an admin token header. A profiled request runs under StackSampler,
+a profile hook on the request's own thread that records the current stack
+every interval of wall-clock time, weighted by the time since the last
+sample, and is written as a collapsed-stack file ("frame;frame;frame
+microseconds" per line) for flamegraph.pl, speedscope or inferno. Files
+can be concatenated to merge profiles. Other requests cost one dict lookup
+and one random number; without a rate or a token it is not installed.
+"""
+
+import hmac
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Server-Timing descriptions of the phases the app times
+PHASE_DESCRIPTIONS = {
+    "form": "Form setup and CSRF token",
+    "validate": "Form validation",
+    "classify": "Classification",
+    "history": "History write",
+    "render": "Template rendering",
+    "log": "Event logging",
+}
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+_STDLIB = os.path.dirname(os.__file__) + os.sep
+
+_DONE = object()
+
+
+class Phases:
+    """Wall-clock time per named phase of one request"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.durations = {}
+        self.clock = clock
+
+    @contextmanager
+    def __call__(self, name: str):
+        """Time the block as (another) part of phase name"""
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed
+
+    def header(self, total: float = None, descriptions=PHASE_DESCRIPTIONS) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        metrics = []
+        for name, seconds in self.durations.items():
+            desc = descriptions.get(name)
+            desc = f';desc="{desc}"' if desc else ""
+            metrics.append(f"{name}{desc};dur={seconds * 1000:.3f}")
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+@lru_cache(maxsize=4096)
+def _label(code) -> str:
+    """Frame label: function (file:first line), with library paths shortened"""
+    path = code.co_filename
+    _, found, tail = path.rpartition("site-packages" + os.sep)
+    if found:
+        path = tail
+    elif path.startswith(_STDLIB):
+        path = path[len(_STDLIB) :]
+    elif path.startswith(os.getcwd() + os.sep):
+        path = path[len(os.getcwd()) + 1 :]
+    name = getattr(code, "co_qualname", code.co_name)  # co_qualname: 3.11+
+    return f"{name} ({path}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Wall-clock stack samples of the thread that starts it"""
+
+    def __init__(self, interval: float = 0.0005, clock=time.perf_counter):
+        """
+        Args:
+            interval: Seconds between samples
+            clock: Wall-clock time source
+        """
+        self.interval = interval
+        self.clock = clock
+        # Collapsed stack (root first) -> seconds
+        self.stacks = Counter()
+        self._last = None
+        self._previous = None
+
+    def start(self):
+        self._previous = sys.getprofile()
+        self._last = self.clock()
+        sys.setprofile(self._hook)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+        # Time since the last sample belongs to the caller of stop()
+        self._record(sys._getframe(1), self.clock() - self._last)
+
+    def _hook(self, frame, event, arg):
+        now = self.clock()
+        elapsed = now - self._last
+        if elapsed < self.interval:
+            return
+        self._last = now
+        if event == "call":
+            # The time passed in the caller, before this call
+            frame = frame.f_back
+            if frame is None:
+                return
+        leaf = None
+        if event in ("c_return", "c_exception"):
+            leaf = getattr(arg, "__qualname__", None) or repr(arg)
+        self._record(frame, elapsed, leaf)
+
+    def _record(self, frame, elapsed, leaf=None):
+        labels = [leaf] if leaf else []
+        while frame is not None:
+            labels.append(_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(labels))] += elapsed
+
+    def collapsed(self) -> str:
+        """The samples in collapsed-stack format, weights in microseconds"""
+        lines = (
+            f"{stack} {max(round(seconds * 1e6), 1)}"
+            for stack, seconds in self.stacks.most_common()
+        )
+        return "".join(line + "\n" for line in lines)
+
+
+class Profiler:
+    """WSGI middleware writing a stack profile of selected requests"""
+
+    def __init__(
+        self,
+        wsgi_app,
+        directory: str,
+        rate: float = 0.0,
+        token: str = None,
+        header: str = "X-Profile",
+        interval: float = 0.0005,
+        max_files: int = 200,
+        random=random.random,
+    ):
+        """
+        Args:
+            wsgi_app: Application to profile
+            directory: Where profiles are written (created if missing)
+            rate: Fraction of requests profiled at random
+            token: Secret that, sent in header, profiles that request
+            header: Request header carrying the token
+            interval: Seconds of wall-clock time between stack samples
+            max_files: Profiles kept; the oldest are removed beyond this
+            random: Source of uniform floats in [0, 1)
+        """
+        self.wsgi_app = wsgi_app
+        self.directory = directory
+        self.rate = rate
+        self.token = token
+        self.environ_key = "HTTP_" + header.upper().replace("-", "_")
+        self.interval = interval
+        self.max_files = max_files
+        self.random = random
+
+    def wanted(self, environ) -> bool:
+        """Whether to profile this request"""
+        sent = environ.get(self.environ_key)
+        if (
+            sent is not None
+            and self.token
+            and hmac.compare_digest(sent.encode(), self.token.encode())
+        ):
+            return True
+        return self.rate > 0 and self.random() < self.rate
+
+    def __call__(self, environ, start_response):
+        if not self.wanted(environ):
+            return self.wsgi_app(environ, start_response)
+        return self._profiled(environ, start_response)
+
+    def _profiled(self, environ, start_response):
+        """
+        Run the request under a sampler, body included. The profile hook is
+        only set while the application runs, not while the server writes a
+        chunk, so a resumed body may even be produced on another thread.
+        """
+        profile_id = uuid.uuid4().hex[:12]
+
+        def start_profiled_response(status, headers, exc_info=None):
+            headers.append(("X-Profile-Id", profile_id))
+            return start_response(status, headers, exc_info)
+
+        sampler = StackSampler(self.interval)
+        sampler.start()
+        try:
+            result = self.wsgi_app(environ, start_profiled_response)
+        finally:
+            sampler.stop()
+        try:
+            chunks = iter(result)
+            while True:
+                sampler.start()
+                try:
+                    chunk = next(chunks, _DONE)
+                finally:
+                    sampler.stop()
+                if chunk is _DONE:
+                    break
+                yield chunk
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+            self.save(environ, profile_id, sampler)
+
+    def save(self, environ, profile_id, sampler) -> str:
+        """Write a request's profile; returns its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = _UNSAFE.sub("_", environ.get("PATH_INFO", "").strip("/")) or "index"
+        name = "{}-{}-{}-{}.folded".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            environ.get("REQUEST_METHOD", "GET"),
+            path[:40],
+            profile_id,
+        )
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+        self._prune()
+        return filename
+
+    def _prune(self):
+        profiles = sorted(
+            name for name in os.listdir(self.directory) if name.endswith(".folded")
+        )
+        for name in profiles[: max(len(profiles) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass  # Removed by another worker
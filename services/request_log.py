@@ -0,0 +1,105 @@
+"""Sampled, lazily formatted request events with aggregate counters
+
+Every event is counted, but only a configurable fraction of each event type
+is written to the log, and messages are only formatted by the handler that
+finally emits them. Counts are flushed as a single summary record at a
+fixed interval, so log volume stays flat as traffic grows.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+DEFAULT_SAMPLE_RATES = {
+    "bp.classified": 0.01,
+    "bp.validation_failed": 1.0,
+    "tips.viewed": 0.01,
+}
+
+
+def parse_sample_rates(value: str) -> dict:
+    """
+    Parse "event=rate,event=rate" into a dict of rates between 0 and 1.
+
+    Raises:
+        ValueError: If an entry is malformed or a rate is out of range
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, _, rate = entry.partition("=")
+        rate = float(rate)
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Sample rate for {name} must be between 0 and 1")
+        rates[name.strip()] = rate
+    return rates
+
+
+class EventLog:
+    """Structured request events with per-event sampling"""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rates: dict = None,
+        flush_interval: float = 60.0,
+        random_func=random.random,
+    ):
+        """
+        Args:
+            logger: Logger the sampled events and summaries are written to
+            sample_rates: Event name -> fraction logged (missing names: 1.0)
+            flush_interval: Seconds between aggregate count summaries
+            random_func: Source of uniform [0, 1) numbers for sampling
+        """
+        self.logger = logger
+        self.sample_rates = (
+            DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates
+        )
+        self.flush_interval = flush_interval
+        self.random = random_func
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def event(self, name: str, message: str, level: int = logging.INFO, **fields):
+        """
+        Count an event and log it if it is enabled and sampled.
+
+        The message is a %-style template over the fields, e.g.
+        "BP calculated: category=%(category)s"; it is only formatted if the
+        record is actually emitted.
+        """
+        with self._lock:
+            self.counts[name] += 1
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = self.sample_rates.get(name, 1.0)
+        if rate < 1.0 and self.random() >= rate:
+            return
+        # logging only treats a non-empty dict as %-mapping arguments
+        args = (fields,) if fields else ()
+        self.logger.log(
+            level,
+            message,
+            *args,
+            extra={"event": name, "fields": fields, "sample_rate": rate},
+        )
+
+    def flush(self):
+        """Log and reset the event counts accumulated since the last flush"""
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+            elapsed = time.monotonic() - self._last_flush
+            self._last_flush = time.monotonic()
+        if counts:
+            self.logger.info(
+                "Request events in the last %.0fs: %s",
+                elapsed,
+                dict(counts),
+                extra={"event": "events.summary", "fields": dict(counts)},
+            )
@@ -0,0 +1,160 @@
+"""Response caches for pages whose output only changes with their inputs"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, request
+
+
+class RenderedPage:
+    """Rendered body plus the validators sent with it"""
+
+    __slots__ = ("body", "etag", "last_modified", "fingerprint")
+
+    def __init__(self, body: bytes, fingerprint):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.last_modified = time.time()
+        self.fingerprint = fingerprint
+
+
+class PageCache:
+    """
+    Renders a page once and serves the cached bytes until its inputs change.
+
+    The fingerprint callable returns a cheap, hashable summary of everything
+    the page depends on; a new fingerprint triggers a re-render. A page with
+    variants (e.g. one per locale) passes the variant's key to get() and
+    response(), which hand it on to render and fingerprint.
+    """
+
+    def __init__(self, render, fingerprint):
+        """
+        Args:
+            render: Callable returning the page HTML
+            fingerprint: Callable returning a value that changes with the inputs
+        """
+        self.render = render
+        self.fingerprint = fingerprint
+        # Variant key (() for a page without variants) -> RenderedPage
+        self.pages = {}
+
+    def get(self, *key) -> RenderedPage:
+        """Return the cached page, re-rendering it if the inputs changed"""
+        fingerprint = self.fingerprint(*key)
+        page = self.pages.get(key)
+        if page is None or page.fingerprint != fingerprint:
+            page = RenderedPage(self.render(*key).encode("utf-8"), fingerprint)
+            self.pages[key] = page
+        return page
+
+    def invalidate(self):
+        """Drop every cached page"""
+        self.pages = {}
+
+    def response(self, *key) -> Response:
+        """Serve the cached page, answering conditional requests with 304"""
+        page = self.get(*key)
+        response = Response(page.body, mimetype="text/html")
+        response.set_etag(page.etag)
+        response.last_modified = page.last_modified
+        return response.make_conditional(request)
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize: int):
+        """
+        Args:
+            maxsize: Maximum number of entries; 0 disables the cache
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize: int):
+        """Change the capacity, evicting entries that no longer fit"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Counters and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+class TokenizedPage:
+    """
+    Rendered page with a per-request token (e.g. CSRF) cut out.
+
+    The body is stored as the fragments around each occurrence of the
+    token, so the cached bytes never contain it and it can be spliced back
+    in for every response.
+    """
+
+    __slots__ = ("fragments",)
+
+    def __init__(self, html: str, token: str = None):
+        self.fragments = tuple(html.split(token)) if token else (html,)
+
+    def render(self, token: str = None) -> str:
+        """Reassemble the page around a fresh token"""
+        return (token or "").join(self.fragments)
+
+
+def template_fingerprint(app, names):
+    """
+    Modification times of the given templates when Jinja auto-reload is on.
+
+    Without auto-reload Jinja never re-reads a template for the life of the
+    worker, so neither does the cache.
+    """
+    env = app.jinja_env
+    if not env.auto_reload:
+        return None
+    return tuple(os.path.getmtime(env.get_template(name).filename) for name in names)
@@ -0,0 +1,38 @@
+"""Start-up timing instrumentation
+
+Import this module before anything heavy: the clock starts when it is
+first imported, and each mark() records the time since the previous mark.
+"""
+
+import threading
+import time
+
+
+class StartupTimer:
+    """Durations of named start-up phases, in seconds"""
+
+    def __init__(self):
+        self.phases = {}
+        self._last = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> float:
+        """Record the time since the previous mark as phase name"""
+        now = time.perf_counter()
+        with self._lock:
+            elapsed, self._last = now - self._last, now
+            self.phases[name] = elapsed
+        return elapsed
+
+    def record(self, name: str, seconds: float):
+        """Record a phase timed elsewhere (e.g. on a background thread)"""
+        with self._lock:
+            self.phases[name] = seconds
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{name}={secs * 1000:.1f}ms" for name, secs in self.phases.items()
+        )
+
+
+startup_timer = StartupTimer()
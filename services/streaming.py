@@ -0,0 +1,168 @@
+"""Incremental JSON readers and writers for streamed request/response bodies
+
+Both readers pull fixed-size chunks from a file-like stream and yield one
+decoded item at a time, so memory use does not depend on the body size.
+"""
+
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+MAX_LINE_BYTES = 64 * 1024
+MAX_ITEM_CHARS = 64 * 1024
+
+# Longest token a chunk boundary can cut short ("-Infinity"; "\uXXXX" is 6)
+_MAX_TOKEN = 10
+
+_WHITESPACE = re.compile(r"\s*")
+# What may follow the part of a number a chunk boundary cut ("-0." or "1e")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+class MalformedItem:
+    """Placeholder yielded for an item that could not be decoded"""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+def iter_ndjson(stream, max_line: int = MAX_LINE_BYTES):
+    """
+    Yield one decoded value per non-blank line of a newline-delimited JSON body.
+
+    Lines that are not valid JSON, or longer than max_line bytes, yield a
+    MalformedItem instead so the caller can report them and carry on.
+    """
+    while True:
+        line = stream.readline(max_line + 1)
+        if not line:
+            return
+        if len(line) > max_line:
+            # Skip the remainder of the oversized line without buffering it
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line + 1)
+            yield MalformedItem("Line too long")
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield MalformedItem("Malformed JSON")
+
+
+def iter_json_array(
+    stream, chunk_size: int = CHUNK_SIZE, max_item: int = MAX_ITEM_CHARS
+):
+    """
+    Iterator over the elements of a top-level JSON array as they arrive.
+
+    The opening bracket is read before this returns, so a body that is not
+    an array can be rejected before any response is started.
+
+    Raises:
+        ValueError: If the body is not a JSON array (here), or when iterated,
+        if an element is malformed or longer than max_item characters.
+        Elements decoded before the error have already been yielded.
+    """
+    reader = _ChunkReader(stream, chunk_size)
+    if reader.next_char() != "[":
+        raise ValueError("Expected a JSON array")
+    reader.pos += 1
+    return _array_elements(reader, max_item)
+
+
+def _array_elements(reader, max_item):
+    decoder = json.JSONDecoder()
+    if reader.next_char() == "]":
+        return
+
+    while True:
+        reader.next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(reader.buffer, reader.pos)
+            except json.JSONDecodeError as e:
+                if reader.eof or not _incomplete(e, len(reader.buffer)):
+                    raise ValueError("Malformed JSON array element") from None
+                _fill_item(reader, max_item)
+                continue
+            # A number running to the end of the buffer, or decoded short of
+            # it ("-0" of "-0."), may continue in the next chunk
+            if not reader.eof and _NUMBER_TAIL.fullmatch(reader.buffer, end):
+                _fill_item(reader, max_item)
+                continue
+            break
+        reader.pos = end
+        yield value
+
+        separator = reader.next_char()
+        reader.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError("Expected ',' or ']' in JSON array")
+
+
+def _incomplete(error, length: int) -> bool:
+    """Whether a decode error may only mean the element is not all read yet"""
+    # An unterminated string is reported where it starts; anything else that
+    # fails well before the end of the buffer is malformed whatever follows
+    return error.msg.startswith("Unterminated string") or (
+        error.pos >= length - _MAX_TOKEN
+    )
+
+
+def _fill_item(reader, max_item):
+    """Read more of the current element, refusing to buffer more than max_item"""
+    if len(reader.buffer) - reader.pos > max_item:
+        raise ValueError("JSON array element too long")
+    reader.fill()
+
+
+class _ChunkReader:
+    """Sliding text window over a byte stream"""
+
+    def __init__(self, stream, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Drop consumed text and append the next chunk"""
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos :] + self.utf8.decode(chunk, self.eof)
+        self.pos = 0
+
+    def next_char(self) -> str:
+        """Skip whitespace and return the next character ('' at end of body)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                raise ValueError("Unexpected end of JSON array")
+            self.fill()
+
+
+def ndjson_lines(items):
+    """Encode items as newline-delimited JSON, one line per item"""
+    for item in items:
+        yield json.dumps(item, separators=(",", ":")) + "\n"
+
+
+def json_array_chunks(items):
+    """Encode items as a single JSON array, one chunk per item"""
+    separator = "["
+    for item in items:
+        yield separator + json.dumps(item, separators=(",", ":"))
+        separator = ","
+    yield "[]" if separator == "[" else "]"
@@ -0,0 +1,165 @@
+"""Lazily initialised AWS X-Ray and CloudWatch telemetry
+
+boto3, watchtower and aws_xray_sdk are slow to import and build network
+clients, so nothing is imported until the worker serves its first request.
+Initialisation then runs on a background thread; until it finishes,
+requests are served untraced and log records wait in the log pipeline.
+"""
+
+import logging
+import threading
+import time
+
+from flask import g
+
+from services.log_pipeline import HandlerSink, QueueLogHandler, pipeline_from_env
+from services.startup import startup_timer
+
+LOG_GROUP = "/aws/elasticbeanstalk/bp-calculator-app"
+LOG_STREAM = "application"
+
+
+class DeferredSink:
+    """Log pipeline sink that waits for the real sink to be configured"""
+
+    def __init__(self, ready: threading.Event, timeout: float = 30.0):
+        self.ready = ready
+        self.timeout = timeout
+        self.target = None
+
+    def send(self, records):
+        # Runs on the pipeline worker thread, never on a request thread
+        self.ready.wait(self.timeout)
+        if self.target is None:
+            raise RuntimeError("Telemetry sink is not available")
+        self.target.send(records)
+
+    def close(self):
+        if self.target is not None and hasattr(self.target, "close"):
+            self.target.close()
+
+
+class DeferredHooks:
+    """
+    Stand-in for the Flask app handed to middleware created after start-up.
+
+    Flask refuses new request hooks once it has served a request, so the
+    hooks a late middleware registers are collected here and run by hooks
+    registered on the real app in advance.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = app.logger
+        self.config = app.config
+        self.before = []
+        self.after = []
+        self.teardown = []
+
+    def before_request(self, func):
+        self.before.append(func)
+        return func
+
+    def after_request(self, func):
+        self.after.append(func)
+        return func
+
+    def teardown_request(self, func):
+        self.teardown.append(func)
+        return func
+
+
+class Telemetry:
+    """X-Ray tracing and CloudWatch logging, initialised in the background"""
+
+    def __init__(self, app, region: str, loggers=()):
+        """
+        Args:
+            app: Flask application to trace
+            region: AWS region for the CloudWatch Logs client
+            loggers: Extra loggers (besides app.logger) to ship to CloudWatch
+        """
+        self.app = app
+        self.region = region
+        self.ready = threading.Event()
+        self.error = None
+        self.hooks = DeferredHooks(app)
+        self.sink = DeferredSink(self.ready)
+        self.pipeline = pipeline_from_env(self.sink)
+        self._loggers = [app.logger, *loggers]
+        self._started = False
+        self._lock = threading.Lock()
+
+    def attach(self):
+        """Register request hooks and log handlers; imports nothing from AWS"""
+        self.app.before_request(self._before_request)
+        self.app.after_request(self._after_request)
+        self.app.teardown_request(self._teardown_request)
+        handler = QueueLogHandler(self.pipeline)
+        for logger in self._loggers:
+            logger.addHandler(handler)
+
+    def start(self):
+        """Begin background initialisation (idempotent)"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(
+            target=self._initialize, name="telemetry-init", daemon=True
+        ).start()
+
+    def _initialize(self):
+        try:
+            start = time.perf_counter()
+            import boto3
+            import watchtower
+            from aws_xray_sdk.core import xray_recorder
+            from aws_xray_sdk.ext.flask.middleware import XRayMiddleware
+
+            imported = time.perf_counter()
+            startup_timer.record("telemetry_imports", imported - start)
+
+            # Configure X-Ray for distributed tracing
+            xray_recorder.configure(service="bp-calculator")
+            XRayMiddleware(self.hooks, xray_recorder)
+
+            # Configure CloudWatch Logs handler
+            self.sink.target = HandlerSink(
+                watchtower.CloudWatchLogHandler(
+                    log_group=LOG_GROUP,
+                    stream_name=LOG_STREAM,
+                    boto3_client=boto3.client("logs", region_name=self.region),
+                )
+            )
+            for logger in self._loggers[1:]:
+                logger.setLevel(logging.INFO)
+            startup_timer.record("telemetry_setup", time.perf_counter() - imported)
+            self.app.logger.info(
+                f"AWS X-Ray and CloudWatch monitoring initialized "
+                f"({startup_timer.summary()})"
+            )
+        except Exception as e:
+            self.error = e
+            self.app.logger.warning(f"Failed to initialize AWS monitoring: {e}")
+        finally:
+            self.ready.set()
+
+    def _before_request(self):
+        self.start()
+        # Only trace requests that began after the middleware was ready
+        if self.hooks.before and self.ready.is_set():
+            g.telemetry_traced = True
+            for func in self.hooks.before:
+                func()
+
+    def _after_request(self, response):
+        if g.get("telemetry_traced"):
+            for func in self.hooks.after:
+                response = func(response)
+        return response
+
+    def _teardown_request(self, exc):
+        if g.get("telemetry_traced"):
+            for func in self.hooks.teardown:
+                func(exc)
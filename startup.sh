@@ -9,9 +9,21 @@ echo "Starting BP Calculator application..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
-# Run database migrations if needed (for future use)
-# python manage.py migrate
+# Run database migrations (no-op unless HISTORY_DB is set)
+flask --app app migrate
+
+# Bundle, fingerprint and precompress static assets (workers share the result)
+flask --app app assets
+
+# Compile templates into the bytecode cache every worker loads from
+flask --app app compile-templates
 
 # Start Gunicorn server
 echo "Starting Gunicorn..."
-gunicorn --bind=0.0.0.0:8000 --timeout 600 --workers=4 app:app
+if [ "${SERVER_MODE}" = "asgi" ]; then
+    # Async workers: slow clients and log shipping do not hold a worker
+    gunicorn --config gunicorn.conf.py --bind=0.0.0.0:8000 --timeout 600 --workers=4 \
+        --worker-class=uvicorn.workers.UvicornWorker asgi:application
+else
+    gunicorn --config gunicorn.conf.py --bind=0.0.0.0:8000 --timeout 600 --workers=4 app:app
+fi
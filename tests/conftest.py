@@ -0,0 +1,18 @@
+"""Fixtures shared by the unit tests"""
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic time source that only moves when a test sets now"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -1,7 +1,9 @@
 """Unit tests for Flask application routes"""
 
+import json
+
 import pytest
-from app import app
+from app import EXTENSION, app, create_app, tips_html
 
 
 @pytest.fixture
@@ -144,6 +146,60 @@ class TestHealthTipsRoute:
         assert b"Pre-High Blood Pressure" in response.data
         assert b"High Blood Pressure" in response.data
 
+    def test_health_tips_etag_304(self, client):
+        """Test a matching If-None-Match returns 304 Not Modified"""
+        response = client.get("/tips")
+        assert response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+
+        cached = client.get(
+            "/tips", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert cached.status_code == 304
+        assert cached.data == b""
+
+    def test_health_tips_cache_invalidated_by_tips_change(self, tmp_path):
+        """Test changing a tips file re-renders the page"""
+        tips_file = tmp_path / "en.json"
+        tips_file.write_text(json.dumps({"LOW": ["First tip"]}))
+        test_app = create_app({"TESTING": True, "TIPS_DIR": str(tmp_path)})
+        client = test_app.test_client()
+        before = client.get("/tips")
+        assert b"First tip" in before.data
+
+        tips_file.write_text(json.dumps({"LOW": ["Brand new tip"]}))
+        test_app.extensions[EXTENSION].tips.reload()
+        after = client.get("/tips", headers={"If-None-Match": before.headers["ETag"]})
+        assert after.status_code == 200
+        assert b"Brand new tip" in after.data
+        assert after.headers["ETag"] != before.headers["ETag"]
+
+    def test_health_tips_localized(self, tmp_path):
+        """Test the page follows Accept-Language, falling back to English"""
+        (tmp_path / "es.json").write_text(
+            json.dumps({"HIGH": ["Consulte a su médico"]}), encoding="utf-8"
+        )
+        client = create_app({"TESTING": True, "TIPS_DIR": str(tmp_path)}).test_client()
+        spanish = client.get("/tips", headers={"Accept-Language": "es-MX,en;q=0.5"})
+        assert spanish.headers["Content-Language"] == "es"
+        assert "Accept-Language" in spanish.headers["Vary"]
+        assert "Consulte a su médico" in spanish.get_data(as_text=True)
+        assert b"Stay well hydrated" in spanish.data
+        english = client.get("/tips", headers={"Accept-Language": "fr"})
+        assert english.headers["Content-Language"] == "en"
+        assert "médico" not in english.get_data(as_text=True)
+
+    def test_tips_html_escaped_and_shared(self):
+        """Test tips are escaped into list items built once per tuple"""
+        tips = ('Salt & <b>"water"</b>', "Rest")
+        html = tips_html(tips)
+        assert html == (
+            '<li class="list-group-item">Salt &amp; &lt;b&gt;&#34;water&#34;'
+            '&lt;/b&gt;</li>\n<li class="list-group-item">Rest</li>\n'
+        )
+        assert tips_html(tuple(tips)) is html
+        assert tips_html(()) == ""
+
 
 class TestFaviconRoute:
     """Test the favicon route"""
@@ -198,3 +254,81 @@ class TestFormValidation:
         )
         assert response.status_code == 200
         # Should show validation error
+
+
+class TestClassifyApi:
+    """Test the JSON batch classification endpoint"""
+
+    def test_ndjson_round_trip(self, client):
+        """Test NDJSON readings stream back one result per line"""
+        body = '{"systolic": 110, "diastolic": 70}\n[150, 95]\n\n{"systolic": 85}\n'
+        response = client.post(
+            "/api/classify", data=body, content_type="application/x-ndjson"
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        results = [json.loads(line) for line in response.data.splitlines()]
+        assert [r["category"] for r in results] == [
+            "Ideal Blood Pressure",
+            "High Blood Pressure",
+            None,
+        ]
+        assert results[2]["errors"] == {"diastolic": ["This field is required."]}
+        assert [r["index"] for r in results] == [0, 1, 2]
+
+    def test_json_array_round_trip(self, client):
+        """Test a JSON array body returns a JSON array of results"""
+        readings = [{"systolic": s, "diastolic": 55} for s in range(80, 180, 10)]
+        response = client.post("/api/classify", json=readings)
+        assert response.status_code == 200
+        results = response.get_json()
+        assert len(results) == len(readings)
+        assert results[0]["category"] == "Low Blood Pressure"
+        assert results[-1]["category"] == "High Blood Pressure"
+
+    def test_empty_json_array(self, client):
+        """Test an empty array returns an empty array"""
+        response = client.post("/api/classify", json=[])
+        assert response.get_json() == []
+
+    def test_reuses_form_validation_rules(self, client):
+        """Test range and systolic > diastolic errors match the form"""
+        readings = [[65, 50], [120, 105], [80, 85], ["abc", 70]]
+        results = client.post("/api/classify", json=readings).get_json()
+        assert results[0]["errors"] == {"systolic": ["Invalid Systolic Value"]}
+        assert results[1]["errors"] == {"diastolic": ["Invalid Diastolic Value"]}
+        assert results[2]["errors"] == {
+            "systolic": ["Systolic must be greater than Diastolic"]
+        }
+        assert results[3]["errors"] == {"systolic": ["Not a valid integer value."]}
+        assert all(r["category"] is None for r in results)
+
+    def test_malformed_ndjson_line(self, client):
+        """Test a bad line is reported without stopping the batch"""
+        body = "{not json}\n[120, 70]\n"
+        response = client.post(
+            "/api/classify", data=body, content_type="application/x-ndjson"
+        )
+        results = [json.loads(line) for line in response.data.splitlines()]
+        assert results[0]["errors"] == {"reading": ["Malformed JSON"]}
+        assert results[1]["category"] == "Pre-High Blood Pressure"
+
+    def test_malformed_json_array(self, client):
+        """Test a truncated array reports an error after the good items"""
+        response = client.post(
+            "/api/classify", data="[[120, 70], [130", content_type="application/json"
+        )
+        results = response.get_json()
+        assert results[0]["category"] == "Pre-High Blood Pressure"
+        assert "request" in results[1]["errors"]
+
+    def test_json_body_not_an_array(self, client):
+        """Test a JSON body that is not an array is rejected up front"""
+        response = client.post("/api/classify", json={"systolic": 120})
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Expected a JSON array"}
+
+    def test_unsupported_content_type(self, client):
+        """Test form-encoded bodies are rejected"""
+        response = client.post("/api/classify", data={"systolic": "120"})
+        assert response.status_code == 415
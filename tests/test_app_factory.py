@@ -0,0 +1,133 @@
+"""Unit tests for the application factory and fork hooks"""
+
+import logging
+import os
+
+import pytest
+
+from app import EXTENSION, create_app, init_worker, warm_up
+from models import blood_pressure
+
+
+@pytest.fixture
+def factory_app():
+    app = create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
+    return app, app.extensions[EXTENSION]
+
+
+class TestCreateApp:
+    """Test create_app builds independent applications"""
+
+    def test_config_overrides_environment(self, monkeypatch):
+        """Test explicit config wins over environment settings"""
+        monkeypatch.setenv("INDEX_CACHE_SIZE", "10")
+        app = create_app({"INDEX_CACHE_SIZE": 3})
+        assert app.config["INDEX_CACHE_SIZE"] == 3
+        assert app.extensions[EXTENSION].index_cache.maxsize == 3
+
+    def test_endpoint_names_unchanged(self, factory_app):
+        """Test routes keep the endpoint names templates link to"""
+        app, _ = factory_app
+        endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+        assert {"index", "classify_api", "metrics_endpoint", "privacy"} <= endpoints
+        assert {"health_tips", "favicon", "static"} <= endpoints
+
+    def test_apps_do_not_share_state(self, factory_app):
+        """Test each application counts its own requests"""
+        app, state = factory_app
+        other = create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
+        app.test_client().post("/", data={"systolic": 120, "diastolic": 70})
+        assert state.classifications.collect()
+        assert not other.extensions[EXTENSION].classifications.collect()
+
+
+class TestForkHooks:
+    """Test the pre-fork and post-fork hooks"""
+
+    def test_warm_up_builds_shared_state(self, factory_app, monkeypatch):
+        """Test warm_up compiles templates and the category table once"""
+        app, state = factory_app
+        monkeypatch.setattr(blood_pressure, "_table", None)
+        warm_up(app)
+        assert state.warmed_up
+        assert blood_pressure._table is not None
+        assert len(app.jinja_env.cache) >= 5
+
+        calls = []
+        monkeypatch.setattr(app.jinja_env, "get_template", calls.append)
+        warm_up(app)
+        assert calls == []
+
+    def test_init_worker_resets_master_metrics(self, factory_app):
+        """Test metrics recorded before the fork are not reported by workers"""
+        app, state = factory_app
+        state.classifications.inc("IDEAL", "form")
+        init_worker(app)
+        assert state.warmed_up
+        assert state.classifications.collect() == {}
+
+    def test_init_worker_once_per_process(self, factory_app, monkeypatch):
+        """Test a second start-up hook in the same worker changes nothing"""
+        app, state = factory_app
+        init_worker(app)
+        state.classifications.inc("IDEAL", "form")
+        monkeypatch.setattr("app.warm_routes", lambda app: pytest.fail("rerun"))
+        init_worker(app)
+        assert state.classifications.collect() == {("IDEAL", "form"): 1}
+
+    def test_init_worker_starts_telemetry(self, monkeypatch):
+        """Test telemetry initialisation begins in the worker, not at creation"""
+        # Telemetry attaches a handler to the "app" logger every app shares
+        logger = logging.getLogger("app")
+        monkeypatch.setattr(logger, "handlers", list(logger.handlers))
+        app = create_app({"CLOUDWATCH_ENABLED": True})
+        telemetry = app.extensions[EXTENSION].telemetry
+        assert not telemetry._started
+        telemetry._initialize = telemetry.ready.set
+        init_worker(app)
+        assert telemetry._started
+        telemetry.pipeline.close(timeout=1)
+
+
+class TestTemplateWarmUp:
+    """Test precompiled templates and the first request after warm-up"""
+
+    def make_app(self, tmp_path, **config):
+        return create_app(
+            {
+                "TESTING": True,
+                "TEMPLATE_CACHE_DIR": str(tmp_path / "templates"),
+                "ASSETS_DIR": str(tmp_path / "assets"),
+                **config,
+            }
+        )
+
+    def test_workers_share_compiled_templates(self, tmp_path, monkeypatch):
+        """Test templates compiled once are loaded, not compiled, by others"""
+        builder = self.make_app(tmp_path)
+        result = builder.test_cli_runner().invoke(args=["compile-templates"])
+        assert "Compiled" in result.output
+
+        worker = self.make_app(tmp_path)
+        compiled = []
+        monkeypatch.setattr(worker.jinja_env, "compile", compiled.append)
+        warm_up(worker)
+        assert compiled == []
+
+    def test_trimmed_templates_cached_separately(self, tmp_path):
+        """Test trimmed and untrimmed compilations never share entries"""
+        warm_up(self.make_app(tmp_path))
+        warm_up(self.make_app(tmp_path, TEMPLATE_TRIM=True))
+        names = os.listdir(tmp_path / "templates")
+        trimmed = [name for name in names if name.endswith(".trim.cache")]
+        assert trimmed and len(trimmed) * 2 == len(names)
+
+    def test_first_request_compiles_nothing(self, tmp_path, monkeypatch):
+        """Test a worker's first request after init_worker compiles nothing"""
+        # Latency itself is measured by benchmarks/bench_first_request.py
+        app = self.make_app(tmp_path)
+        init_worker(app)
+        compiled = []
+        monkeypatch.setattr(app.jinja_env, "compile", compiled.append)
+        assert app.test_client().get("/").status_code == 200
+        assert compiled == []
@@ -0,0 +1,119 @@
+"""Unit tests for the ASGI adapter"""
+
+import asyncio
+import json
+
+from app import app
+from services.asgi import WsgiToAsgi, build_environ
+
+
+def http_scope(method="GET", path="/", headers=(), query=b""):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 5000),
+    }
+
+
+def call(application, scope, body_chunks=(b"",)):
+    """Run one request; returns (status, headers dict, body, send messages)"""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1}
+        for i, chunk in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = sent[0]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], dict(start["headers"]), body, sent
+
+
+class TestWsgiToAsgi:
+    """Test requests through the adapter reach the Flask app"""
+
+    def setup_method(self):
+        self.application = WsgiToAsgi(app, max_threads=2)
+
+    def test_get_page(self):
+        """Test a page renders with its headers"""
+        status, headers, body, _ = call(self.application, http_scope(path="/privacy"))
+        assert status == 200
+        assert headers[b"content-type"].startswith(b"text/html")
+        assert b"Privacy" in body
+
+    def test_error_handler(self):
+        """Test the app's 404 handler is used"""
+        status, _, body, _ = call(self.application, http_scope(path="/missing"))
+        assert status == 404
+        assert b"Request ID" in body
+
+    def test_streamed_request_and_response(self):
+        """Test a body split over messages is reassembled and results stream"""
+        chunks = [b'{"systolic": 150, "diast', b'olic": 95}\n[80, 50]\n']
+        scope = http_scope(
+            "POST", "/api/classify", [("content-type", "application/x-ndjson")]
+        )
+        status, _, body, sent = call(self.application, scope, chunks)
+        assert status == 200
+        results = [json.loads(line) for line in body.splitlines()]
+        assert [r["category"] for r in results] == [
+            "High Blood Pressure",
+            "Low Blood Pressure",
+        ]
+        assert sent[-1] == {"type": "http.response.body", "body": b""}
+
+    def test_lifespan_hooks(self):
+        """Test startup and shutdown hooks run and report completion"""
+        calls = []
+        application = WsgiToAsgi(
+            app,
+            on_startup=lambda: calls.append("startup"),
+            on_shutdown=lambda: calls.append("shutdown"),
+        )
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(application({"type": "lifespan"}, receive, send))
+        assert calls == ["startup", "shutdown"]
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+class TestBuildEnviron:
+    """Test ASGI scope to WSGI environ translation"""
+
+    def test_headers_and_query(self):
+        """Test content headers, repeated headers and the query string"""
+        scope = http_scope(
+            "POST",
+            "/api/classify",
+            [
+                ("content-type", "application/json"),
+                ("content-length", "2"),
+                ("x-tag", "a"),
+                ("x-tag", "b"),
+            ],
+            b"q=1",
+        )
+        environ = build_environ(scope, None)
+        assert environ["CONTENT_TYPE"] == "application/json"
+        assert environ["CONTENT_LENGTH"] == "2"
+        assert environ["HTTP_X_TAG"] == "a,b"
+        assert environ["QUERY_STRING"] == "q=1"
+        assert environ["PATH_INFO"] == "/api/classify"
@@ -0,0 +1,131 @@
+"""Unit tests for the fingerprinted static asset bundles"""
+
+import gzip
+import os
+
+import brotli
+import pytest
+
+from app import EXTENSION, create_app, warm_up
+from services.assets import (
+    BUNDLES,
+    build,
+    choose_encoding,
+    load_manifest,
+    load_or_build,
+)
+
+
+@pytest.fixture
+def static(tmp_path):
+    """A small static folder with one bundle of two sources"""
+    folder = tmp_path / "static"
+    (folder / "js").mkdir(parents=True)
+    (folder / "js" / "a.js").write_text("var a = 1\n//# sourceMappingURL=a.js.map\n")
+    (folder / "js" / "b.js").write_text("var b = 2\n")
+    return str(folder), {"app.js": ("js/a.js", "js/b.js")}
+
+
+@pytest.fixture(scope="module")
+def built_app(tmp_path_factory):
+    # Built once: brotli at full quality takes about a second
+    output = str(tmp_path_factory.mktemp("dist"))
+    app = create_app({"TESTING": True, "ASSETS_DIR": output})
+    warm_up(app)
+    return app
+
+
+class TestBuild:
+    """Test building bundles and the manifest"""
+
+    def test_bundle_is_fingerprinted_and_compressed(self, static, tmp_path):
+        """Test bundles get content-hashed names and decodable variants"""
+        folder, bundles = static
+        output = str(tmp_path / "dist")
+        manifest = build(folder, output, bundles)
+        entry = manifest["assets"]["app.js"]
+        assert entry["file"].startswith("app.") and entry["file"].endswith(".js")
+
+        with open(os.path.join(output, entry["file"]), "rb") as f:
+            data = f.read()
+        assert data == b"var a = 1;\nvar b = 2\n"
+        with open(os.path.join(output, entry["file"] + ".gz"), "rb") as f:
+            assert gzip.decompress(f.read()) == data
+        with open(os.path.join(output, entry["file"] + ".br"), "rb") as f:
+            assert brotli.decompress(f.read()) == data
+        assert load_manifest(output) == manifest
+
+    def test_rebuild_only_when_sources_change(self, static, tmp_path):
+        """Test a changed source gets a new name and old files are removed"""
+        folder, bundles = static
+        output = str(tmp_path / "dist")
+        first = load_or_build(folder, output, bundles)["assets"]["app.js"]["file"]
+        assert (
+            load_or_build(folder, output, bundles)["assets"]["app.js"]["file"] == first
+        )
+
+        with open(os.path.join(folder, "js", "b.js"), "a") as f:
+            f.write("var c = 3\n")
+        second = load_or_build(folder, output, bundles)["assets"]["app.js"]["file"]
+        assert second != first
+        assert sorted(os.listdir(output)) == sorted(
+            ["manifest.json", second, second + ".gz", second + ".br"]
+        )
+
+
+class TestChooseEncoding:
+    """Test Accept-Encoding negotiation"""
+
+    def test_preference_and_quality(self):
+        """Test brotli is preferred and q=0 excludes a coding"""
+        available = ["br", "gzip"]
+        assert choose_encoding("gzip, deflate, br", available) == "br"
+        assert choose_encoding("gzip, br;q=0", available) == "gzip"
+        assert choose_encoding("*", ["gzip"]) == "gzip"
+        assert choose_encoding("*, gzip;q=0", ["gzip"]) is None
+        assert choose_encoding("", available) is None
+        assert choose_encoding(None, available) is None
+
+
+class TestAssetRoutes:
+    """Test serving bundles and linking them from pages"""
+
+    def test_pages_link_bundles(self, built_app):
+        """Test a page view loads three fingerprinted bundles"""
+        page = built_app.test_client().get("/").get_data(as_text=True)
+        for name, entry in built_app.extensions[EXTENSION].assets.items():
+            assert f'/assets/{entry["file"]}"' in page
+        assert "/static/lib/" not in page
+
+    def test_sources_without_manifest(self, tmp_path):
+        """Test pages fall back to the source files when nothing is built"""
+        app = create_app({"TESTING": True, "ASSETS_DIR": str(tmp_path / "none")})
+        page = app.test_client().get("/").get_data(as_text=True)
+        for source in BUNDLES["site.js"] + BUNDLES["validation.js"]:
+            assert f"/static/{source}" in page
+
+    @pytest.mark.parametrize(
+        "accept, encoding", [("gzip, br", "br"), ("gzip", "gzip"), ("", None)]
+    )
+    def test_served_precompressed_and_immutable(self, built_app, accept, encoding):
+        """Test the variant matches Accept-Encoding and caching is far-future"""
+        entry = built_app.extensions[EXTENSION].assets["site.css"]
+        response = built_app.test_client().get(
+            f"/assets/{entry['file']}", headers={"Accept-Encoding": accept}
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "text/css"
+        assert response.headers.get("Content-Encoding") == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 365 * 24 * 3600
+        if encoding is None:
+            assert len(response.data) == entry["size"]
+        else:
+            assert len(response.data) < entry["size"] / 4
+
+    def test_unknown_asset(self, built_app):
+        """Test files outside the manifest are not served"""
+        client = built_app.test_client()
+        assert client.get("/assets/manifest.json").status_code == 404
+        assert client.get("/assets/site.css").status_code == 404
@@ -0,0 +1,105 @@
+"""Unit tests for batch classification"""
+
+from array import array
+
+import pytest
+
+from models.batch import CATEGORY_CODES, classify_batch
+from models.blood_pressure import BloodPressure, BPCategory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Every integer pair around the valid domain plus fractional boundary values
+GRID = [(s, d) for s in range(60, 201) for d in range(30, 111)]
+EDGES = [
+    (89.5, 59.5),
+    (119.9, 79.9),
+    (139.99, 89.99),
+    (140.0, 40.0),
+    (69.9, 40.0),
+    (190.1, 100.0),
+    (float("nan"), 70.0),
+    (120.0, float("nan")),
+]
+
+
+def expected(pairs):
+    """Scalar answers for a list of pairs"""
+    readings = [BloodPressure(s, d) for s, d in pairs]
+    return [bp.category for bp in readings], [bp.is_valid() for bp in readings]
+
+
+class TestClassifyBatch:
+    """Test the pure-Python batch path"""
+
+    def test_matches_scalar_on_integer_grid(self):
+        """Test every integer pair matches BloodPressure.category"""
+        systolic = array("i", [s for s, _ in GRID])
+        diastolic = array("i", [d for _, d in GRID])
+        result = classify_batch(systolic, diastolic)
+        categories, valid = expected(GRID)
+        assert list(result.categories()) == categories
+        assert [bool(v) for v in result.valid] == valid
+
+    def test_matches_scalar_on_float_edges(self):
+        """Test fractional and NaN readings match the scalar rules"""
+        systolic = array("d", [s for s, _ in EDGES])
+        diastolic = array("d", [d for _, d in EDGES])
+        result = classify_batch(systolic, diastolic)
+        categories, valid = expected(EDGES)
+        assert list(result.categories()) == categories
+        assert [bool(v) for v in result.valid] == valid
+
+    def test_accepts_buffers_and_sequences(self):
+        """Test bytes buffers and plain lists are accepted"""
+        result = classify_batch(bytes([85, 150]), [55, 95])
+        assert list(result.categories()) == [BPCategory.LOW, BPCategory.HIGH]
+        assert len(result) == 2
+
+    def test_codes_are_compact(self):
+        """Test codes index into CATEGORY_CODES and fit in a byte"""
+        result = classify_batch([110], [70])
+        assert result.codes.itemsize == 1
+        assert CATEGORY_CODES[result.codes[0]] == BPCategory.IDEAL
+
+    def test_length_mismatch(self):
+        """Test columns of different lengths are rejected"""
+        with pytest.raises(ValueError):
+            classify_batch([120, 130], [80])
+
+    def test_empty_batch(self):
+        """Test an empty batch returns empty results"""
+        result = classify_batch([], [])
+        assert len(result) == 0
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+class TestClassifyBatchNumpy:
+    """Test the vectorized NumPy path"""
+
+    def test_matches_scalar_on_integer_grid(self):
+        """Test vectorized codes match BloodPressure.category"""
+        systolic = np.array([s for s, _ in GRID], dtype=np.int16)
+        diastolic = np.array([d for _, d in GRID], dtype=np.int16)
+        result = classify_batch(systolic, diastolic)
+        categories, valid = expected(GRID)
+        assert result.codes.dtype == np.uint8
+        assert list(result.categories()) == categories
+        assert result.valid.tolist() == valid
+
+    def test_matches_scalar_on_float_edges(self):
+        """Test vectorized fractional and NaN readings match the scalar rules"""
+        systolic = np.array([s for s, _ in EDGES])
+        diastolic = np.array([d for _, d in EDGES])
+        result = classify_batch(systolic, diastolic)
+        categories, valid = expected(EDGES)
+        assert list(result.categories()) == categories
+        assert result.valid.tolist() == valid
+
+    def test_length_mismatch(self):
+        """Test arrays of different shapes are rejected"""
+        with pytest.raises(ValueError):
+            classify_batch(np.array([120, 130]), np.array([80]))
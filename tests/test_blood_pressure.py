@@ -1,6 +1,16 @@
 """Unit tests for BloodPressure model"""
 
-from models.blood_pressure import BloodPressure, BPCategory
+import pickle
+
+import pytest
+
+from models.blood_pressure import (
+    BloodPressure,
+    BPCategory,
+    category_table,
+    classify,
+    classify_rules,
+)
 
 
 class TestBloodPressureValidation:
@@ -146,3 +156,98 @@ class TestBloodPressureEdgeCases:
         bp_high = BloodPressure(systolic=140, diastolic=90)
         assert bp_pre_high.category == BPCategory.PRE_HIGH
         assert bp_high.category == BPCategory.HIGH
+
+
+class TestCategoryTable:
+    """Test the precomputed category lookup table"""
+
+    def test_table_matches_rules_over_valid_domain(self):
+        """Test every cell agrees with the rule-based classification"""
+        for systolic in range(
+            BloodPressure.SYSTOLIC_MIN, BloodPressure.SYSTOLIC_MAX + 1
+        ):
+            for diastolic in range(
+                BloodPressure.DIASTOLIC_MIN, BloodPressure.DIASTOLIC_MAX + 1
+            ):
+                assert classify(systolic, diastolic) == classify_rules(
+                    systolic, diastolic
+                )
+
+    def test_table_covers_valid_domain(self):
+        """Test the table holds one cell per valid integer pair"""
+        assert len(category_table().cells) == 121 * 61
+
+    def test_out_of_range_falls_back_to_rules(self):
+        """Test readings outside the table still classify"""
+        assert BloodPressure(systolic=200, diastolic=50).category == BPCategory.HIGH
+        assert BloodPressure(systolic=60, diastolic=30).category == BPCategory.LOW
+
+    def test_non_integer_falls_back_to_rules(self):
+        """Test float readings use the rules"""
+        assert BloodPressure(systolic=89.5, diastolic=59.5).category == BPCategory.LOW
+        assert (
+            BloodPressure(systolic=139.5, diastolic=70).category == BPCategory.PRE_HIGH
+        )
+
+    def test_table_rebuilds_when_threshold_changes(self, monkeypatch):
+        """Test changing a threshold constant rebuilds the table"""
+        table = category_table()
+        assert BloodPressure(systolic=145, diastolic=70).category == BPCategory.HIGH
+
+        monkeypatch.setattr(BloodPressure, "HIGH_SYSTOLIC", 150)
+        assert category_table() is not table
+        assert BloodPressure(systolic=145, diastolic=70).category == BPCategory.PRE_HIGH
+
+        monkeypatch.undo()
+        assert BloodPressure(systolic=145, diastolic=70).category == BPCategory.HIGH
+
+    def test_table_rebuilds_when_range_changes(self, monkeypatch):
+        """Test changing the valid range resizes the table"""
+        monkeypatch.setattr(BloodPressure, "SYSTOLIC_MAX", 200)
+        assert len(category_table().cells) == 131 * 61
+
+
+class TestBloodPressureValue:
+    """Test BloodPressure as an immutable value type"""
+
+    def test_immutable(self):
+        """Test readings cannot be changed after construction"""
+        bp = BloodPressure(systolic=120, diastolic=80)
+        with pytest.raises(AttributeError):
+            bp.systolic = 130
+        with pytest.raises(AttributeError):
+            del bp.diastolic
+        assert not hasattr(bp, "__dict__")
+
+    def test_equality_and_hash(self):
+        """Test equal readings compare and hash equal"""
+        readings = {
+            BloodPressure(120, 80),
+            BloodPressure(120, 80),
+            BloodPressure(90, 60),
+        }
+        assert len(readings) == 2
+        assert BloodPressure(120, 80) != BloodPressure(80, 120)
+        assert BloodPressure(120, 80) != (120, 80)
+        assert (
+            repr(BloodPressure(120, 80)) == "BloodPressure(systolic=120, diastolic=80)"
+        )
+
+    def test_pickle_round_trip(self):
+        """Test readings survive pickling (process pools, caches)"""
+        bp = BloodPressure(150, 95)
+        assert bp.category == BPCategory.HIGH
+        copy = pickle.loads(pickle.dumps(bp))
+        assert copy == bp
+        assert copy.category == BPCategory.HIGH
+
+    def test_cached_category_follows_threshold_changes(self, monkeypatch):
+        """Test a cached category is recomputed after a threshold change"""
+        bp = BloodPressure(systolic=145, diastolic=70)
+        assert bp.category == BPCategory.HIGH
+        assert bp.category is bp._category
+
+        monkeypatch.setattr(BloodPressure, "HIGH_SYSTOLIC", 150)
+        assert bp.category == BPCategory.PRE_HIGH
+        monkeypatch.undo()
+        assert bp.category == BPCategory.HIGH
@@ -0,0 +1,244 @@
+"""Unit tests for bulk file classification"""
+
+import csv
+import io
+
+import pytest
+
+from app import app, metrics
+from models.validation import validate_reading
+from services.bulk import (
+    BulkStats,
+    annotate,
+    check_reading,
+    main,
+    read_csv,
+    read_parquet,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+CSV_TEXT = (
+    "patient,Systolic,Diastolic\n"
+    "a,150,95\n"
+    "b,110,70\n"
+    "c,80,90\n"
+    "d,abc,70\n"
+    "e,200,\n"
+    "f\n"
+)
+
+# 30,000 good rows, one with an invalid UTF-8 byte, then one more good row
+BAD_BYTE_CSV = (
+    b"systolic,diastolic\n" + b"120,80\n" * 30_000 + b"\xff,80\n" + b"150,95\n"
+)
+
+
+def annotated_rows(text, workers=1, chunk_size=2, stats=None):
+    header, columns, chunks = read_csv(io.StringIO(text), chunk_size)
+    output = "".join(annotate(header, columns, chunks, workers, stats))
+    return list(csv.reader(io.StringIO(output)))
+
+
+class TestCheckReading:
+    """Test bulk validation matches the form rules"""
+
+    @pytest.mark.parametrize(
+        "systolic, diastolic",
+        [
+            ("120", "80"),
+            ("80", "90"),
+            ("", "70"),
+            ("0", "70"),
+            ("1.5", "70"),
+            ("250", "30"),
+            (" 130 ", "85"),
+            (None, None),
+            (True, 70),
+        ],
+    )
+    def test_matches_validate_reading(self, systolic, diastolic):
+        """Test the same readings are rejected with the same messages"""
+        values, errors = validate_reading(systolic, diastolic)
+        checked_systolic, _, text = check_reading(systolic, diastolic)
+        expected = "; ".join(
+            f"{field}: {message}"
+            for field, messages in errors.items()
+            for message in messages
+        )
+        assert text == expected
+        if not errors:
+            assert checked_systolic == values["systolic"]
+
+
+class TestAnnotate:
+    """Test chunked, annotated CSV output"""
+
+    def test_rows_are_annotated_in_order(self):
+        """Test every row gets a category or errors and keeps its columns"""
+        stats = BulkStats()
+        rows = annotated_rows(CSV_TEXT, stats=stats)
+        assert rows[0] == ["patient", "Systolic", "Diastolic", "category", "errors"]
+        assert rows[1] == ["a", "150", "95", "High Blood Pressure", ""]
+        assert rows[2][3] == "Ideal Blood Pressure"
+        assert rows[3][4] == "systolic: Systolic must be greater than Diastolic"
+        assert rows[4][4] == "systolic: Not a valid integer value."
+        assert rows[5][4] == (
+            "systolic: Invalid Systolic Value; diastolic: This field is required."
+        )
+        assert rows[6] == [
+            "f",
+            "",
+            "",
+            "",
+            "reading: Expected systolic and diastolic values",
+        ]
+        assert (stats.rows, stats.invalid) == (6, 4)
+
+    def test_rows_fit_header_width(self):
+        """Test short rows are padded and long rows trimmed to the header"""
+        rows = annotated_rows("id,Systolic,Diastolic\n2,80\n3,150,95,extra\n")
+        assert rows[1] == [
+            "2",
+            "80",
+            "",
+            "",
+            "reading: Expected systolic and diastolic values",
+        ]
+        assert rows[2] == ["3", "150", "95", "High Blood Pressure", ""]
+
+    def test_process_pool_matches_in_process(self):
+        """Test chunks classified on a pool come back in input order"""
+        text = "systolic,diastolic\n" + "".join(
+            f"{s},{d}\n" for s in range(70, 191, 7) for d in range(40, 101, 9)
+        )
+        assert annotated_rows(text, workers=2, chunk_size=5) == annotated_rows(text)
+
+    def test_unreadable_rest_reported_in_last_row(self):
+        """Test a CSV error after the first chunk ends the output with a reason"""
+        stats = BulkStats()
+        text = "systolic,diastolic\n" + "120,80\n" * 5 + '"' + "x" * 200_000 + '"\n'
+        rows = annotated_rows(text, stats=stats)
+        assert len(rows) == 7 and rows[5] == [
+            "120",
+            "80",
+            "Pre-High Blood Pressure",
+            "",
+        ]
+        assert rows[6][:3] == ["", "", ""]
+        assert rows[6][3].startswith("file: Could not read past row 5: ")
+        assert stats.error == rows[6][3] and stats.rows == 5
+
+    def test_missing_columns_rejected(self):
+        """Test a file without reading columns fails before any output"""
+        with pytest.raises(ValueError):
+            read_csv(io.StringIO("sys,dia\n120,80\n"))
+
+    @pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+    def test_parquet_input(self, tmp_path):
+        """Test Parquet files are read in chunks with their column names"""
+        path = tmp_path / "readings.parquet"
+        table = pa.table({"systolic": [150, 80], "diastolic": [95, 50]})
+        pq.write_table(table, path)
+        header, columns, chunks = read_parquet(str(path), chunk_size=1)
+        output = "".join(annotate(header, columns, chunks))
+        assert output.splitlines()[1:] == [
+            "150,95,High Blood Pressure,",
+            "80,50,Low Blood Pressure,",
+        ]
+
+    @pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+    def test_parquet_float_columns(self, tmp_path):
+        """Test whole floats are accepted and fractional ones rejected"""
+        path = tmp_path / "readings.parquet"
+        table = pa.table({"systolic": [120.0, 120.5], "diastolic": [80.0, 80.0]})
+        pq.write_table(table, path)
+        header, columns, chunks = read_parquet(str(path))
+        rows = list(csv.reader(io.StringIO("".join(annotate(header, columns, chunks)))))
+        assert rows[1][2:] == ["Pre-High Blood Pressure", ""]
+        assert rows[2][3] == "systolic: Not a valid integer value."
+
+
+class TestCommandLine:
+    """Test python -m services.bulk"""
+
+    def test_writes_annotated_file(self, tmp_path, capsys):
+        """Test the CLI writes the result file and reports throughput"""
+        source, target = tmp_path / "in.csv", tmp_path / "out.csv"
+        source.write_text(CSV_TEXT)
+        assert main([str(source), "-o", str(target), "--workers", "1"]) == 0
+        assert target.read_text().splitlines()[1] == "a,150,95,High Blood Pressure,"
+        assert "6 rows (4 invalid)" in capsys.readouterr().err
+
+    def test_bad_byte_after_first_chunk(self, tmp_path, capsys):
+        """Test an undecodable byte fails its row and the rest is classified"""
+        source, target = tmp_path / "in.csv", tmp_path / "out.csv"
+        source.write_bytes(BAD_BYTE_CSV)
+        assert main([str(source), "-o", str(target), "--workers", "1"]) == 0
+        rows = target.read_text(encoding="utf-8").splitlines()
+        assert len(rows) == 30_003
+        assert rows[30_001].endswith("systolic: Not a valid integer value.")
+        assert rows[30_002] == "150,95,High Blood Pressure,"
+
+    def test_reports_unreadable_rest(self, tmp_path, capsys):
+        """Test a file that cannot be read to the end exits with an error"""
+        source = tmp_path / "in.csv"
+        source.write_text("systolic,diastolic\n120,80\n" + '"' + "x" * 200_000)
+        assert main([str(source), "-o", str(tmp_path / "out.csv")]) == 1
+        assert "Could not read past row 1" in capsys.readouterr().err
+
+    def test_reports_bad_input(self, tmp_path, capsys):
+        """Test a file without reading columns exits with an error"""
+        source = tmp_path / "in.csv"
+        source.write_text("a,b\n1,2\n")
+        assert main([str(source)]) == 2
+        assert "systolic and diastolic" in capsys.readouterr().err
+
+
+class TestBulkRoute:
+    """Test the /api/bulk upload route"""
+
+    @pytest.fixture
+    def client(self):
+        app.config["TESTING"] = True
+        metrics.reset()
+        yield app.test_client()
+        metrics.reset()
+
+    def test_csv_body(self, client):
+        """Test a text/csv body is streamed back annotated"""
+        response = client.post("/api/bulk", data=CSV_TEXT, content_type="text/csv")
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert "attachment" in response.headers["Content-Disposition"]
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == 7
+        assert 'category="HIGH",source="bulk"} 1' in client.get("/metrics").get_data(
+            as_text=True
+        )
+
+    def test_file_upload(self, client):
+        """Test a multipart CSV upload"""
+        data = {"file": (io.BytesIO(CSV_TEXT.encode()), "readings.csv")}
+        response = client.post("/api/bulk", data=data)
+        assert response.get_data(as_text=True).splitlines()[1] == (
+            "a,150,95,High Blood Pressure,"
+        )
+
+    def test_bad_byte_after_first_chunk(self, client):
+        """Test an undecodable byte mid-stream fails only its row"""
+        response = client.post("/api/bulk", data=BAD_BYTE_CSV, content_type="text/csv")
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert response.status_code == 200 and len(rows) == 30_003
+        assert rows[30_001][3] == "systolic: Not a valid integer value."
+        assert rows[30_002][2] == "High Blood Pressure"
+
+    def test_bad_requests(self, client):
+        """Test missing columns and unsupported bodies are rejected"""
+        response = client.post("/api/bulk", data="x,y\n", content_type="text/csv")
+        assert response.status_code == 400
+        assert client.post("/api/bulk", json=[]).status_code == 415
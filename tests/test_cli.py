@@ -0,0 +1,109 @@
+"""Unit tests for the bp-classify command line"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from services.cli import (
+    INVALID_CODE,
+    classify_chunk,
+    file_ranges,
+    main,
+    parse_lines,
+    stream_chunks,
+)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READINGS = b"systolic,diastolic\n150,95\n110 70\n80\t90\nabc\n\n120,80"
+
+
+class TestParsing:
+    """Test line parsing and chunking"""
+
+    def test_fast_and_slow_paths_agree(self):
+        """Test clean chunks and chunks with bad lines parse the same values"""
+        assert parse_lines(b"150,95\n110 70\n") == ([150, 110], [95, 70])
+        assert parse_lines(b"150,95\nabc\n1,2,3\n110 70") == (
+            [150, 0, 0, 110],
+            [95, 0, 0, 70],
+        )
+
+    def test_file_ranges_align_to_lines(self, tmp_path):
+        """Test ranges cover every line once and skip the header"""
+        path = tmp_path / "readings.txt"
+        path.write_bytes(READINGS)
+        ranges = list(file_ranges(str(path), chunk_bytes=8))
+        data = path.read_bytes()
+        assert b"".join(data[s:e] for s, e in ranges) == data.split(b"\n", 1)[1]
+        assert all(data[e - 1 : e] == b"\n" for _, e in ranges[:-1])
+
+    def test_stream_chunks(self):
+        """Test stdin chunks end on line boundaries and skip the header"""
+        chunks = list(stream_chunks(io.BytesIO(READINGS), chunk_bytes=5))
+        assert b"".join(chunks) == READINGS.split(b"\n", 1)[1]
+        assert all(chunk.endswith(b"\n") for chunk in chunks[:-1])
+
+
+class TestClassifyChunk:
+    """Test classification and output formats"""
+
+    def test_codes_mark_invalid_readings(self):
+        """Test out-of-range, unparsed and systolic <= diastolic lines"""
+        body, count, invalid = classify_chunk(b"150,95\n80,90\nabc\n", "codes")
+        assert body[1:] == bytes([INVALID_CODE, INVALID_CODE])
+        assert (count, invalid) == (3, 2)
+
+    @pytest.mark.parametrize("tips", [False, True])
+    def test_jsonl(self, tips):
+        """Test JSON lines output, optionally with health tips"""
+        body, _, _ = classify_chunk(b"150,95\n80,90\n", "jsonl", tips)
+        first, second = [json.loads(line) for line in body.splitlines()]
+        assert first["category"] == "High Blood Pressure"
+        assert second["category"] is None
+        assert ("tips" in first) is tips
+
+    def test_csv_with_tips(self):
+        """Test CSV output quotes the tips column"""
+        body, _, _ = classify_chunk(b"110,70\n", "csv", True)
+        assert body.startswith(b'110,70,Ideal Blood Pressure,"Maintain')
+
+
+class TestMain:
+    """Test the command as a whole"""
+
+    def test_pool_matches_single_process(self, tmp_path):
+        """Test worker processes return results in input order"""
+        path = tmp_path / "readings.txt"
+        path.write_bytes(
+            b"".join(b"%d,%d\n" % (s, d) for s in range(60, 200, 3) for d in (50, 85))
+        )
+        single, pooled = tmp_path / "single.txt", tmp_path / "pooled.txt"
+        common = ["--chunk-bytes", "64", "--format", "csv"]
+        assert main([str(path), "-o", str(single), "--workers", "1", *common]) == 0
+        assert main([str(path), "-o", str(pooled), "--workers", "2", *common]) == 0
+        assert pooled.read_bytes() == single.read_bytes()
+        assert single.read_bytes().count(b"\n") == 94
+
+    def test_does_not_import_flask(self):
+        """Test the CLI and the models run without loading the web stack"""
+        script = (
+            "import sys; sys.argv = ['bp-classify', '--workers', '1', '--tips']; "
+            "from services.cli import main; main(); "
+            "import models.health_tips, models.tips_catalogue; "
+            "web = ('flask', 'markupsafe', 'jinja2', 'numpy'); "
+            "print(sorted(m for m in web if m in sys.modules), file=sys.stderr)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=PROJECT_ROOT,
+            input=b"150,95\n",
+            capture_output=True,
+            check=True,
+        )
+        assert result.stdout.startswith(b"High Blood Pressure\t")
+        assert result.stderr.decode().splitlines()[-1] == "[]"
@@ -0,0 +1,111 @@
+"""Unit tests for response compression and template trimming"""
+
+import gzip
+
+import brotli
+import pytest
+from flask import Response
+
+from app import EXTENSION, create_app
+from services.compression import Compressor, TrimWhitespace
+
+BODY = b"<p>" + b"blood pressure " * 100 + b"</p>"
+
+
+def process(compressor, response, accept="gzip, br"):
+    return compressor.process(response, accept)
+
+
+class TestCompressor:
+    """Test negotiation, thresholds and the compressed body cache"""
+
+    def test_brotli_preferred_then_gzip(self):
+        """Test the encoding follows Accept-Encoding"""
+        compressor = Compressor()
+        response = process(compressor, Response(BODY, mimetype="text/html"))
+        assert response.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(response.get_data()) == BODY
+        assert int(response.headers["Content-Length"]) == len(response.get_data())
+        assert "Accept-Encoding" in response.vary
+
+        response = process(compressor, Response(BODY, mimetype="text/html"), "gzip")
+        assert gzip.decompress(response.get_data()) == BODY
+
+    @pytest.mark.parametrize(
+        "response, accept",
+        [
+            (Response(b"<p>small</p>", mimetype="text/html"), "gzip"),
+            (Response(BODY, mimetype="image/png"), "gzip"),
+            (Response(BODY, status=404, mimetype="text/html"), "gzip"),
+            (Response(BODY, mimetype="text/html"), "identity"),
+            (Response(iter([BODY]), mimetype="text/html"), "gzip"),
+        ],
+        ids=["small", "binary", "error", "identity", "streamed"],
+    )
+    def test_left_uncompressed(self, response, accept):
+        """Test responses that are not worth or able to compress"""
+        response = process(Compressor(), response, accept)
+        assert "Content-Encoding" not in response.headers
+
+    def test_cached_by_etag(self):
+        """Test a response with an ETag is compressed once, and its ETag weakened"""
+        compressor = Compressor()
+        for _ in range(3):
+            response = Response(BODY, mimetype="text/html")
+            response.set_etag("abc")
+            response = process(compressor, response)
+        assert compressor.cache.stats()["misses"] == 1
+        assert compressor.cache.stats()["hits"] == 2
+        assert response.get_etag() == ("abc", True)
+
+    def test_cached_by_body(self):
+        """Test identical bodies without an ETag share a cache entry"""
+        compressor = Compressor()
+        process(compressor, Response(BODY, mimetype="text/html"))
+        process(compressor, Response(BODY, mimetype="text/html"))
+        process(compressor, Response(BODY + b" ", mimetype="text/html"))
+        assert (compressor.cache.hits, compressor.cache.misses) == (1, 2)
+
+
+class TestTrimWhitespace:
+    """Test the template trimming extension"""
+
+    def test_strips_indentation_and_blank_lines(self):
+        """Test indentation and blank lines go, line breaks stay"""
+        source = "<div>\n    <p>\n      {{ a }}\n\n    </p>\n</div>\n"
+        trimmed = TrimWhitespace.preprocess(None, source, "t.html")
+        assert trimmed == "<div>\n<p>\n{{ a }}\n</p>\n</div>\n"
+
+    def test_keeps_preformatted_templates(self):
+        """Test templates with <pre> or <textarea> are left alone"""
+        source = "<pre>\n  indented\n</pre>\n"
+        assert TrimWhitespace.preprocess(None, source, "t.html") == source
+
+
+class TestAppCompression:
+    """Test the compression hook in the application"""
+
+    def test_tips_page_compressed_and_revalidated(self):
+        """Test a cached page is served compressed and still answers 304"""
+        app = create_app({"COMPRESSION": True, "TEMPLATE_TRIM": True})
+        client = app.test_client()
+        plain = client.get("/tips").data
+        response = client.get("/tips", headers={"Accept-Encoding": "br"})
+        assert brotli.decompress(response.data) == plain
+        assert "    <" not in plain.decode()
+
+        etag = response.headers["ETag"]
+        again = client.get(
+            "/tips", headers={"Accept-Encoding": "br", "If-None-Match": etag}
+        )
+        assert again.status_code == 304
+        assert app.extensions[EXTENSION].compressor.cache.hits == 0
+
+        client.get("/tips", headers={"Accept-Encoding": "br"})
+        assert app.extensions[EXTENSION].compressor.cache.hits == 1
+
+    def test_disabled_by_default(self):
+        """Test responses are not compressed unless COMPRESSION is set"""
+        app = create_app({"COMPRESSION": False})
+        response = app.test_client().get("/tips", headers={"Accept-Encoding": "br"})
+        assert "Content-Encoding" not in response.headers
@@ -0,0 +1,120 @@
+"""Unit tests for the liveness and readiness probes"""
+
+import pytest
+
+from app import EXTENSION, create_app, readiness_problems, warm_up
+from services.health import HealthChecks
+from services.log_pipeline import LogPipeline, MemorySink
+
+
+@pytest.fixture(scope="module")
+def assets_dir(tmp_path_factory):
+    # Shared so warm_up() builds the asset bundles once
+    return str(tmp_path_factory.mktemp("assets"))
+
+
+@pytest.fixture
+def probe_app(assets_dir):
+    app = create_app({"TESTING": True, "ASSETS_DIR": assets_dir})
+    return app, app.extensions[EXTENSION]
+
+
+class TestHealthChecks:
+    """Test the probe middleware on its own"""
+
+    def call(self, middleware, path, method="GET"):
+        captured = {}
+
+        def start_response(status, headers):
+            captured["status"], captured["headers"] = status, dict(headers)
+
+        body = b"".join(
+            middleware({"PATH_INFO": path, "REQUEST_METHOD": method}, start_response)
+        )
+        return captured["status"], captured["headers"], body
+
+    def test_other_paths_pass_through(self):
+        """Test non-probe requests reach the wrapped application"""
+        calls = []
+
+        def wsgi_app(environ, start_response):
+            calls.append(environ)
+            start_response("200 OK", [])
+            return [b"app"]
+
+        middleware = HealthChecks(wsgi_app, list)
+        assert self.call(middleware, "/")[2] == b"app"
+        assert self.call(middleware, "/healthz")[2] == b'{"status": "ok"}\n'
+        assert len(calls) == 1
+
+    def test_readiness_checked_once_per_interval(self, clock):
+        """Test frequent probes reuse the last result until it expires"""
+        problems = [["warming up"], []]
+        middleware = HealthChecks(None, lambda: problems.pop(0), 1.0, clock=clock)
+        status, headers, body = self.call(middleware, "/readyz")
+        assert status.startswith("503") and b"warming up" in body
+        assert headers["Cache-Control"] == "no-store"
+        clock.now = 0.5
+        assert self.call(middleware, "/readyz")[0].startswith("503")
+        clock.now = 1.0
+        assert self.call(middleware, "/readyz")[0] == "200 OK"
+
+    def test_failing_check_is_unready(self):
+        """Test an exception in a check reports unready instead of erroring"""
+
+        def check():
+            raise RuntimeError("boom")
+
+        status, _, body = self.call(HealthChecks(None, check), "/readyz")
+        assert status.startswith("503") and b"check failed: boom" in body
+
+    def test_head_has_no_body(self):
+        """Test HEAD probes get headers only"""
+        status, headers, body = self.call(HealthChecks(None, list), "/readyz", "HEAD")
+        assert status == "200 OK" and body == b""
+        assert headers["Content-Length"] == str(len(b'{"status": "ready"}\n'))
+
+
+class TestAppProbes:
+    """Test the probes wired into the application"""
+
+    def test_probes_skip_flask(self, probe_app):
+        """Test probes set no cookie and are not counted as requests"""
+        app, state = probe_app
+        warm_up(app)
+        client = app.test_client()
+        for path in ("/healthz", "/readyz"):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert "Set-Cookie" not in response.headers
+        assert state.request_duration.collect() == {}
+
+    def test_unready_until_warmed_up(self, probe_app):
+        """Test readiness waits for warm_up"""
+        app, _ = probe_app
+        assert readiness_problems(app) == ["warming up"]
+        warm_up(app)
+        assert readiness_problems(app) == []
+
+    def test_unready_when_queue_backs_up(self, probe_app):
+        """Test a nearly full log queue marks the worker unready"""
+        app, state = probe_app
+        warm_up(app)
+        pipeline = LogPipeline(MemorySink(), max_queue=10)
+        state.pipelines["telemetry"] = pipeline
+        pipeline._queue.extend(range(8))
+        assert readiness_problems(app) == ["telemetry queue at 8/10"]
+        pipeline._queue.clear()
+        pipeline.close()
+
+    def test_unready_when_store_unreachable(self, tmp_path, assets_dir):
+        """Test an unreadable history database marks the worker unready"""
+        app = create_app(
+            {
+                "HISTORY_DB": str(tmp_path / "missing" / "history.db"),
+                "ASSETS_DIR": assets_dir,
+            }
+        )
+        warm_up(app)
+        assert readiness_problems(app) == ["history store unreachable"]
+        app.extensions[EXTENSION].history.close()
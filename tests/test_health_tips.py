@@ -1,5 +1,10 @@
 """Unit tests for Health Tips"""
 
+import json
+from types import MappingProxyType
+
+import pytest
+
 from models.health_tips import HealthTips
 from models.blood_pressure import BPCategory
 
@@ -57,3 +62,27 @@ class TestHealthTips:
         tips2 = HealthTips.get_tips(BPCategory.LOW)
         assert len(tips2) == 5
         assert "Modified tip" not in tips2
+
+    def test_catalogue_is_read_only(self):
+        """Test the shared catalogue cannot be changed through the API"""
+        tips = HealthTips.tips(BPCategory.LOW)
+        assert isinstance(tips, tuple)
+        assert HealthTips.tips(BPCategory.LOW) is tips
+        with pytest.raises(TypeError):
+            HealthTips.TIPS[BPCategory.LOW] = ("Modified tip",)
+
+    def test_json_fragment(self):
+        """Test the pre-serialized JSON matches the tips and is reused"""
+        tips = HealthTips.tips(BPCategory.HIGH)
+        fragment = HealthTips.json_fragment(BPCategory.HIGH)
+        assert json.loads(fragment) == list(tips)
+        assert HealthTips.json_fragment(BPCategory.HIGH) is fragment
+
+    def test_json_fragment_rebuilt(self, monkeypatch):
+        """Test fragments follow a replaced catalogue"""
+        catalogue = {BPCategory.LOW: ('Salt & "water"',)}
+        monkeypatch.setattr(HealthTips, "TIPS", MappingProxyType(catalogue))
+        assert json.loads(HealthTips.json_fragment(BPCategory.LOW)) == [
+            'Salt & "water"'
+        ]
+        assert HealthTips.json_fragment(BPCategory.HIGH) == "[]"
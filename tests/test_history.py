@@ -0,0 +1,123 @@
+"""Unit tests for the reading history store"""
+
+import pytest
+
+from app import EXTENSION, create_app
+from models.blood_pressure import BPCategory
+from services.history import (
+    DAY,
+    MIGRATIONS,
+    HistoryStore,
+    connect,
+    migrate,
+    schema_version,
+)
+
+NOW = 100 * DAY
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"), max_age=0.01)
+    yield store
+    store.close()
+
+
+class TestMigrations:
+    """Test schema migrations"""
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        """Test migrations apply once and record the schema version"""
+        conn = connect(str(tmp_path / "history.db"))
+        assert migrate(conn) == len(MIGRATIONS)
+        assert migrate(conn) == 0
+        assert schema_version(conn) == len(MIGRATIONS)
+
+    def test_queries_use_user_ts_index(self, store):
+        """Test per-user window queries are answered from the covering index"""
+        plan = store._connection().execute(
+            "EXPLAIN QUERY PLAN SELECT category, count(*) FROM readings"
+            " WHERE user_id = ? AND ts >= ? GROUP BY category",
+            ("u", 0),
+        )
+        assert "COVERING INDEX readings_user_ts" in " ".join(row[-1] for row in plan)
+
+
+class TestHistoryStore:
+    """Test batched writes and trend queries"""
+
+    def test_writes_are_batched(self, store):
+        """Test queued readings are written together once flushed"""
+        for i in range(5):
+            store.add("u", 120 + i, 80, BPCategory.PRE_HIGH, ts=NOW + i)
+        assert store.flush()
+        assert store.pipeline.sent == 5
+        readings = store.recent("u", since=NOW)
+        assert [r["systolic"] for r in readings] == [124, 123, 122, 121, 120]
+        assert readings[0]["category"] is BPCategory.PRE_HIGH
+
+    def test_queries_are_per_user_and_windowed(self, store):
+        """Test other users' and older readings are excluded"""
+        store.add("u", 150, 95, BPCategory.HIGH, ts=NOW)
+        store.add("u", 110, 70, BPCategory.IDEAL, ts=NOW - 40 * DAY)
+        store.add("v", 80, 50, BPCategory.LOW, ts=NOW)
+        store.flush()
+        since = NOW - 30 * DAY
+        assert store.category_counts("u", since) == {BPCategory.HIGH: 1}
+        assert len(store.recent("u", since)) == 1
+        assert store.recent("w", since) == []
+
+    def test_daily_trend_moving_average(self, store):
+        """Test daily means and the trailing window average"""
+        store.add("u", 100, 60, BPCategory.IDEAL, ts=NOW)
+        store.add("u", 120, 80, BPCategory.PRE_HIGH, ts=NOW + 60)
+        store.add("u", 140, 90, BPCategory.HIGH, ts=NOW + DAY)
+        store.add("u", 160, 100, BPCategory.HIGH, ts=NOW + 10 * DAY)
+        store.flush()
+        trend = store.daily_trend("u", since=NOW, window=7)
+        assert [t["day"] for t in trend] == [NOW, NOW + DAY, NOW + 10 * DAY]
+        assert trend[0]["systolic"] == 110
+        assert trend[1]["systolic_avg"] == 120
+        assert trend[1]["diastolic_avg"] == pytest.approx(230 / 3)
+        # The first two days have left the 7-day window
+        assert trend[2]["systolic_avg"] == 160
+
+
+class TestHistoryRoutes:
+    """Test readings are recorded from the calculator"""
+
+    @pytest.fixture
+    def history_app(self, tmp_path):
+        app = create_app(
+            {
+                "TESTING": True,
+                "WTF_CSRF_ENABLED": False,
+                "HISTORY_DB": str(tmp_path / "history.db"),
+            }
+        )
+        yield app
+        app.extensions[EXTENSION].history.close()
+
+    def test_classified_reading_is_recorded(self, history_app):
+        """Test a calculation appears on the user's history page"""
+        client = history_app.test_client()
+        client.post("/", data={"systolic": 150, "diastolic": 95})
+        history_app.extensions[EXTENSION].history.flush()
+
+        page = client.get("/history").get_data(as_text=True)
+        assert "150/95" in page
+        assert "High Blood Pressure: 1" in page
+        # Another visitor has their own history
+        assert "150/95" not in history_app.test_client().get("/history").get_data(
+            as_text=True
+        )
+
+    def test_history_disabled_without_database(self):
+        """Test the history page does not exist unless HISTORY_DB is set"""
+        app = create_app({"TESTING": True, "HISTORY_DB": None})
+        assert app.test_client().get("/history").status_code == 404
+
+    def test_migrate_command(self, history_app):
+        """Test flask migrate creates the schema"""
+        result = history_app.test_cli_runner().invoke(args=["migrate"])
+        assert f"schema version {len(MIGRATIONS)}" in result.output
@@ -0,0 +1,214 @@
+"""Unit and load tests for the batched log pipeline"""
+
+import logging
+import statistics
+import sys
+import threading
+import time
+
+import pytest
+
+from app import app
+from services.log_pipeline import (
+    BLOCK,
+    DROP_OLDEST,
+    FileSink,
+    LogPipeline,
+    MemorySink,
+    QueueLogHandler,
+    pipeline_from_env,
+)
+
+
+def make_record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+class BlockingSink(MemorySink):
+    """Sink that holds every batch until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def send(self, records):
+        self.release.wait(5)
+        super().send(records)
+
+
+class TestLogPipeline:
+    """Test batching, flushing and drop policies"""
+
+    def test_batches_by_size(self):
+        """Test a full batch is sent without waiting for its age"""
+        sink = MemorySink()
+        pipeline = LogPipeline(sink, batch_size=3, max_age=60)
+        for i in range(3):
+            pipeline.submit(make_record(f"m{i}"))
+        deadline = time.monotonic() + 2
+        while not sink.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [len(batch) for batch in sink.batches] == [3]
+        pipeline.close()
+
+    def test_batches_by_age(self):
+        """Test a partial batch is sent once it is old enough"""
+        sink = MemorySink()
+        pipeline = LogPipeline(sink, batch_size=100, max_age=0.05)
+        pipeline.submit(make_record("lonely"))
+        time.sleep(0.3)
+        assert [r.getMessage() for r in sink.records] == ["lonely"]
+        pipeline.close()
+
+    def test_flush_sends_partial_batch(self):
+        """Test flush drains the queue immediately"""
+        sink = MemorySink()
+        pipeline = LogPipeline(sink, batch_size=100, max_age=60)
+        pipeline.submit(make_record("a"))
+        assert pipeline.flush(timeout=2)
+        assert len(sink.records) == 1
+        assert pipeline.stats()["sent"] == 1
+        pipeline.close()
+
+    def test_drop_newest_when_full(self):
+        """Test the default policy rejects new records when the queue is full"""
+        sink = BlockingSink()
+        pipeline = LogPipeline(sink, max_queue=2, batch_size=1, max_age=0)
+        pipeline.submit(make_record("in flight"))
+        time.sleep(0.05)  # worker now blocked sending the first record
+        results = [pipeline.submit(make_record(f"m{i}")) for i in range(4)]
+        assert results == [True, True, False, False]
+        assert pipeline.dropped == 2
+        sink.release.set()
+        pipeline.close()
+        assert [r.getMessage() for r in sink.records] == ["in flight", "m0", "m1"]
+
+    def test_drop_oldest_when_full(self):
+        """Test drop_oldest keeps the most recent records"""
+        sink = BlockingSink()
+        pipeline = LogPipeline(
+            sink, max_queue=2, batch_size=1, max_age=0, policy=DROP_OLDEST
+        )
+        pipeline.submit(make_record("in flight"))
+        time.sleep(0.05)
+        for i in range(4):
+            assert pipeline.submit(make_record(f"m{i}"))
+        assert pipeline.dropped == 2
+        sink.release.set()
+        pipeline.close()
+        assert [r.getMessage() for r in sink.records] == ["in flight", "m2", "m3"]
+
+    def test_block_policy_times_out(self):
+        """Test block waits at most block_timeout before dropping"""
+        sink = BlockingSink()
+        pipeline = LogPipeline(
+            sink, max_queue=1, batch_size=1, max_age=0, policy=BLOCK, block_timeout=0.05
+        )
+        pipeline.submit(make_record("in flight"))
+        time.sleep(0.05)
+        pipeline.submit(make_record("queued"))
+        start = time.monotonic()
+        assert pipeline.submit(make_record("blocked")) is False
+        assert 0.04 <= time.monotonic() - start < 1
+        sink.release.set()
+        pipeline.close()
+
+    def test_failing_sink_is_counted(self):
+        """Test sink errors never reach the caller"""
+
+        class BrokenSink:
+            def send(self, records):
+                raise ConnectionError("CloudWatch unavailable")
+
+        pipeline = LogPipeline(BrokenSink(), batch_size=1)
+        pipeline.submit(make_record("lost"))
+        pipeline.close()
+        assert pipeline.failed_batches == 1
+        assert pipeline.sent == 0
+
+    def test_unknown_policy(self):
+        """Test invalid drop policies are rejected"""
+        with pytest.raises(ValueError):
+            LogPipeline(MemorySink(), policy="drop_everything")
+
+    def test_pipeline_from_env(self):
+        """Test environment configuration"""
+        environ = {"LOG_QUEUE_SIZE": "5", "LOG_DROP_POLICY": "drop_oldest"}
+        pipeline = pipeline_from_env(MemorySink(), environ)
+        assert pipeline.max_queue == 5
+        assert pipeline.policy == DROP_OLDEST
+
+
+class TestSinks:
+    """Test the bundled sinks"""
+
+    def test_file_sink(self, tmp_path):
+        """Test records are appended to the file"""
+        path = tmp_path / "app.log"
+        pipeline = LogPipeline(FileSink(str(path)))
+        logger = logging.getLogger("test_file_sink")
+        logger.addHandler(QueueLogHandler(pipeline))
+        logger.warning("written %s", "later")
+        pipeline.close()
+        assert "written later" in path.read_text()
+
+    def test_handler_keeps_formatted_traceback(self):
+        """Test exception info is rendered before the record is queued"""
+        sink = MemorySink()
+        pipeline = LogPipeline(sink)
+        handler = QueueLogHandler(pipeline)
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = logging.LogRecord(
+                "t",
+                logging.ERROR,
+                __file__,
+                1,
+                "failed",
+                None,
+                sys.exc_info(),
+            )
+        handler.emit(record)
+        pipeline.close()
+        assert record.exc_info is None
+        assert "RuntimeError: boom" in sink.records[0].exc_text
+
+
+class TestRequestLatencyWithSlowSink:
+    """Load test: a slow sink must not slow down requests"""
+
+    def measure(self, client, count=100):
+        latencies = []
+        for i in range(count):
+            start = time.perf_counter()
+            client.post("/", data={"systolic": str(100 + i % 50), "diastolic": "70"})
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def test_slow_sink_does_not_add_latency(self, monkeypatch):
+        """Test p99 latency stays flat while every batch takes 200 ms to send"""
+        monkeypatch.setitem(app.config, "TESTING", True)
+        monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+        monkeypatch.setitem(app.config["LOG_SAMPLE_RATES"], "bp.classified", 1.0)
+        client = app.test_client()
+        baseline = self.measure(client)
+
+        sink = MemorySink(delay=0.2)
+        pipeline = LogPipeline(sink, batch_size=10, max_age=0.01)
+        handler = QueueLogHandler(pipeline)
+        level = app.logger.level
+        app.logger.setLevel(logging.INFO)
+        app.logger.addHandler(handler)
+        try:
+            loaded = self.measure(client)
+        finally:
+            app.logger.removeHandler(handler)
+            app.logger.setLevel(level)
+        pipeline.close(timeout=30)
+
+        assert len(sink.records) == 100
+        p99 = statistics.quantiles(loaded, n=100)[98]
+        baseline_p99 = statistics.quantiles(baseline, n=100)[98]
+        # A synchronous sink would add 200 ms to at least one request in ten
+        assert p99 < baseline_p99 + 0.1
@@ -0,0 +1,141 @@
+"""Unit tests for the metrics subsystem"""
+
+import json
+import threading
+
+import pytest
+
+from app import app, metrics
+from services.metrics import Registry, WorkerFiles
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(app.config, "TESTING", True)
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    metrics.reset()
+    yield app.test_client()
+    metrics.reset()
+
+
+class TestCounter:
+    """Test sharded counters"""
+
+    def test_sums_across_threads(self):
+        """Test increments from many threads are all counted"""
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits", ("route",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("index")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.collect() == {("index",): 8000}
+
+    def test_render(self):
+        """Test Prometheus counter exposition"""
+        registry = Registry()
+        registry.counter("hits_total", "Hits", ("route",)).inc('a"b', amount=2)
+        text = registry.render()
+        assert "# TYPE hits_total counter" in text
+        assert 'hits_total{route="a\\"b"} 2' in text
+
+
+class TestHistogram:
+    """Test fixed-bucket histograms"""
+
+    def test_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count"""
+        registry = Registry()
+        histogram = registry.histogram("latency", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+        text = registry.render()
+        assert 'latency_bucket{le="0.1"} 2' in text
+        assert 'latency_bucket{le="1.0"} 3' in text
+        assert 'latency_bucket{le="+Inf"} 4' in text
+        assert "latency_count 4" in text
+        assert "latency_sum 5.65" in text
+
+
+class TestWorkerFiles:
+    """Test cross-process aggregation through snapshot files"""
+
+    def test_merges_worker_snapshots(self, tmp_path):
+        """Test counters and histograms from several workers are summed"""
+        worker_a, worker_b = Registry(), Registry()
+        for registry, hits in ((worker_a, 2), (worker_b, 3)):
+            registry.counter("hits_total", "Hits", ("route",)).inc("x", amount=hits)
+            registry.histogram("latency", "Latency", buckets=(1.0,)).observe(0.5)
+
+        (tmp_path / "metrics-1.json").write_text(json.dumps(worker_a.snapshot()))
+        files = WorkerFiles(worker_b, str(tmp_path))
+        text = worker_b.render(files.merged())
+        assert 'hits_total{route="x"} 5' in text
+        assert "latency_count 2" in text
+
+    def test_merges_callback_counters(self, tmp_path):
+        """Test counts read from callbacks are summed, from the last reset on"""
+        counts = {"a": 7, "b": 3}
+        worker_a, worker_b = Registry(), Registry()
+        for registry, key in ((worker_a, "a"), (worker_b, "b")):
+            registry.counter_callback(
+                "cache_hits_total", "Hits", lambda key=key: counts[key]
+            )
+        worker_a.reset()
+        counts["a"] += 2
+
+        (tmp_path / "metrics-1.json").write_text(json.dumps(worker_a.snapshot()))
+        files = WorkerFiles(worker_b, str(tmp_path))
+        text = worker_b.render(files.merged())
+        assert "# TYPE cache_hits_total counter" in text
+        assert "cache_hits_total 5" in text
+
+    def test_clear(self, tmp_path):
+        """Test clear removes worker files"""
+        files = WorkerFiles(Registry(), str(tmp_path))
+        files.write()
+        files.clear()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestMetricsEndpoint:
+    """Test route instrumentation and the scrape endpoint"""
+
+    def test_route_latency_and_categories(self, client):
+        """Test per-route histograms and per-category counters"""
+        client.get("/privacy")
+        client.get("/tips")
+        client.get("/missing")
+        client.post("/", data={"systolic": "150", "diastolic": "95"})
+        client.post("/", data={"systolic": "300", "diastolic": "20"})
+        assert len(client.post("/api/classify", json=[[110, 70], [80, 85]]).json) == 2
+
+        text = client.get("/metrics").get_data(as_text=True)
+        assert 'route="privacy",method="GET",status="200"' in text
+        assert 'route="health_tips",method="GET",status="200"' in text
+        assert 'route="not_found_error",method="GET",status="404"' in text
+        assert 'bp_classifications_total{category="HIGH",source="form"} 1' in text
+        assert 'bp_classifications_total{category="IDEAL",source="api"} 1' in text
+        assert 'bp_validation_failures_total{field="systolic",source="form"} 1' in text
+        assert 'bp_validation_failures_total{field="diastolic",source="form"} 1' in text
+        assert 'bp_validation_failures_total{field="systolic",source="api"} 1' in text
+
+    def test_streamed_response_timed_to_last_byte(self, client):
+        """Test a streamed response is recorded when its body is done"""
+        response = client.post("/api/classify", json=[[120, 80]], buffered=False)
+        assert not metrics.snapshot()["bp_request_duration_seconds"]
+        assert len(response.get_json()) == 1
+        response.close()
+        (sample,) = metrics.snapshot()["bp_request_duration_seconds"]
+        assert sample[0] == ["classify_api", "POST", "200"]
+
+    def test_content_type(self, client):
+        """Test the Prometheus text content type"""
+        response = client.get("/metrics")
+        assert response.content_type.startswith("text/plain; version=0.0.4")
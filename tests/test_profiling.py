@@ -0,0 +1,163 @@
+"""Unit tests for the phase timers and the request profiler"""
+
+import os
+import sys
+import time
+
+from app import create_app
+from services.profiling import Phases, Profiler, StackSampler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+class TestPhases:
+    """Test per-phase timing and the Server-Timing header"""
+
+    def test_repeated_phases_accumulate(self, clock):
+        """Test time in the same phase adds up"""
+        phases = Phases(clock)
+        for _ in range(2):
+            with phases("log"):
+                clock.now += 0.001
+        with phases("render"):
+            clock.now += 0.0025
+        assert phases.header(0.01) == (
+            'log;desc="Event logging";dur=2.000, '
+            'render;desc="Template rendering";dur=2.500, total;dur=10.000'
+        )
+
+    def test_undescribed_phase(self, clock):
+        """Test phases without a description are listed by name"""
+        phases = Phases(clock)
+        with phases("custom"):
+            clock.now += 0.0001
+        assert phases.header() == "custom;dur=0.100"
+
+
+class TestStackSampler:
+    """Test the wall-clock stack sampler"""
+
+    def test_samples_running_function(self):
+        """Test samples name the function the time was spent in"""
+        sampler = StackSampler(interval=0.0001)
+        sampler.start()
+        try:
+            busy(0.02)
+        finally:
+            sampler.stop()
+        lines = sampler.collapsed().splitlines()
+        assert lines
+        assert any(";busy (" in line for line in lines)
+        total = sum(int(line.rsplit(" ", 1)[1]) for line in lines)
+        assert 15_000 <= total <= 1_000_000
+
+    def test_stop_restores_previous_hook(self):
+        """Test the profile hook is removed when sampling stops"""
+        previous = sys.getprofile()
+        sampler = StackSampler()
+        sampler.start()
+        sampler.stop()
+        assert sys.getprofile() is previous
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"a", b"b"]
+
+
+def call(middleware, headers=None, path="/"):
+    captured = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        captured.update(response_headers)
+
+    environ = {"PATH_INFO": path, "REQUEST_METHOD": "GET", **(headers or {})}
+    body = b"".join(middleware(environ, start_response))
+    return captured, body
+
+
+class TestProfiler:
+    """Test the profiling middleware on its own"""
+
+    def test_token_header_profiles_request(self, tmp_path):
+        """Test a request sending the token is profiled and tagged"""
+        profiler = Profiler(wsgi_app, str(tmp_path), token="s3cret")
+        headers, body = call(profiler, {"HTTP_X_PROFILE": "s3cret"}, "/tips")
+        assert body == b"ab"
+        files = os.listdir(tmp_path)
+        assert len(files) == 1
+        assert files[0].endswith(f"-GET-tips-{headers['X-Profile-Id']}.folded")
+        assert sys.getprofile() is None
+
+    def test_wrong_token_or_no_token_not_profiled(self, tmp_path):
+        """Test requests without the right token pass straight through"""
+        profiler = Profiler(wsgi_app, str(tmp_path), token="s3cret")
+        for headers in ({}, {"HTTP_X_PROFILE": "guess"}):
+            response_headers, body = call(profiler, headers)
+            assert body == b"ab" and "X-Profile-Id" not in response_headers
+        unset = Profiler(wsgi_app, str(tmp_path))
+        assert not unset.wanted({"HTTP_X_PROFILE": ""})
+        assert os.listdir(tmp_path) == []
+
+    def test_sample_rate(self, tmp_path):
+        """Test a fraction of requests is profiled at random"""
+        draws = iter([0.05, 0.5, 0.09])
+        profiler = Profiler(
+            wsgi_app, str(tmp_path), rate=0.1, random=lambda: next(draws)
+        )
+        for _ in range(3):
+            call(profiler)
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_old_profiles_pruned(self, tmp_path):
+        """Test only the newest max_files profiles are kept"""
+        for name in ("20200101T000000-old.folded", "20200102T000000-old.folded"):
+            (tmp_path / name).write_text("")
+        profiler = Profiler(wsgi_app, str(tmp_path), rate=1.0, max_files=2)
+        call(profiler)
+        files = sorted(os.listdir(tmp_path))
+        assert len(files) == 2 and files[0] == "20200102T000000-old.folded"
+
+
+class TestAppProfiling:
+    """Test Server-Timing and profiling wired into the application"""
+
+    def test_server_timing_phases(self):
+        """Test a classified reading reports each phase it went through"""
+        app = create_app({"TESTING": True, "WTF_CSRF_ENABLED": False})
+        response = app.test_client().post(
+            "/", data={"systolic": "130", "diastolic": "85"}
+        )
+        names = [
+            metric.split(";")[0]
+            for metric in response.headers["Server-Timing"].split(", ")
+        ]
+        assert names == ["form", "validate", "classify", "log", "render", "total"]
+
+    def test_server_timing_disabled(self):
+        """Test SERVER_TIMING=false leaves the header off"""
+        app = create_app({"TESTING": True, "SERVER_TIMING": False})
+        assert "Server-Timing" not in app.test_client().get("/").headers
+
+    def test_profile_token(self, tmp_path):
+        """Test an admin request is profiled through the whole Flask stack"""
+        app = create_app(
+            {
+                "TESTING": True,
+                "PROFILE_TOKEN": "s3cret",
+                "PROFILE_DIR": str(tmp_path),
+                "PROFILE_INTERVAL": 0,
+            }
+        )
+        client = app.test_client()
+        assert "X-Profile-Id" not in client.get("/").headers
+        response = client.get("/", headers={"X-Profile": "s3cret"})
+        response.get_data()
+        response.close()
+        (profile,) = tmp_path.iterdir()
+        assert response.headers["X-Profile-Id"] in profile.name
+        assert "index (app.py" in profile.read_text()
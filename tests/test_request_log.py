@@ -0,0 +1,118 @@
+"""Unit tests for sampled request events"""
+
+import logging
+
+import pytest
+
+from app import app, events
+from services.request_log import EventLog, parse_sample_rates
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_request_log")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    logger.records = handler.records
+    yield logger
+    logger.removeHandler(handler)
+
+
+class TestParseSampleRates:
+    """Test sample rate configuration parsing"""
+
+    def test_parse(self):
+        """Test comma-separated name=rate pairs"""
+        assert parse_sample_rates("a=0.5, b=1") == {"a": 0.5, "b": 1.0}
+        assert parse_sample_rates("") == {}
+
+    def test_out_of_range(self):
+        """Test rates above 1 are rejected"""
+        with pytest.raises(ValueError):
+            parse_sample_rates("a=2")
+
+
+class TestEventLog:
+    """Test sampling, lazy formatting and counters"""
+
+    def test_sampling(self, logger):
+        """Test only the sampled fraction of events is logged"""
+        draws = iter([0.005, 0.5, 0.009, 0.99])
+        log = EventLog(logger, {"hit": 0.01}, random_func=lambda: next(draws))
+        for _ in range(4):
+            log.event("hit", "hit %(n)s", n=1)
+        assert len(logger.records) == 2
+        assert log.counts["hit"] == 4
+        assert logger.records[0].sample_rate == 0.01
+
+    def test_unlisted_events_always_logged(self, logger):
+        """Test events without a configured rate are not sampled"""
+        log = EventLog(logger, {}, random_func=lambda: 0.99)
+        log.event("failure", "failed")
+        assert len(logger.records) == 1
+
+    def test_formatting_is_lazy(self, logger):
+        """Test filtered-out events never format their fields"""
+
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted eagerly")
+
+        logger.setLevel(logging.WARNING)
+        log = EventLog(logger, {})
+        log.event("quiet", "value=%(value)s", value=Exploding())
+        assert logger.records == []
+        assert log.counts["quiet"] == 1
+
+    def test_structured_fields(self, logger):
+        """Test records carry the event name and raw fields"""
+        log = EventLog(logger, {})
+        log.event("bp.classified", "category=%(category)s", category="High")
+        record = logger.records[0]
+        assert record.getMessage() == "category=High"
+        assert record.event == "bp.classified"
+        assert record.fields == {"category": "High"}
+
+    def test_periodic_flush(self, logger):
+        """Test counts are summarised and reset once the interval passes"""
+        log = EventLog(logger, {"a": 0.0}, flush_interval=0)
+        log.event("a", "a")
+        summary = logger.records[-1]
+        assert summary.event == "events.summary"
+        assert summary.fields == {"a": 1}
+        assert not log.counts
+
+
+class TestAppEvents:
+    """Test the index and tips routes emit sampled events"""
+
+    def test_validation_failures_always_logged(self, monkeypatch):
+        """Test failures are logged at 100% while successes are sampled away"""
+        monkeypatch.setitem(app.config, "TESTING", True)
+        monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+        monkeypatch.setitem(app.config["LOG_SAMPLE_RATES"], "bp.classified", 0.0)
+        monkeypatch.setattr(events, "counts", events.counts.copy())
+        handler = ListHandler()
+        app.logger.addHandler(handler)
+        try:
+            client = app.test_client()
+            client.post("/", data={"systolic": "120", "diastolic": "70"})
+            client.post("/", data={"systolic": "80", "diastolic": "85"})
+            client.post("/", data={"systolic": "300", "diastolic": "70"})
+        finally:
+            app.logger.removeHandler(handler)
+
+        logged = [r.event for r in handler.records if hasattr(r, "event")]
+        assert logged == ["bp.validation_failed", "bp.validation_failed"]
+        assert events.counts["bp.classified"] >= 1
@@ -0,0 +1,159 @@
+"""Unit tests for response caches"""
+
+import re
+
+import pytest
+
+from app import app, index_cache
+from services.response_cache import (
+    LRUCache,
+    PageCache,
+    TokenizedPage,
+    template_fingerprint,
+)
+
+
+class TestPageCache:
+    """Test the single-page render cache"""
+
+    def test_renders_once_per_fingerprint(self):
+        """Test the page is only re-rendered when the fingerprint changes"""
+        renders = []
+        inputs = {"version": 1}
+
+        def render():
+            renders.append(inputs["version"])
+            return f"<p>v{inputs['version']}</p>"
+
+        cache = PageCache(render, lambda: inputs["version"])
+        first = cache.get()
+        assert cache.get() is first
+        assert renders == [1]
+
+        inputs["version"] = 2
+        second = cache.get()
+        assert second.body == b"<p>v2</p>"
+        assert second.etag != first.etag
+        assert renders == [1, 2]
+
+    def test_invalidate(self):
+        """Test invalidate forces a re-render"""
+        renders = []
+        cache = PageCache(lambda: renders.append(1) or "x", lambda: None)
+        cache.get()
+        cache.invalidate()
+        cache.get()
+        assert len(renders) == 2
+
+
+class TestFingerprints:
+    """Test cache input fingerprints"""
+
+    def test_template_fingerprint_without_auto_reload(self, monkeypatch):
+        """Test templates are not stat'ed when Jinja does not auto-reload"""
+        monkeypatch.setattr(app.jinja_env, "auto_reload", False)
+        assert template_fingerprint(app, ["layout.html"]) is None
+
+    def test_template_fingerprint_with_auto_reload(self, monkeypatch):
+        """Test template modification times are tracked in debug"""
+        monkeypatch.setattr(app.jinja_env, "auto_reload", True)
+        fingerprint = template_fingerprint(app, ["layout.html", "health_tips.html"])
+        assert len(fingerprint) == 2
+
+
+class TestLRUCache:
+    """Test the bounded LRU cache"""
+
+    def test_hits_misses_evictions(self):
+        """Test counters and least-recently-used eviction"""
+        cache = LRUCache(2)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)  # evicts "b", the least recently used
+        assert cache.get("b") is None
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 2,
+            "evictions": 1,
+            "size": 2,
+            "maxsize": 2,
+        }
+
+    def test_resize(self):
+        """Test shrinking evicts the oldest entries"""
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.resize(1)
+        assert len(cache) == 1
+        assert cache.get("c") == "c"
+        assert cache.evictions == 2
+
+    def test_zero_size_stores_nothing(self):
+        """Test a zero-sized cache never holds entries"""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+
+
+class TestTokenizedPage:
+    """Test per-request token splicing"""
+
+    def test_token_is_not_cached(self):
+        """Test the cached fragments exclude the token"""
+        page = TokenizedPage('<input value="tok1"><p>ok</p>', "tok1")
+        assert all("tok1" not in fragment for fragment in page.fragments)
+        assert page.render("tok2") == '<input value="tok2"><p>ok</p>'
+
+    def test_without_token(self):
+        """Test pages without a token are stored whole"""
+        assert TokenizedPage("<p>ok</p>").render() == "<p>ok</p>"
+
+
+class TestIndexResultCache:
+    """Test the index result cache end to end"""
+
+    @pytest.fixture
+    def cached_client(self, monkeypatch):
+        monkeypatch.setitem(app.config, "TESTING", True)
+        monkeypatch.setitem(app.config, "INDEX_CACHE_SIZE", 2)
+        index_cache.clear()
+        yield app.test_client()
+        index_cache.clear()
+
+    def csrf_token(self, client, html=None):
+        html = html or client.get("/").get_data(as_text=True)
+        return re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', html)[1]
+
+    def test_hits_reuse_render_with_fresh_csrf(self, cached_client, monkeypatch):
+        """Test repeated readings are served from cache with each session's token"""
+        monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", True)
+        tokens = []
+        for client in (cached_client, app.test_client()):
+            token = self.csrf_token(client)
+            data = {"systolic": "110", "diastolic": "70", "csrf_token": token}
+            response = client.post("/", data=data)
+            assert b"Ideal Blood Pressure" in response.data
+            assert self.csrf_token(client, response.get_data(as_text=True)) == token
+            tokens.append(token)
+
+        assert index_cache.stats()["hits"] == 1
+        assert tokens[0] != tokens[1]
+        (page,) = index_cache._entries.values()
+        assert not any(token in "".join(page.fragments) for token in tokens)
+
+    def test_only_successful_canonical_results_are_cached(
+        self, cached_client, monkeypatch
+    ):
+        """Test errors and non-canonical input bypass the cache"""
+        monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+        cached_client.post("/", data={"systolic": "80", "diastolic": "85"})
+        cached_client.post("/", data={"systolic": "0110", "diastolic": "70"})
+        assert len(index_cache) == 0
+
+        cached_client.post("/", data={"systolic": "110", "diastolic": "70"})
+        cached_client.post("/", data={"systolic": "150", "diastolic": "95"})
+        cached_client.post("/", data={"systolic": "130", "diastolic": "85"})
+        assert index_cache.stats()["evictions"] == 1
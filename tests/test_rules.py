@@ -0,0 +1,225 @@
+"""Unit tests for data-driven classification rule sets"""
+
+import json
+
+import pytest
+
+from app import EXTENSION, create_app
+from models.blood_pressure import BPCategory, classify_rules
+from models.rules import (
+    RULE_SETS_DIR,
+    Category,
+    RuleSet,
+    RuleSetError,
+    load_rule_set,
+    load_rule_sets,
+)
+
+
+def document(**overrides):
+    """A minimal valid rule set"""
+    return {
+        "name": "test",
+        "systolic": {"min": 70, "max": 190},
+        "diastolic": {"min": 40, "max": 100},
+        "rules": [
+            {"category": "HIGH", "systolic": {"at_least": 140}},
+            {"category": "LOW", "systolic": {"below": 90}},
+        ],
+        "default": "IDEAL",
+        **overrides,
+    }
+
+
+class TestBundledRuleSets:
+    """Test the rule sets shipped in models/rule_sets"""
+
+    def test_default_matches_classify_rules(self):
+        """Test the default set agrees with classify_rules everywhere"""
+        default = load_rule_sets()["default"]
+        for systolic in range(0, 260):
+            for diastolic in range(0, 200):
+                expected = classify_rules(systolic, diastolic)
+                assert default.classify(systolic, diastolic) is expected
+        for systolic, diastolic in [(89.5, 59.5), (139.5, 70), (119.9, 80.0)]:
+            expected = classify_rules(systolic, diastolic)
+            assert default.classify(systolic, diastolic) is expected
+
+    def test_acc_aha_stages(self):
+        """Test the ACC/AHA 2017 set reports stages mapped onto built-ins"""
+        rule_set = load_rule_sets()["acc_aha_2017"]
+        expectations = {
+            (110, 70): ("NORMAL", BPCategory.IDEAL),
+            (125, 75): ("ELEVATED", BPCategory.PRE_HIGH),
+            (125, 85): ("STAGE_1", BPCategory.HIGH),
+            (145, 70): ("STAGE_2", BPCategory.HIGH),
+            (185, 95): ("CRISIS", BPCategory.HIGH),
+            (85, 55): ("LOW", BPCategory.LOW),
+        }
+        for (systolic, diastolic), (name, base) in expectations.items():
+            category = rule_set.classify(systolic, diastolic)
+            assert (category.name, category.base) == (name, base)
+        assert rule_set.classify(125, 85).value == "Stage 1 Hypertension"
+
+
+class TestValidation:
+    """Test rule sets are rejected when malformed or conflicting"""
+
+    def test_valid_document_compiles(self):
+        """Test a valid document classifies through table and evaluator"""
+        rule_set = RuleSet(document())
+        assert rule_set.classify(150, 80) is BPCategory.HIGH
+        assert rule_set.classify(150.5, 80) is BPCategory.HIGH
+        assert rule_set.classify(100, 80) is BPCategory.IDEAL
+        assert len(rule_set.cells) == 121 * 61
+
+    def test_shadowed_rule(self):
+        """Test a rule earlier rules always pre-empt is an error"""
+        rules = document()["rules"] + [{"category": "LOW", "systolic": {"below": 80}}]
+        with pytest.raises(RuleSetError, match="Rule 3 \\(LOW\\) never applies"):
+            RuleSet(document(rules=rules))
+
+    def test_gap_without_default(self):
+        """Test readings no rule covers are an error without a default"""
+        with pytest.raises(RuleSetError, match="match no rule") as error:
+            RuleSet(document(default=None))
+        assert "systolic=90, diastolic=40" in str(error.value)
+
+    def test_overlap_when_unordered(self):
+        """Test overlapping rules are an error when ordered is false"""
+        rules = [
+            {"category": "HIGH", "systolic": {"at_least": 140}},
+            {"category": "PRE_HIGH", "systolic": {"at_least": 120, "below": 150}},
+        ]
+        with pytest.raises(RuleSetError, match="Rules 1 and 2 overlap"):
+            RuleSet(document(rules=rules, ordered=False))
+        rules[1]["systolic"]["below"] = 140
+        assert RuleSet(document(rules=rules, ordered=False))
+
+    def test_every_problem_reported(self):
+        """Test malformed documents list each problem"""
+        bad = document(
+            colour="red",
+            rules=[
+                {"category": "SEVERE", "systolic": {"at_least": 140}},
+                {"category": "LOW", "systolic": {"above": 90}},
+                {"category": "LOW", "systolic": {"at_least": 90, "below": 80}},
+                {"category": "LOW"},
+            ],
+        )
+        with pytest.raises(RuleSetError) as error:
+            RuleSet(bad)
+        problems = error.value.problems
+        assert "Unknown key 'colour'" in problems
+        assert "Unknown category 'SEVERE'" in problems
+        assert "Rule 2: systolic needs numeric at_least/below" in problems
+        assert "Rule 3: systolic range is empty" in problems
+        assert "Rule 4: needs a systolic or diastolic condition" in problems
+
+    def test_non_finite_bounds(self):
+        """Test Infinity and NaN bounds are rejected, not compiled"""
+        for bound in (float("inf"), float("-inf"), float("nan")):
+            rules = [{"category": "HIGH", "systolic": {"at_least": bound}}]
+            with pytest.raises(RuleSetError, match="needs numeric at_least/below"):
+                RuleSet(document(rules=rules))
+        with pytest.raises(RuleSetError, match="needs numeric at_least/below"):
+            RuleSet(json.loads(json.dumps(document()).replace("140", "Infinity")))
+
+    def test_non_string_category_keys(self):
+        """Test a category or default that is not a string is a problem"""
+        rules = [{"category": ["HIGH"], "systolic": {"at_least": 140}}]
+        with pytest.raises(RuleSetError) as error:
+            RuleSet(document(rules=rules, default={"name": "IDEAL"}))
+        problems = error.value.problems
+        assert "Unknown category ['HIGH']" in problems
+        assert "Unknown category {'name': 'IDEAL'}" in problems
+        categories = {"SEVERE": {"label": "Severe", "base": ["HIGH"]}}
+        with pytest.raises(RuleSetError, match="Category SEVERE needs a base"):
+            RuleSet(document(categories=categories))
+
+    def test_custom_categories(self):
+        """Test declared categories need a label and a built-in base"""
+        categories = {"SEVERE": {"label": "Severe", "base": "HIGH"}}
+        rules = [{"category": "SEVERE", "systolic": {"at_least": 140}}]
+        rule_set = RuleSet(document(categories=categories, rules=rules))
+        category = rule_set.classify(150, 80)
+        assert isinstance(category, Category)
+        assert (category.value, category.base) == ("Severe", BPCategory.HIGH)
+
+        for bad in ({"HIGH": {"label": "x", "base": "HIGH"}}, {"X": {"base": "LOW"}}):
+            with pytest.raises(RuleSetError):
+                RuleSet(document(categories=bad))
+
+    def test_generated_source_only_holds_numbers(self):
+        """Test bounds must be numbers, so nothing else reaches the evaluator"""
+        rules = [{"category": "HIGH", "systolic": {"at_least": "__import__('os')"}}]
+        with pytest.raises(RuleSetError, match="numeric"):
+            RuleSet(document(rules=rules))
+
+
+class TestLoading:
+    """Test loading rule sets from directories"""
+
+    def test_later_directory_overrides(self, tmp_path):
+        """Test a deployment directory replaces bundled sets of the same name"""
+        (tmp_path / "default.json").write_text(json.dumps(document(name="default")))
+        rule_sets = load_rule_sets(RULE_SETS_DIR, str(tmp_path))
+        assert rule_sets["default"].classify(130, 85) is BPCategory.IDEAL
+        assert "acc_aha_2017" in rule_sets
+
+    def test_invalid_json(self, tmp_path):
+        """Test unreadable JSON is a RuleSetError naming the file"""
+        path = tmp_path / "broken.json"
+        path.write_text("{")
+        with pytest.raises(RuleSetError, match="'broken': Invalid JSON"):
+            load_rule_set(str(path))
+
+
+class TestRuleSetSelection:
+    """Test choosing a rule set per request and per tenant"""
+
+    @pytest.fixture
+    def tenant_app(self):
+        return create_app(
+            {
+                "TESTING": True,
+                "WTF_CSRF_ENABLED": False,
+                "TENANT_RULE_SETS": {"clinic": "acc_aha_2017"},
+            }
+        )
+
+    def classify(self, client, path="/api/classify", **kwargs):
+        response = client.post(
+            path, data="[[125, 85]]", content_type="application/json", **kwargs
+        )
+        return response.status_code, response.get_json()
+
+    def test_default_rule_set(self, tenant_app):
+        """Test requests without a tenant use RULE_SET"""
+        status, results = self.classify(tenant_app.test_client())
+        assert results[0]["category"] == BPCategory.PRE_HIGH.value
+
+    def test_tenant_rule_set(self, tenant_app):
+        """Test the tenant header selects the tenant's rule set"""
+        status, results = self.classify(
+            tenant_app.test_client(), headers={"X-Tenant": "clinic"}
+        )
+        assert results[0]["category"] == "Stage 1 Hypertension"
+        counts = tenant_app.extensions[EXTENSION].classifications.collect()
+        assert (("STAGE_1", "api"), 1) in counts.items()
+
+    def test_request_rule_set(self, tenant_app):
+        """Test ?rule_set= selects a rule set for one request"""
+        client = tenant_app.test_client()
+        status, results = self.classify(client, "/api/classify?rule_set=acc_aha_2017")
+        assert results[0]["category"] == "Stage 1 Hypertension"
+        response = client.post(
+            "/?rule_set=acc_aha_2017", data={"systolic": 185, "diastolic": 95}
+        )
+        assert b"Hypertensive Crisis" in response.data
+        assert self.classify(client, "/api/classify?rule_set=nope")[0] == 400
+
+    def test_unknown_configured_rule_set(self):
+        """Test configuring a missing rule set stops start-up"""
+        with pytest.raises(ValueError, match="Unknown rule set"):
+            create_app({"TENANT_RULE_SETS": {"clinic": "pediatric"}})
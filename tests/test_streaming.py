@@ -0,0 +1,115 @@
+"""Unit tests for streamed JSON readers and writers"""
+
+import io
+import json
+
+import pytest
+
+from services.streaming import (
+    MalformedItem,
+    iter_json_array,
+    iter_ndjson,
+    json_array_chunks,
+    ndjson_lines,
+)
+
+
+class TestIterNdjson:
+    """Test newline-delimited JSON decoding"""
+
+    def test_decodes_each_line(self):
+        """Test one value per line, blank lines skipped"""
+        stream = io.BytesIO(b'{"a": 1}\n\n[2, 3]\n4')
+        assert list(iter_ndjson(stream)) == [{"a": 1}, [2, 3], 4]
+
+    def test_malformed_line(self):
+        """Test bad lines yield a MalformedItem"""
+        items = list(iter_ndjson(io.BytesIO(b"{oops\n1\n")))
+        assert isinstance(items[0], MalformedItem)
+        assert items[1] == 1
+
+    def test_line_too_long(self):
+        """Test oversized lines are skipped, not buffered"""
+        stream = io.BytesIO(b"[" + b"1," * 100 + b"1]\n5\n")
+        items = list(iter_ndjson(stream, max_line=16))
+        assert items[0].error == "Line too long"
+        assert items[1] == 5
+
+
+class TestIterJsonArray:
+    """Test incremental JSON array decoding"""
+
+    def test_small_chunks(self):
+        """Test elements split across chunk boundaries decode correctly"""
+        values = [{"systolic": 120, "diastolic": 80}, [130, 85], 12345, "x"]
+        stream = io.BytesIO(json.dumps(values).encode())
+        assert list(iter_json_array(stream, chunk_size=3)) == values
+
+    def test_numbers_split_across_chunks(self):
+        """Test fractions and exponents cut at any chunk boundary"""
+        values = [-0.5, 1e3, 12.25e-2, -7, 2e10]
+        body = b"[-0.5, 1e3, 12.25e-2, -7, 2E+10]"
+        for chunk_size in range(1, len(body) + 1):
+            stream = io.BytesIO(body)
+            assert list(iter_json_array(stream, chunk_size=chunk_size)) == values
+
+    def test_multibyte_utf8_across_chunks(self):
+        """Test UTF-8 sequences split between chunks"""
+        values = ["café", "❤"]
+        stream = io.BytesIO(json.dumps(values, ensure_ascii=False).encode())
+        assert list(iter_json_array(stream, chunk_size=1)) == values
+
+    def test_empty_array(self):
+        """Test an empty array yields nothing"""
+        assert list(iter_json_array(io.BytesIO(b"  [ ] "))) == []
+
+    def test_not_an_array(self):
+        """Test a non-array body is rejected"""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.BytesIO(b'{"a": 1}')))
+
+    def test_truncated_array(self):
+        """Test a truncated body raises after yielding complete items"""
+        items = iter_json_array(io.BytesIO(b"[1, 2, [3"))
+        assert next(items) == 1
+        assert next(items) == 2
+        with pytest.raises(ValueError):
+            next(items)
+
+    def test_not_an_array_rejected_before_iterating(self):
+        """Test the opening bracket is checked when the iterator is made"""
+        with pytest.raises(ValueError, match="Expected a JSON array"):
+            iter_json_array(io.BytesIO(b'{"systolic": 1}'))
+
+    def test_malformed_element_fails_fast(self):
+        """Test a bad element raises without reading the rest of the body"""
+        stream = io.BytesIO(b"[1, x" + b" " * 1_000_000 + b"]")
+        items = iter_json_array(stream, chunk_size=1024)
+        assert next(items) == 1
+        with pytest.raises(ValueError, match="Malformed"):
+            next(items)
+        assert stream.tell() == 1024
+
+    def test_element_too_long(self):
+        """Test an element longer than max_item is not buffered whole"""
+        stream = io.BytesIO(b'["' + b"a" * 100_000 + b'"]')
+        items = iter_json_array(stream, chunk_size=1024, max_item=4096)
+        with pytest.raises(ValueError, match="too long"):
+            next(items)
+        assert stream.tell() <= 4096 + 2048
+
+
+class TestWriters:
+    """Test streamed JSON encoders"""
+
+    def test_ndjson_lines(self):
+        """Test one line per item"""
+        assert "".join(ndjson_lines([{"a": 1}, 2])) == '{"a":1}\n2\n'
+
+    def test_json_array_chunks(self):
+        """Test chunks join into a valid array"""
+        assert json.loads("".join(json_array_chunks(iter([1, {"b": 2}])))) == [
+            1,
+            {"b": 2},
+        ]
+        assert "".join(json_array_chunks([])) == "[]"
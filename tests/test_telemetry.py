@@ -0,0 +1,133 @@
+"""Unit tests for lazy telemetry and start-up timing"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from flask import Flask
+
+from services.log_pipeline import MemorySink
+from services.startup import StartupTimer
+from services.telemetry import DeferredSink, Telemetry
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous ceiling for "python -c 'import app'" on a slow CI runner
+IMPORT_BUDGET_SECONDS = 3.0
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+aws = sorted(m for m in ("boto3", "watchtower", "aws_xray_sdk") if m in sys.modules)
+print(json.dumps({"elapsed": elapsed, "aws": aws, "phases": app.startup_timer.phases}))
+"""
+
+
+def import_app(cloudwatch_enabled):
+    env = dict(os.environ, CLOUDWATCH_ENABLED=cloudwatch_enabled)
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestColdStart:
+    """Test importing the app stays cheap"""
+
+    def test_import_time_budget_without_telemetry(self):
+        """Test app import time with telemetry disabled stays under budget"""
+        result = import_app("false")
+        assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+        assert result["aws"] == []
+        assert set(result["phases"]) == {"imports", "app_creation"}
+
+    def test_aws_sdks_not_imported_when_enabled(self):
+        """Test enabling telemetry defers the AWS imports past app import"""
+        assert import_app("true")["aws"] == []
+
+
+class TestStartupTimer:
+    """Test phase timing"""
+
+    def test_marks_and_records(self):
+        """Test marks measure consecutive phases"""
+        timer = StartupTimer()
+        timer.mark("one")
+        timer.record("background", 0.25)
+        assert set(timer.phases) == {"one", "background"}
+        assert "background=250.0ms" in timer.summary()
+
+
+class FakeMiddleware:
+    def __init__(self, app):
+        self.calls = []
+        app.before_request(lambda: self.calls.append("before"))
+        app.after_request(lambda response: self.calls.append("after") or response)
+        app.teardown_request(lambda exc: self.calls.append("teardown"))
+
+
+@pytest.fixture
+def traced_app(monkeypatch):
+    app = Flask(__name__)
+    app.route("/")(lambda: "ok")
+    telemetry = Telemetry(app, "eu-west-1")
+    release = threading.Event()
+
+    def fake_initialize():
+        release.wait(5)
+        telemetry.middleware = FakeMiddleware(telemetry.hooks)
+        telemetry.sink.target = MemorySink()
+        telemetry.ready.set()
+
+    monkeypatch.setattr(telemetry, "_initialize", fake_initialize)
+    telemetry.attach()
+    yield app, telemetry, release
+    telemetry.pipeline.close(timeout=1)
+
+
+class TestTelemetry:
+    """Test background initialisation and deferred hooks"""
+
+    def test_first_request_starts_background_init(self, traced_app):
+        """Test requests are served untraced until telemetry is ready"""
+        app, telemetry, release = traced_app
+        client = app.test_client()
+        assert client.get("/").data == b"ok"
+        assert telemetry._started
+        assert not telemetry.ready.is_set()
+
+        release.set()
+        assert telemetry.ready.wait(5)
+        client.get("/")
+        assert telemetry.middleware.calls == ["before", "after", "teardown"]
+
+    def test_logs_wait_for_sink(self, traced_app):
+        """Test records logged before init are shipped once it completes"""
+        app, telemetry, release = traced_app
+        app.logger.warning("early record")
+        telemetry.start()
+        release.set()
+        assert telemetry.pipeline.flush(timeout=5)
+        messages = [r.getMessage() for r in telemetry.sink.target.records]
+        assert "early record" in messages
+
+
+class TestDeferredSink:
+    """Test the placeholder sink"""
+
+    def test_failed_init_raises(self):
+        """Test batches fail (and are counted by the pipeline) without a target"""
+        ready = threading.Event()
+        ready.set()
+        with pytest.raises(RuntimeError):
+            DeferredSink(ready).send([])
@@ -0,0 +1,156 @@
+"""Unit tests for the localized tips catalogue"""
+
+import json
+import os
+
+import pytest
+
+from models.blood_pressure import BPCategory
+from models.health_tips import HealthTips
+from models.tips_catalogue import (
+    TIPS_DIR,
+    CompiledCatalogue,
+    TipsCatalogue,
+    TipsCatalogueError,
+    accepted_locales,
+    fallback_chain,
+    normalize_locale,
+    read_locale,
+)
+
+
+def write(directory, locale, tips):
+    path = directory / f"{locale}.json"
+    path.write_text(json.dumps(tips), encoding="utf-8")
+    return path
+
+
+class TestLocales:
+    """Test locale names, fallback chains and Accept-Language parsing"""
+
+    def test_normalize_locale(self):
+        """Test the spellings of a locale map to one name"""
+        for tag in ("pt-br", "pt_BR", "PT-BR", "pt_BR.UTF-8", "pt_BR@euro"):
+            assert normalize_locale(tag) == "pt_BR"
+        assert normalize_locale("zh-hant-tw") == "zh_Hant_TW"
+        assert normalize_locale(" ") == ""
+
+    def test_fallback_chain(self):
+        """Test chains drop subtags one at a time, then use the default"""
+        assert fallback_chain("zh_Hant_TW") == ("zh_Hant_TW", "zh_Hant", "zh", "en")
+        assert fallback_chain("en_GB") == ("en_GB", "en")
+        assert fallback_chain("") == ("en",)
+
+    def test_accepted_locales(self):
+        """Test tags are ordered by quality, ties by position, q=0 dropped"""
+        header = "fr;q=0.5, es-MX, de;q=0, pt;q=0.5, *;q=0.1"
+        assert accepted_locales(header) == ["es_MX", "fr", "pt"]
+
+
+class TestCompiledCatalogue:
+    """Test lookups in a compiled catalogue"""
+
+    def catalogue(self, **kwargs):
+        return CompiledCatalogue(
+            {
+                "en": {BPCategory.LOW: ("Drink water",), BPCategory.HIGH: ("Rest",)},
+                "es": {BPCategory.LOW: ("Beba agua",)},
+                "es_MX": {BPCategory.HIGH: ("Descanse",)},
+            },
+            **kwargs,
+        )
+
+    def test_categories_fall_back_along_chain(self):
+        """Test a locale's missing categories come from its parents"""
+        catalogue = self.catalogue()
+        assert catalogue.get(BPCategory.LOW, "es-MX") == ("Beba agua",)
+        assert catalogue.get(BPCategory.HIGH, "es-MX") == ("Descanse",)
+        assert catalogue.get(BPCategory.HIGH, "es") == ("Rest",)
+        assert catalogue.get(BPCategory.IDEAL, "es") == ()
+
+    def test_negotiation(self):
+        """Test the first accepted tag with any match wins over the default"""
+        catalogue = self.catalogue()
+        assert catalogue.resolve("fr, es-AR;q=0.8")[0] == "es"
+        assert catalogue.resolve("fr, en;q=0.1, es;q=0.8")[0] == "es"
+        assert catalogue.resolve("fr")[0] == "en"
+        assert catalogue.resolve(None)[0] == "en"
+
+    def test_shared_entries(self):
+        """Test fallback tips are shared, not copied per locale"""
+        catalogue = self.catalogue()
+        assert catalogue.tables["es"][BPCategory.HIGH] is (
+            catalogue.tables["en"][BPCategory.HIGH]
+        )
+        # Equal tuples from different categories or files are stored once
+        copy = CompiledCatalogue(
+            {"en": {BPCategory.LOW: tuple(["Rest"]), BPCategory.HIGH: tuple(["Rest"])}}
+        )
+        tables = copy.tables["en"]
+        assert tables[BPCategory.LOW] is tables[BPCategory.HIGH]
+
+    def test_resolved_cache_bounded(self):
+        """Test arbitrary Accept-Language values cannot grow the cache"""
+        catalogue = self.catalogue(max_resolved=4)
+        for n in range(50):
+            catalogue.resolve(f"x{n}")
+        assert len(catalogue._resolved) <= 4
+        assert catalogue.resolve("es") is catalogue.resolve("es")
+
+    def test_default_locale_required(self):
+        """Test a catalogue without its default locale is rejected"""
+        with pytest.raises(TipsCatalogueError, match="Default locale"):
+            CompiledCatalogue({"es": {}}, default="en")
+
+
+class TestTipsCatalogue:
+    """Test loading and reloading tips files"""
+
+    def test_bundled_english_matches_health_tips(self):
+        """Test the bundled catalogue serves the HealthTips tips"""
+        catalogue = TipsCatalogue()
+        for category in BPCategory:
+            assert catalogue.get(category) == HealthTips.tips(category)
+
+    def test_invalid_file(self, tmp_path):
+        """Test malformed files report every problem"""
+        path = write(tmp_path, "en", {"LOW": "one tip", "SEVERE": ["x"]})
+        with pytest.raises(TipsCatalogueError) as info:
+            read_locale(str(path))
+        assert info.value.locale == "en"
+        assert len(info.value.problems) == 2
+        (tmp_path / "es.json").write_text("{")
+        with pytest.raises(TipsCatalogueError, match="Invalid JSON"):
+            read_locale(str(tmp_path / "es.json"))
+
+    def test_later_directory_replaces_locale(self, tmp_path):
+        """Test a deployment's file replaces the bundled one of the same name"""
+        write(tmp_path, "en", {"LOW": ["Custom"]})
+        catalogue = TipsCatalogue(TIPS_DIR, str(tmp_path))
+        assert catalogue.get(BPCategory.LOW) == ("Custom",)
+
+    def test_hot_reload(self, tmp_path, clock):
+        """Test a changed file is picked up after the interval"""
+        path = write(tmp_path, "en", {"LOW": ["Old"]})
+        catalogue = TipsCatalogue(str(tmp_path), reload_interval=2.0, clock=clock)
+        before = catalogue.current()
+        write(tmp_path, "en", {"LOW": ["New tip"]})
+        os.utime(path, ns=(0, 10**9))
+        assert catalogue.get(BPCategory.LOW) == ("Old",)
+        clock.now = 2.0
+        assert catalogue.get(BPCategory.LOW) == ("New tip",)
+        assert catalogue.current() is not before
+        # Unchanged files keep the compiled catalogue
+        clock.now = 4.0
+        assert catalogue.current() is catalogue.current()
+
+    def test_failed_reload_keeps_catalogue(self, tmp_path):
+        """Test a broken edit leaves the last good catalogue in service"""
+        write(tmp_path, "en", {"LOW": ["Good"]})
+        catalogue = TipsCatalogue(str(tmp_path), reload_interval=0)
+        write(tmp_path, "es", {"LOW": [""]})
+        assert catalogue.reload().get(BPCategory.LOW, "es") == ("Good",)
+        assert isinstance(catalogue.last_error, TipsCatalogueError)
+        write(tmp_path, "es", {"LOW": ["Bueno"]})
+        assert catalogue.reload().get(BPCategory.LOW, "es") == ("Bueno",)
+        assert catalogue.last_error is None
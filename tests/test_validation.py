@@ -0,0 +1,46 @@
+"""Unit tests for the shared reading validator"""
+
+from wtforms.validators import NumberRange
+
+from forms import BloodPressureForm
+from models.validation import FIELD_RANGES, validate_reading
+
+
+class TestValidateReading:
+    """Test validation of readings outside a form submission"""
+
+    def test_valid_reading(self):
+        """Test a valid reading returns parsed values and no errors"""
+        assert validate_reading(120, "80") == ({"systolic": 120, "diastolic": 80}, {})
+
+    def test_boundaries(self):
+        """Test inclusive range boundaries"""
+        assert validate_reading(70, 40)[1] == {}
+        assert validate_reading(190, 100)[1] == {}
+
+    def test_out_of_range(self):
+        """Test range messages match the form"""
+        errors = validate_reading(191, 39)[1]
+        assert errors == {
+            "systolic": ["Invalid Systolic Value"],
+            "diastolic": ["Invalid Diastolic Value"],
+        }
+
+    def test_missing_and_non_integer(self):
+        """Test missing and non-integer values"""
+        errors = validate_reading(None, 80.5)[1]
+        assert errors["systolic"] == ["This field is required."]
+        assert errors["diastolic"] == ["Not a valid integer value."]
+
+    def test_systolic_not_greater(self):
+        """Test systolic must exceed diastolic"""
+        errors = validate_reading(80, 80)[1]
+        assert errors == {"systolic": ["Systolic must be greater than Diastolic"]}
+
+    def test_form_uses_same_ranges(self):
+        """Test BloodPressureForm enforces the validator's ranges and messages"""
+        for name, (low, high, message) in FIELD_RANGES.items():
+            validators = getattr(BloodPressureForm, name).kwargs["validators"]
+            (number_range,) = [v for v in validators if isinstance(v, NumberRange)]
+            assert (number_range.min, number_range.max) == (low, high)
+            assert number_range.message == message